@@ -0,0 +1,57 @@
+"""
+Build derived data that fixture imports maintain (importers/utils/fixture_sync.py)
+for seasons imported before the corresponding hook existed. Pages only read
+these tables, so run this once after deploying a new derived table.
+
+    python -m app.backfill [--step ties --step simulations] [--season-id 12 --season-id 13]
+
+Every step is idempotent and commits per season. The "fixture" and
+"simulation" data versions are bumped at the end, so every worker
+revalidates and re-renders the affected pages.
+"""
+import argparse
+import sys
+
+from sqlalchemy import text
+
+from .core.data_version import bump_versions
+from .db import SessionLocal
+from .services.knockout import rebuild_season_ties
+from .services.scenarios import update_league_scenarios
+from .services.season_sim import update_season_simulations
+from .services.season_summary import rebuild_season_summaries
+
+# name -> fn(db, season_ids); run in this order
+STEPS = {
+    "ties": rebuild_season_ties,
+    "summaries": rebuild_season_summaries,  # reads the ties
+    "simulations": update_season_simulations,
+    "scenarios": update_league_scenarios,
+}
+
+
+def backfill(steps: list[str], season_ids: list[int] | None = None) -> None:
+    with SessionLocal() as db:
+        if not season_ids:
+            season_ids = db.execute(text("SELECT season_id FROM season ORDER BY season_id")).scalars().all()
+        for name in steps:
+            for sid in season_ids:
+                STEPS[name](db, [sid])
+                db.commit()
+            print(f"[backfill] {name}: {len(season_ids)} seasons")
+    bump_versions("fixture", "simulation")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Backfill fixture-derived data")
+    parser.add_argument("--step", action="append", choices=list(STEPS),
+                        help="Step to run (repeatable; default: all)")
+    parser.add_argument("--season-id", action="append", type=int,
+                        help="Season to backfill (repeatable; default: all seasons)")
+    args = parser.parse_args(argv)
+    backfill(args.step or list(STEPS), args.season_id)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,249 @@
+"""
+In-memory manifest of the static tree, and content-hashed asset URLs.
+
+URL helpers in core/templates need to know each asset exists and what
+version it is. Calling stat() per URL costs thousands of syscalls on list
+pages such as /competitions. Instead, the tree is scanned once (about 7k
+files) into a dict of relative path -> AssetInfo, and every lookup after
+that is a dict get.
+
+Templates link to fingerprinted names: images/clubs/small/foo.png becomes
+images/clubs/small/foo.3f2a9c7e1b.png, where the hash comes from the file's
+content. StaticAssets maps such a name back to the real file. It sends
+`immutable` with a one-year max-age, since a changed file gets a new URL.
+Query-string busting (?v=) is skipped by many proxies; a path is not.
+Digests are computed on first use and kept until the file's mtime or size
+changes.
+
+HTML pages embed those names, so a refresh that changes an asset a page may
+reference (added / removed, or a new digest) bumps the "asset" data version,
+which is part of every ETag, and clears the page cache. Otherwise pages
+would keep answering 304 / cache hits with the old, immutable URLs.
+
+The manifest is rebuilt by:
+    - POST /admin/assets/refresh
+    - a watcher thread when ASSET_WATCH=1 (needs watchfiles, which
+      uvicorn[standard] installs); changes are batched by watchfiles and
+      trigger one full rescan
+
+Precompressed siblings (.br / .gz) and __pycache__ are not assets.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import anyio
+from starlette.responses import Response
+from starlette.types import Scope
+
+from .compression import PrecompressedStaticFiles
+from .data_version import ASSET_FAMILY, bump_versions
+from .page_cache import page_cache
+
+try:
+    import watchfiles
+except ImportError:  # refresh through the admin endpoint only
+    watchfiles = None
+
+STATIC_DIR = Path(__file__).resolve().parents[1] / "static"
+ASSET_WATCH = os.getenv("ASSET_WATCH", "0") == "1"
+
+HASH_HEX = 10
+IMMUTABLE = "public, max-age=31536000, immutable"
+# foo.3f2a9c7e1b.png -> (foo, 3f2a9c7e1b, .png)
+_FINGERPRINT = re.compile(rf"^(?P<stem>.+)\.(?P<digest>[0-9a-f]{{{HASH_HEX}}})(?P<ext>\.[A-Za-z0-9]+)$")
+
+SKIP_SUFFIXES = (".br", ".gz", ".tmp")
+SKIP_DIRS = {"__pycache__"}
+
+
+@dataclass(frozen=True)
+class AssetInfo:
+    mtime: int
+    size: int
+
+
+class AssetManifest:
+    """
+    Relative path ('images/clubs/small/foo.png') -> AssetInfo for every file
+    under `root`. Built on first use; refresh() swaps in a new dict, so
+    readers never see a half-built manifest and need no lock.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        self._assets: dict[str, AssetInfo] | None = None
+        self._digests: dict[str, tuple[AssetInfo, str]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher: threading.Thread | None = None
+        self.built_at: float | None = None
+        self.scan_ms: float | None = None
+        self.refreshes = 0
+        self.generation = 0
+
+    def _scan(self) -> dict[str, AssetInfo]:
+        assets: dict[str, AssetInfo] = {}
+        stack = [self.root]
+        while stack:
+            directory = stack.pop()
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in SKIP_DIRS:
+                        stack.append(Path(entry.path))
+                    continue
+                if entry.name.endswith(SKIP_SUFFIXES):
+                    continue
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                rel = Path(entry.path).relative_to(self.root).as_posix()
+                assets[rel] = AssetInfo(int(st.st_mtime), st.st_size)
+        return assets
+
+    def refresh(self) -> dict:
+        with self._lock:
+            start = time.perf_counter()
+            old, self._assets = self._assets, self._scan()
+            changed = old is not None and self._changed(old, self._assets)
+            self.scan_ms = round((time.perf_counter() - start) * 1000, 1)
+            self.built_at = time.time()
+            self.refreshes += 1
+            if changed:
+                self.generation += 1
+        if changed:
+            # rendered pages carry the old URLs: revalidate and re-render them
+            bump_versions(ASSET_FAMILY)
+            page_cache.clear()
+        return self.stats()
+
+    def _changed(self, old: dict[str, AssetInfo], new: dict[str, AssetInfo]) -> bool:
+        """
+        Whether a page could now render a different URL: an asset appeared or
+        disappeared, or one whose digest is in use has different content.
+        Changed files nobody has linked yet (no digest) don't count.
+        """
+        if old.keys() != new.keys():
+            return True
+        for rel, info in new.items():
+            if old[rel] != info:
+                cached = self._digests.get(rel)
+                if cached is not None and self.digest(rel) != cached[1]:
+                    return True
+        return False
+
+    def get(self, rel_path: str) -> AssetInfo | None:
+        assets = self._assets
+        if assets is None:
+            self.refresh()
+            assets = self._assets
+        return assets.get(rel_path)
+
+    def digest(self, rel_path: str) -> str | None:
+        """Content hash of an asset (reads the file once per mtime/size)."""
+        info = self.get(rel_path)
+        if info is None:
+            return None
+        cached = self._digests.get(rel_path)
+        if cached is not None and cached[0] == info:
+            return cached[1]
+        try:
+            data = (self.root / rel_path).read_bytes()
+        except OSError:
+            return None
+        digest = hashlib.blake2b(data, digest_size=HASH_HEX // 2).hexdigest()
+        self._digests[rel_path] = (info, digest)
+        return digest
+
+    def fingerprinted(self, rel_path: str) -> str | None:
+        """
+        'images/foo.png' -> 'images/foo.<digest>.png'. None if the asset doesn't
+        exist; names without an extension are returned as they are.
+        """
+        digest = self.digest(rel_path)
+        if digest is None:
+            return None
+        stem, dot, ext = rel_path.rpartition(".")
+        if not dot or "/" in ext:
+            return rel_path
+        return f"{stem}.{digest}.{ext}"
+
+    def stats(self) -> dict:
+        return {
+            "root": str(self.root),
+            "assets": len(self._assets or ()),
+            "built_at": self.built_at,
+            "scan_ms": self.scan_ms,
+            "refreshes": self.refreshes,
+            "generation": self.generation,
+            "digests": len(self._digests),
+            "watching": self._watcher is not None and self._watcher.is_alive(),
+        }
+
+    # ---- watcher ------------------------------------------------------------
+
+    def _watch(self) -> None:
+        for _changes in watchfiles.watch(self.root, stop_event=self._stop, recursive=True):
+            self.refresh()
+
+    def start_watcher(self) -> bool:
+        """Start the background watcher (no-op without watchfiles or if already running)."""
+        if watchfiles is None or (self._watcher is not None and self._watcher.is_alive()):
+            return False
+        self._stop.clear()
+        self._watcher = threading.Thread(target=self._watch, name="asset-manifest-watcher", daemon=True)
+        self._watcher.start()
+        return True
+
+    def stop_watcher(self) -> None:
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=5)
+            self._watcher = None
+
+
+def split_fingerprint(rel_path: str) -> tuple[str, str | None]:
+    """'images/foo.3f2a9c7e1b.png' -> ('images/foo.png', '3f2a9c7e1b'); other paths -> (path, None)."""
+    m = _FINGERPRINT.match(rel_path)
+    if not m:
+        return rel_path, None
+    return f"{m['stem']}{m['ext']}", m["digest"]
+
+
+asset_manifest = AssetManifest(STATIC_DIR)
+
+
+class StaticAssets(PrecompressedStaticFiles):
+    """
+    The /static mount. It serves fingerprinted names from the real file,
+    with Cache-Control: immutable while the hash still matches and no-cache
+    once the file has changed (a page rendered before the change). Plain
+    names are served as before.
+    """
+
+    def __init__(self, *args, manifest: AssetManifest = asset_manifest, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.manifest = manifest
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        rel = path.replace(os.sep, "/")
+        real, digest = split_fingerprint(rel)
+        if digest is None or self.manifest.get(rel) is not None or self.manifest.get(real) is None:
+            return await super().get_response(path, scope)
+
+        response = await super().get_response(real, scope)
+        if response.status_code in (200, 304):
+            current = await anyio.to_thread.run_sync(self.manifest.digest, real)
+            response.headers["Cache-Control"] = IMMUTABLE if current == digest else "no-cache"
+        return response
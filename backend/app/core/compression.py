@@ -0,0 +1,138 @@
+"""
+Response compression.
+
+Dynamic responses: CompressionMiddleware compresses bodies of at least
+COMPRESS_MIN_SIZE bytes. It uses brotli when the client accepts it (and the
+brotli package is installed), and gzip otherwise. Responses that already
+carry a Content-Encoding, and already-compressed media (images, fonts, ...),
+pass through untouched.
+
+Static files: `python -m app.precompress` writes .br / .gz siblings of the
+text assets once. PrecompressedStaticFiles serves the best variant the
+client accepts as-is, and the middleware leaves /static alone, so static
+responses cost no compression per request.
+"""
+from __future__ import annotations
+
+import mimetypes
+import os
+import stat
+
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware, GZipResponder, IdentityResponder
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))
+COMPRESS_GZIP_LEVEL = int(os.getenv("COMPRESS_GZIP_LEVEL", "6"))
+COMPRESS_BROTLI_QUALITY = int(os.getenv("COMPRESS_BROTLI_QUALITY", "5"))
+
+# Precompressed sibling suffix per encoding, in order of preference
+STATIC_VARIANTS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def accepted_encodings(accept_encoding: str) -> set[str]:
+    """Codings of an Accept-Encoding header with a non-zero q ("*" kept as is)."""
+    accepted = set()
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding and q > 0:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+class BrotliResponder(IdentityResponder):
+    content_encoding = "br"
+
+    def __init__(self, app: ASGIApp, minimum_size: int, quality: int, **kwargs):
+        super().__init__(app, minimum_size, **kwargs)
+        self.compressor = brotli.Compressor(quality=quality)
+
+    async def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        data = self.compressor.process(body)
+        return data + (self.compressor.flush() if more_body else self.compressor.finish())
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    Starlette's GZipMiddleware with brotli preferred and q-values honoured.
+    Paths under `exclude_prefixes` (the static mount, which has its own
+    precompressed variants) are never compressed per request.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = COMPRESS_MIN_SIZE,
+                 compresslevel: int = COMPRESS_GZIP_LEVEL, brotli_quality: int = COMPRESS_BROTLI_QUALITY,
+                 exclude_prefixes: tuple[str, ...] = ("/static/",)):
+        super().__init__(app, minimum_size=minimum_size, compresslevel=compresslevel)
+        self.brotli_quality = brotli_quality
+        self.exclude_prefixes = exclude_prefixes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(self.exclude_prefixes):
+            await self.app(scope, receive, send)
+            return
+
+        accepted = accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        responder: ASGIApp
+        if brotli is not None and "br" in accepted:
+            responder = BrotliResponder(self.app, self.minimum_size, self.brotli_quality,
+                                        exclude_content_types=self.exclude_content_types)
+        elif "gzip" in accepted:
+            responder = GZipResponder(self.app, self.minimum_size, compresslevel=self.compresslevel,
+                                      thread_minimum_size=self.thread_minimum_size,
+                                      exclude_content_types=self.exclude_content_types)
+        else:
+            responder = IdentityResponder(self.app, self.minimum_size, exclude_content_types=self.exclude_content_types)
+        await responder(scope, receive, send)
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    StaticFiles that answers with a precompressed sibling (file.css.br,
+    file.css.gz) when the client accepts that encoding and the sibling is not
+    older than the file. ETags differ per variant (they hash size and mtime).
+    """
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope: Scope, status_code: int = 200) -> Response:
+        request_headers = Headers(scope=scope)
+        accepted = accepted_encodings(request_headers.get("accept-encoding", ""))
+        has_variants = False
+        for encoding, suffix in STATIC_VARIANTS:
+            try:
+                variant_stat = os.stat(f"{full_path}{suffix}")
+            except OSError:
+                continue
+            if not stat.S_ISREG(variant_stat.st_mode) or variant_stat.st_mtime < stat_result.st_mtime:
+                continue
+            has_variants = True
+            if encoding in accepted or "*" in accepted:
+                response = FileResponse(
+                    f"{full_path}{suffix}",
+                    status_code=status_code,
+                    stat_result=variant_stat,
+                    media_type=mimetypes.guess_type(str(full_path))[0] or "application/octet-stream",
+                    headers={"Content-Encoding": encoding, "Vary": "Accept-Encoding"},
+                )
+                break
+        else:
+            response = FileResponse(full_path, status_code=status_code, stat_result=stat_result)
+            if has_variants:
+                response.headers["Vary"] = "Accept-Encoding"
+
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
@@ -0,0 +1,211 @@
+"""
+Data versions per entity family (country, competition, season, fixture, ...).
+
+Each family has a monotonically increasing counter and the time of its last
+bump, kept in the data_version table. Importers bump the families they wrote
+after committing (BaseImporter.import_rows; fixture imports again once the
+derived data is rebuilt). Routes declare the families they are built from
+with @conditional(...). The response then carries an ETag and a
+Last-Modified taken from those versions. A matching If-None-Match /
+If-Modified-Since gets a 304 before the endpoint runs, so no query and no
+rendering happens.
+
+Every worker reads the table at most once per DATA_VERSION_TTL seconds
+(one small query, also on async routes), so a bump from any process (another
+worker, `python -m app.backfill`) reaches all of them within that time. Rows
+changed by hand in psql need a bump too:
+
+    INSERT INTO data_version (family, version) VALUES ('fixture', 1)
+    ON CONFLICT (family) DO UPDATE SET version = data_version.version + 1, modified = NOW();
+
+Every page links static assets by content hash (core/assets), so the
+"asset" family is part of every validator. Each process scans its own
+static tree, so that one family is counted in the process.
+
+ETags also carry a build token: APP_BUILD (set it to the release, e.g. the
+git commit, so every worker and restart of one build shares tags), or a
+per-process token without it, since new code may render the same data
+differently.
+"""
+from __future__ import annotations
+
+import functools
+import inspect
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Callable
+
+from fastapi import Request
+from sqlalchemy import text
+from starlette.responses import Response
+
+from ..db import engine
+
+DATA_VERSION_TTL = float(os.getenv("DATA_VERSION_TTL", "1"))
+
+_BUILD = os.getenv("APP_BUILD") or format(time.time_ns(), "x")
+_BOOT_TIME = datetime.now(timezone.utc).replace(microsecond=0)
+
+# Bumped by core/assets when a refresh changes an asset; in every ETag
+ASSET_FAMILY = "asset"
+# Families counted in the process rather than in data_version
+LOCAL_FAMILIES = frozenset({ASSET_FAMILY})
+
+_lock = threading.Lock()
+_local: dict[str, tuple[int, datetime]] = {}
+_shared: dict[str, tuple[int, datetime]] = {}
+_shared_expires = 0.0
+
+
+def bump_versions(*families: str) -> None:
+    """
+    Bump `families` in their own transaction; call it once the change is
+    committed. This process sees the bump at once, others within
+    DATA_VERSION_TTL.
+    """
+    global _shared_expires
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    shared = [f for f in families if f not in LOCAL_FAMILIES]
+    with _lock:
+        for family in families:
+            if family in LOCAL_FAMILIES:
+                _local[family] = (_local.get(family, (0, now))[0] + 1, now)
+    if shared:
+        with engine.begin() as conn:
+            conn.execute(text("""
+                INSERT INTO data_version (family, version, modified)
+                VALUES (:family, 1, date_trunc('second', NOW()))
+                ON CONFLICT (family) DO UPDATE
+                SET version = data_version.version + 1, modified = EXCLUDED.modified
+            """), [{"family": f} for f in shared])
+        with _lock:
+            _shared_expires = 0.0
+
+
+def _versions() -> dict[str, tuple[int, datetime]]:
+    """{family: (version, modified)}, re-read from data_version once per DATA_VERSION_TTL."""
+    global _shared, _shared_expires
+    now = time.monotonic()
+    with _lock:
+        if now < _shared_expires:
+            return {**_shared, **_local}
+    with engine.connect() as conn:
+        rows = conn.execute(text("SELECT family, version, modified FROM data_version")).all()
+    with _lock:
+        _shared = {r[0]: (int(r[1]), r[2]) for r in rows}
+        _shared_expires = now + DATA_VERSION_TTL
+        return {**_shared, **_local}
+
+
+def data_versions() -> dict[str, dict]:
+    """Every family bumped so far: {family: {"version", "modified"}}."""
+    return {f: {"version": v, "modified": m} for f, (v, m) in sorted(_versions().items())}
+
+
+def validators(families: tuple[str, ...]) -> tuple[str, datetime]:
+    """(ETag, Last-Modified) of a page built from `families` (and the static assets)."""
+    versions = _versions()
+    families = (*families, ASSET_FAMILY)
+    tag = ".".join(str(versions[f][0]) if f in versions else "0" for f in families)
+    modified = max((versions[f][1] if f in versions else _BOOT_TIME for f in families), default=_BOOT_TIME)
+    return f'W/"dv-{_BUILD}-{tag}"', modified
+
+
+def not_modified(request: Request, etag: str, modified: datetime | None = None) -> bool:
+    """
+    Whether the request's validators still match `etag` / `modified`. Without
+    `modified` (ETag-only responses) If-Modified-Since is ignored.
+    """
+    # If-None-Match wins over If-Modified-Since (RFC 9110 13.2.2)
+    inm = request.headers.get("if-none-match")
+    if inm is not None:
+        return inm.strip() == "*" or etag in (t.strip() for t in inm.split(","))
+    ims = request.headers.get("if-modified-since")
+    if ims and modified is not None:
+        try:
+            return parsedate_to_datetime(ims) >= modified
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def conditional(*families: str, vary: Callable[[Request], str | None] | None = None) -> Callable:
+    """
+    Conditional GET for an endpoint built from `families`:
+
+        @router.get("", response_class=HTMLResponse)
+        @conditional("stadium", "country")
+        def stadiums_index(request: Request, ...): ...
+
+    `vary(request)` covers responses that also depend on something other than
+    the data, such as the current date: a non-None value is folded into the
+    ETag, and Last-Modified is left out, since it can't express it.
+
+    Request and Response params are added to the endpoint's signature when it
+    has none, so it works for template and JSON / response_model endpoints
+    alike. Sync and async endpoints are both supported.
+    """
+    def decorator(endpoint: Callable) -> Callable:
+        # eval_str: modules with `from __future__ import annotations` carry string annotations
+        sig = inspect.signature(endpoint, eval_str=True)
+        params = list(sig.parameters.values())
+        # FastAPI fills one Request / Response param each: reuse the endpoint's own
+        injected = []
+        names = {}
+        for cls, fallback in ((Request, "_dv_request"), (Response, "_dv_response")):
+            name = next((p.name for p in params if p.annotation is cls), None)
+            if name is None:
+                name = fallback
+                injected.append(name)
+                params.append(inspect.Parameter(name, inspect.Parameter.KEYWORD_ONLY, annotation=cls))
+            names[cls] = name
+
+        def before(kwargs: dict) -> tuple[Response, dict, Response | None]:
+            request: Request = kwargs[names[Request]]
+            sub_response: Response = kwargs[names[Response]]
+            for name in injected:
+                del kwargs[name]
+
+            etag, modified = validators(families)
+            # part of the cached_page key, so other workers' bumps retire entries too
+            request.state.data_etag = etag
+            extra = vary(request) if vary is not None else None
+            if extra is None:
+                headers = {"ETag": etag, "Last-Modified": format_datetime(modified, usegmt=True)}
+            else:
+                etag = f'{etag[:-1]}-{extra}"'
+                headers = {"ETag": etag}
+                modified = None  # only the ETag can validate
+            headers["Cache-Control"] = "no-cache"
+            if request.method in ("GET", "HEAD") and not_modified(request, etag, modified):
+                return sub_response, headers, Response(status_code=304, headers=headers)
+            return sub_response, headers, None
+
+        def after(result, sub_response: Response, headers: dict):
+            target = result if isinstance(result, Response) else sub_response
+            if target.status_code in (200, None):
+                target.headers.update(headers)
+            return result
+
+        if inspect.iscoroutinefunction(inspect.unwrap(endpoint)):
+            @functools.wraps(endpoint)
+            async def wrapper(*args, **kwargs):
+                sub_response, headers, not_modified = before(kwargs)
+                if not_modified is not None:
+                    return not_modified
+                return after(await endpoint(*args, **kwargs), sub_response, headers)
+        else:
+            @functools.wraps(endpoint)
+            def wrapper(*args, **kwargs):
+                sub_response, headers, not_modified = before(kwargs)
+                if not_modified is not None:
+                    return not_modified
+                return after(endpoint(*args, **kwargs), sub_response, headers)
+
+        wrapper.__signature__ = sig.replace(parameters=params)
+        return wrapper
+
+    return decorator
@@ -0,0 +1,239 @@
+"""
+Connection pool configuration and metrics.
+
+Both engines (sync and async) use a QueuePool sized from the environment:
+
+    DB_POOL_SIZE        persistent connections per engine        (5)
+    DB_MAX_OVERFLOW     extra connections under load, -1 = no cap (10)
+    DB_POOL_TIMEOUT     seconds to wait for a free connection    (30)
+    DB_POOL_RECYCLE     reconnect connections older than this, -1 = never (-1)
+    DB_POOL_PRE_PING    always | idle | never                    (always)
+    DB_POOL_PING_IDLE   with "idle": ping only connections that sat in the
+                        pool longer than this many seconds       (30)
+
+"always" is SQLAlchemy's pool_pre_ping: one round trip per checkout. "idle"
+skips the ping for connections that were just returned, which is most of
+them under load. A failed ping discards the connection and the pool retries
+with a fresh one, as with pool_pre_ping.
+
+Counters and latency histograms come from pool events plus a timed
+Pool.connect(); /admin/db/pool serves them with the live pool state.
+"""
+from __future__ import annotations
+
+import bisect
+import os
+import threading
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+POOL_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "-1"))
+POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "always").lower()
+POOL_PING_IDLE = float(os.getenv("DB_POOL_PING_IDLE", "30"))
+
+PRE_PING_STRATEGIES = ("always", "idle", "never")
+if POOL_PRE_PING not in PRE_PING_STRATEGIES:
+    raise ValueError(f"DB_POOL_PRE_PING must be one of {PRE_PING_STRATEGIES}, got {POOL_PRE_PING!r}")
+
+# Upper bounds (ms) of the histogram buckets; one more bucket catches the rest
+BUCKETS_MS = (0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram in milliseconds (not locked: PoolMetrics holds the lock)."""
+
+    def __init__(self, bounds: tuple[float, ...] = BUCKETS_MS):
+        self.bounds = bounds
+        self.buckets = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, ms: float) -> None:
+        self.buckets[bisect.bisect_left(self.bounds, ms)] += 1
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+
+    def _quantile(self, q: float) -> float | None:
+        """Upper bound of the bucket holding the q-quantile (max for the last bucket)."""
+        if not self.count:
+            return None
+        rank, seen = q * self.count, 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank:
+                return self.bounds[i] if i < len(self.bounds) else self.max
+        return self.max
+
+    def snapshot(self) -> dict:
+        labels = [f"le_{b:g}" for b in self.bounds] + ["inf"]
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count, 3) if self.count else None,
+            "max_ms": round(self.max, 3),
+            "p50_ms": self._quantile(0.50),
+            "p95_ms": self._quantile(0.95),
+            "p99_ms": self._quantile(0.99),
+            "buckets": dict(zip(labels, self.buckets)),
+        }
+
+
+class PoolMetrics:
+    """
+    Per-engine counters and histograms:
+    checkout  time spent in Pool.connect() (queueing, new connection, ping)
+    wait      the subset of checkouts that found the pool exhausted
+    hold      checkout -> checkin, how long requests keep a connection
+    """
+
+    COUNTERS = ("connects", "checkouts", "checkins", "waits", "timeouts",
+                "invalidations", "soft_invalidations", "pings", "failed_pings")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = dict.fromkeys(self.COUNTERS, 0)
+        self.checkout = Histogram()
+        self.wait = Histogram()
+        self.hold = Histogram()
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            self.counters[name] += 1
+
+    def observe_checkout(self, ms: float, waited: bool) -> None:
+        with self._lock:
+            self.checkout.observe(ms)
+            if waited:
+                self.counters["waits"] += 1
+                self.wait.observe(ms)
+
+    def observe_hold(self, ms: float) -> None:
+        with self._lock:
+            self.hold.observe(ms)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                **self.counters,
+                "checkout": self.checkout.snapshot(),
+                "wait": self.wait.snapshot(),
+                "hold": self.hold.snapshot(),
+            }
+
+
+def _timed_pool(base: type[QueuePool], metrics: PoolMetrics) -> type[QueuePool]:
+    """
+    `base` with a timed connect(). Pool events fire only once a connection
+    is handed out, so the time spent getting it is measured here. The class
+    carries the metrics so pools recreated by engine.dispose() keep them.
+    """
+    def connect(self):
+        exhausted = (
+            POOL_MAX_OVERFLOW >= 0
+            and self.checkedin() == 0
+            and self.checkedout() >= self.size() + POOL_MAX_OVERFLOW
+        )
+        start = time.perf_counter()
+        try:
+            return base.connect(self)
+        except exc.TimeoutError:
+            metrics.count("timeouts")
+            raise
+        finally:
+            metrics.observe_checkout((time.perf_counter() - start) * 1000, exhausted)
+
+    return type(f"Timed{base.__name__}", (base,), {"connect": connect, "metrics": metrics})
+
+
+def pool_options(base: type[QueuePool]) -> dict:
+    """create_engine / create_async_engine keyword arguments for the configured pool."""
+    return {
+        "poolclass": _timed_pool(base, PoolMetrics()),
+        "pool_size": POOL_SIZE,
+        "max_overflow": POOL_MAX_OVERFLOW,
+        "pool_timeout": POOL_TIMEOUT,
+        "pool_recycle": POOL_RECYCLE,
+        "pool_pre_ping": POOL_PRE_PING == "always",
+    }
+
+
+_engines: dict[str, Engine] = {}
+
+
+def instrument(engine: Engine, name: str) -> None:
+    """
+    Attach the metrics listeners (and the "idle" pre-ping) to an engine built
+    with pool_options(). For an AsyncEngine pass its .sync_engine.
+    """
+    metrics: PoolMetrics = type(engine.pool).metrics
+    _engines[name] = engine
+
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        metrics.count("connects")
+
+    @event.listens_for(engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        info = connection_record.info
+        if POOL_PRE_PING == "idle":
+            checked_in = info.get("checkin_at")
+            if checked_in is not None and time.monotonic() - checked_in > POOL_PING_IDLE:
+                metrics.count("pings")
+                try:
+                    engine.dialect.do_ping(dbapi_connection)
+                except Exception as e:
+                    metrics.count("failed_pings")
+                    # the pool invalidates this connection and checks out another
+                    raise exc.DisconnectionError() from e
+        metrics.count("checkouts")
+        info["checkout_at"] = time.perf_counter()
+
+    @event.listens_for(engine, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        metrics.count("checkins")
+        info = connection_record.info
+        info["checkin_at"] = time.monotonic()
+        checked_out = info.pop("checkout_at", None)
+        if checked_out is not None:
+            metrics.observe_hold((time.perf_counter() - checked_out) * 1000)
+
+    @event.listens_for(engine, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        metrics.count("invalidations")
+
+    @event.listens_for(engine, "soft_invalidate")
+    def on_soft_invalidate(dbapi_connection, connection_record, exception):
+        metrics.count("soft_invalidations")
+
+
+def pool_stats() -> dict:
+    """Configuration, live state and metrics of every instrumented engine."""
+    stats = {}
+    for name, engine in _engines.items():
+        pool = engine.pool
+        stats[name] = {
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "max_overflow": POOL_MAX_OVERFLOW,
+            **type(pool).metrics.snapshot(),
+        }
+    return {
+        "config": {
+            "pool_size": POOL_SIZE,
+            "max_overflow": POOL_MAX_OVERFLOW,
+            "pool_timeout": POOL_TIMEOUT,
+            "pool_recycle": POOL_RECYCLE,
+            "pre_ping": POOL_PRE_PING,
+            "ping_idle": POOL_PING_IDLE,
+        },
+        "engines": stats,
+    }
@@ -0,0 +1,190 @@
+"""
+On-demand image variants: resized, and re-encoded as AVIF / WebP when the
+client accepts them.
+
+    /img/<width>/<static path>       e.g. /img/128/images/stadiums/spain/foo.3f2a9c7e1b.jpg
+
+<width> is one of WIDTHS. The URL helpers in core/templates round any
+requested width up to the next bucket, so a handful of variants per image
+cover every layout. Images are never upscaled: a bucket wider than the
+source only changes the format. The first request renders the variant and
+stores it in a disk cache; later requests serve the file.
+
+The cache lives in IMAGE_CACHE_DIR and is capped at IMAGE_CACHE_MAX_MB. It
+evicts least recently used variants, using the file mtime as the recency
+stamp (bumped on every hit, so the order survives restarts). The source
+file's mtime and size are part of each cache key, so a replaced image
+never serves a stale variant.
+"""
+from __future__ import annotations
+
+import hashlib
+import io
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from PIL import Image, ImageOps, features
+
+IMAGE_CACHE_DIR = Path(os.getenv("IMAGE_CACHE_DIR", str(Path(tempfile.gettempdir()) / "football-images")))
+IMAGE_CACHE_MAX_MB = int(os.getenv("IMAGE_CACHE_MAX_MB", "512"))
+IMAGE_WEBP_QUALITY = int(os.getenv("IMAGE_WEBP_QUALITY", "80"))
+IMAGE_AVIF_QUALITY = int(os.getenv("IMAGE_AVIF_QUALITY", "55"))
+IMAGE_JPEG_QUALITY = int(os.getenv("IMAGE_JPEG_QUALITY", "82"))
+
+WIDTHS = (16, 32, 48, 64, 96, 128, 192, 256, 384, 512, 768, 1024)
+
+# Source suffix -> Pillow format; only these are resized
+SOURCE_FORMATS = {".png": "PNG", ".jpg": "JPEG", ".jpeg": "JPEG"}
+
+MEDIA_TYPES = {"AVIF": "image/avif", "WEBP": "image/webp", "PNG": "image/png", "JPEG": "image/jpeg"}
+SUFFIXES = {"AVIF": ".avif", "WEBP": ".webp", "PNG": ".png", "JPEG": ".jpg"}
+
+# Modern formats in order of preference, if this Pillow build can write them
+MODERN_FORMATS = tuple(fmt for fmt, feature in (("AVIF", "avif"), ("WEBP", "webp")) if features.check(feature))
+
+
+def width_bucket(width: int) -> int:
+    """Smallest bucket at least `width` wide (the largest bucket for anything wider)."""
+    for w in WIDTHS:
+        if w >= width:
+            return w
+    return WIDTHS[-1]
+
+
+def negotiate_format(accept: str, source_format: str) -> str:
+    """AVIF or WebP when the Accept header lists it, otherwise the source format."""
+    accept = accept.lower()
+    for fmt in MODERN_FORMATS:
+        if MEDIA_TYPES[fmt] in accept:
+            return fmt
+    return source_format
+
+
+def render_variant(source: Path, width: int, fmt: str) -> bytes:
+    """`source` scaled down to at most `width` pixels wide, encoded as `fmt`."""
+    with Image.open(source) as im:
+        im = ImageOps.exif_transpose(im)
+        if im.width > width:
+            im = im.resize((width, max(1, round(im.height * width / im.width))), Image.LANCZOS)
+        has_alpha = im.mode in ("RGBA", "LA") or (im.mode == "P" and "transparency" in im.info)
+        if fmt == "JPEG" or not has_alpha:
+            im = im.convert("RGB")
+        elif im.mode != "RGBA":
+            im = im.convert("RGBA")
+
+        out = io.BytesIO()
+        if fmt == "AVIF":
+            im.save(out, "AVIF", quality=IMAGE_AVIF_QUALITY, speed=8)
+        elif fmt == "WEBP":
+            im.save(out, "WEBP", quality=IMAGE_WEBP_QUALITY, method=4)
+        elif fmt == "JPEG":
+            im.save(out, "JPEG", quality=IMAGE_JPEG_QUALITY, optimize=True, progressive=True)
+        else:
+            im.save(out, "PNG", optimize=True)
+        return out.getvalue()
+
+
+def variant_key(rel_path: str, mtime: int, size: int, width: int, fmt: str) -> str:
+    raw = f"{rel_path}\0{mtime}\0{size}\0{width}\0{fmt}".encode()
+    return hashlib.blake2b(raw, digest_size=16).hexdigest() + SUFFIXES[fmt]
+
+
+class ImageCache:
+    """
+    Size-capped LRU of rendered variants on disk. The index (name -> bytes,
+    oldest first) is rebuilt from the directory on first use.
+    """
+
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._index: OrderedDict[str, int] | None = None
+        self._total = 0
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def _path(self, name: str) -> Path:
+        return self.root / name[:2] / name
+
+    def _load(self) -> OrderedDict[str, int]:
+        if self._index is None:
+            entries = []
+            for path in self.root.glob("*/*"):
+                if path.suffix == ".tmp":
+                    continue
+                try:
+                    st = path.stat()
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, path.name, st.st_size))
+            entries.sort()
+            self._index = OrderedDict((name, size) for _, name, size in entries)
+            self._total = sum(self._index.values())
+        return self._index
+
+    def get(self, name: str) -> Path | None:
+        with self._lock:
+            index = self._load()
+            if name not in index:
+                self.misses += 1
+                return None
+            index.move_to_end(name)
+            self.hits += 1
+        path = self._path(name)
+        try:
+            os.utime(path)
+        except OSError:  # removed behind our back
+            with self._lock:
+                self._total -= index.pop(name, 0)
+            return None
+        return path
+
+    def put(self, name: str, data: bytes) -> Path:
+        path = self._path(name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{name}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        tmp.replace(path)
+        with self._lock:
+            index = self._load()
+            self._total += len(data) - index.pop(name, 0)
+            index[name] = len(data)
+            while self._total > self.max_bytes and len(index) > 1:
+                old, size = index.popitem(last=False)
+                self._total -= size
+                self.evictions += 1
+                try:
+                    self._path(old).unlink()
+                except OSError:
+                    pass
+        return path
+
+    def clear(self) -> None:
+        with self._lock:
+            for name in self._load():
+                try:
+                    self._path(name).unlink()
+                except OSError:
+                    pass
+            self._index = OrderedDict()
+            self._total = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            index = self._load()
+            return {
+                "dir": str(self.root),
+                "variants": len(index),
+                "bytes": self._total,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "formats": list(MODERN_FORMATS),
+            }
+
+
+image_cache = ImageCache(IMAGE_CACHE_DIR, IMAGE_CACHE_MAX_MB * 1024 * 1024)
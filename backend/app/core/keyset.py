@@ -0,0 +1,98 @@
+"""
+Keyset (cursor) pagination for long listings.
+
+A listing is ordered by a unique key such as (kickoff_utc, fixture_id). The
+next page is the rows strictly after the last row shown, found with a
+row-value comparison: (kickoff_utc, fixture_id) < (:k0, :k1). A composite
+index on the key columns answers it as a range scan, so page N costs the
+same as page 1. OFFSET would have to read and skip every earlier row.
+
+The cursor is that last row's key as URL-safe base64 JSON. Pages select the
+key columns under hidden labels (_key0, _key1, ...), so the cursor can be
+built even when ?fields= leaves the key out.
+"""
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Callable, Sequence
+
+from fastapi import HTTPException, Request
+from sqlalchemy import func, literal_column, tuple_
+from sqlalchemy.engine import Row
+
+from ..models import Fixture, Person, Team
+
+KEY_PREFIX = "_key"
+
+
+def _to_json(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, (datetime, date)) else value
+
+
+@dataclass(frozen=True)
+class Keyset:
+    """
+    Sort key of a listing: `columns` in order, all ascending or all
+    descending. `types` turn each decoded JSON value back into a bind value
+    (e.g. datetime.fromisoformat).
+    """
+    columns: tuple
+    types: tuple[Callable[[Any], Any], ...]
+    descending: bool = False
+
+    def page(self, stmt, cursor: str | None, limit: int):
+        """`stmt` ordered by the key, after `cursor`, with limit+1 rows to detect a next page."""
+        stmt = stmt.add_columns(*(c.label(f"{KEY_PREFIX}{i}") for i, c in enumerate(self.columns)))
+        stmt = stmt.order_by(*(c.desc() if self.descending else c.asc() for c in self.columns))
+        if cursor:
+            row, key = tuple_(*self.columns), tuple_(*self.decode(cursor))
+            stmt = stmt.where(row < key if self.descending else row > key)
+        return stmt.limit(limit + 1)
+
+    def split(self, rows: Sequence[Row], limit: int) -> tuple[Sequence[Row], str | None]:
+        """The `limit` rows of the page, and the cursor of the next page (None on the last)."""
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        last = rows[-1]._mapping
+        return rows, self.encode([last[f"{KEY_PREFIX}{i}"] for i in range(len(self.columns))])
+
+    @staticmethod
+    def strip(row: Row) -> dict:
+        """Row as a dict without the hidden key columns."""
+        return {k: v for k, v in row._mapping.items() if not k.startswith(KEY_PREFIX)}
+
+    def encode(self, values: Sequence[Any]) -> str:
+        raw = json.dumps([_to_json(v) for v in values], separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    def decode(self, cursor: str) -> list:
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            values = json.loads(raw)
+            if not isinstance(values, list) or len(values) != len(self.types):
+                raise ValueError
+            return [t(v) for t, v in zip(self.types, values)]
+        except (binascii.Error, ValueError, TypeError):
+            raise HTTPException(400, "Invalid cursor")
+
+
+def next_link(request: Request, next_cursor: str | None) -> dict[str, str]:
+    """Link header to the next page of a JSON listing (none on the last page)."""
+    if not next_cursor:
+        return {}
+    return {"Link": f'<{request.url.include_query_params(cursor=next_cursor)}>; rel="next"'}
+
+
+# Listings that page by keyset, each backed by a composite index in schema.sql
+
+FIXTURE_KEYSET = Keyset((Fixture.kickoff_utc, Fixture.fixture_id), (datetime.fromisoformat, int), descending=True)
+# full_name is nullable, and a NULL in a row-value comparison is never "after"
+# anything: people without a name would end every listing early. Key on ''
+# (inline, so the expression matches idx_person_name_key_id).
+PLAYER_KEYSET = Keyset((func.coalesce(Person.full_name, literal_column("''")), Person.person_id), (str, int))
+TEAM_KEYSET = Keyset((Team.type, Team.name, Team.team_id), (str, str, int))
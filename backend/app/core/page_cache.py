@@ -0,0 +1,200 @@
+"""
+Rendered-page cache.
+
+Finished HTML responses of read-only pages, kept in process and keyed by
+route, path params and query string. The cache is bounded by entry count and
+total body bytes, and entries expire after a TTL. Each entry carries tags:
+(kind, id) pairs such as ("season", 12), or (kind, None) for "built from any
+row of this kind". Importers evict exactly the pages built from what they
+changed via invalidate_pages(). That only reaches the importing process, so
+under @conditional the page's ETag is part of the key as well: a data
+version bumped by any process (core/data_version) makes every worker miss
+and re-render. Hit / miss counters are served by /admin/cache.
+"""
+from __future__ import annotations
+
+import functools
+import inspect
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable, Iterable
+
+from fastapi import Request
+from starlette.responses import Response
+
+PAGE_CACHE_SIZE = int(os.getenv("PAGE_CACHE_SIZE", "1024"))
+PAGE_CACHE_MAX_BYTES = int(os.getenv("PAGE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+PAGE_CACHE_TTL = float(os.getenv("PAGE_CACHE_TTL", "300"))
+
+Tag = tuple[str, Any]
+
+
+@dataclass
+class _Entry:
+    body: bytes
+    status_code: int
+    headers: list[tuple[bytes, bytes]]
+    tags: frozenset[Tag]
+    expires: float
+
+
+class PageCache:
+    """
+    Thread-safe LRU of rendered responses with a TTL and tag eviction.
+    Invalidation scans every entry; it only runs after imports and the cache
+    holds at most `maxsize` entries.
+    """
+
+    def __init__(self, maxsize: int = PAGE_CACHE_SIZE, max_bytes: int = PAGE_CACHE_MAX_BYTES,
+                 ttl: float = PAGE_CACHE_TTL):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, _Entry] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._counters = dict.fromkeys(("hits", "misses", "expired", "stores", "evictions", "invalidations"), 0)
+
+    def get(self, key: Hashable) -> _Entry | None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry.expires <= time.monotonic():
+                self._drop(key)
+                self._counters["expired"] += 1
+                entry = None
+            if entry is None:
+                self._counters["misses"] += 1
+                return None
+            self._data.move_to_end(key)
+            self._counters["hits"] += 1
+            return entry
+
+    def set(self, key: Hashable, entry: _Entry) -> None:
+        if len(entry.body) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._data:
+                self._drop(key)
+            self._data[key] = entry
+            self._bytes += len(entry.body)
+            self._counters["stores"] += 1
+            while len(self._data) > self.maxsize or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._data)))
+                self._counters["evictions"] += 1
+
+    def invalidate(self, kind: str, ids: Iterable[Any] | None = None) -> int:
+        """
+        Drop entries tagged with (kind, id) for any of `ids`, and entries that
+        depend on the whole kind (kind, None). With ids=None every entry
+        tagged with that kind goes. Returns the number dropped.
+        """
+        wanted = None if ids is None else {(kind, i) for i in ids} | {(kind, None)}
+        with self._lock:
+            stale = [
+                key for key, entry in self._data.items()
+                if (wanted is None and any(t[0] == kind for t in entry.tags))
+                or (wanted is not None and not wanted.isdisjoint(entry.tags))
+            ]
+            for key in stale:
+                self._drop(key)
+            self._counters["invalidations"] += len(stale)
+            return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                **self._counters,
+                "hit_ratio": self._counters["hits"] / lookups if lookups else None,
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "maxsize": self.maxsize,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+            }
+
+    def _drop(self, key: Hashable) -> None:
+        entry = self._data.pop(key)
+        self._bytes -= len(entry.body)
+
+
+page_cache = PageCache()
+
+
+def invalidate_pages(kind: str, ids: Iterable[Any] | None = None) -> int:
+    """Evict cached pages built from rows of `kind` (all of them, or just `ids`)."""
+    return page_cache.invalidate(kind, ids)
+
+
+def cached_page(*tags: tuple[str, str | None], ttl: float | None = None) -> Callable:
+    """
+    Cache an HTML endpoint's 200 responses (sync or async). Each tag is
+    (kind, param): the entry is tagged (kind, <value of that endpoint param>),
+    or (kind, None) when param is None. The endpoint must take
+    `request: Request`.
+
+        @router.get("/{country_id}", response_class=HTMLResponse)
+        @cached_page(("country", "country_id"), ("competition", None))
+        def country_detail_page(country_id: int, request: Request, ...): ...
+    """
+    def decorator(endpoint: Callable) -> Callable:
+        def lookup(kwargs: dict) -> tuple[Hashable | None, Response | None]:
+            request: Request | None = kwargs.get("request")
+            if request is None or request.method != "GET":
+                return None, None
+            key = (
+                endpoint.__module__, endpoint.__qualname__,
+                tuple(sorted(request.path_params.items())),
+                tuple(sorted(request.query_params.multi_items())),
+                getattr(request.state, "data_etag", None),  # set by @conditional
+            )
+            entry = page_cache.get(key)
+            if entry is None:
+                return key, None
+            response = Response(content=entry.body, status_code=entry.status_code)
+            response.raw_headers = [*entry.headers, (b"x-cache", b"HIT")]
+            return key, response
+
+        def store(key: Hashable, kwargs: dict, response: Response) -> Response:
+            body = getattr(response, "body", None)
+            if response.status_code == 200 and isinstance(body, bytes):
+                page_cache.set(key, _Entry(
+                    body=body,
+                    status_code=response.status_code,
+                    headers=list(response.raw_headers),
+                    tags=frozenset((kind, None if param is None else kwargs.get(param)) for kind, param in tags),
+                    expires=time.monotonic() + (page_cache.ttl if ttl is None else ttl),
+                ))
+            response.headers["X-Cache"] = "MISS"
+            return response
+
+        if inspect.iscoroutinefunction(inspect.unwrap(endpoint)):
+            @functools.wraps(endpoint)
+            async def wrapper(*args, **kwargs):
+                key, hit = lookup(kwargs)
+                if key is None:
+                    return await endpoint(*args, **kwargs)
+                if hit is not None:
+                    return hit
+                return store(key, kwargs, await endpoint(*args, **kwargs))
+        else:
+            @functools.wraps(endpoint)
+            def wrapper(*args, **kwargs):
+                key, hit = lookup(kwargs)
+                if key is None:
+                    return endpoint(*args, **kwargs)
+                if hit is not None:
+                    return hit
+                return store(key, kwargs, endpoint(*args, **kwargs))
+
+        return wrapper
+
+    return decorator
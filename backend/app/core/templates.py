@@ -4,6 +4,9 @@ from pathlib import Path
 from typing import Literal, Optional
 from fastapi.templating import Jinja2Templates
 
+from .assets import asset_manifest
+from .images import width_bucket
+
 # Base paths
 BASE = Path(__file__).resolve().parents[1]
 TEMPLATES_DIR = BASE / "templates"
@@ -30,16 +33,12 @@ def _join(*parts: str) -> str:
 def _with_cache_bust(rel_path: str) -> str:
     """
     Turn a static-relative path like 'images/clubs/small/foo.png'
-    into '/static/images/clubs/small/foo.png?v=<mtime>' if the file exists.
+    into '/static/images/clubs/small/foo.<hash>.png' if the file exists
+    (according to the asset manifest), else into its plain /static URL.
     """
-    fs_path = STATIC_DIR / rel_path
-    if fs_path.exists():
-        try:
-            mtime = int(fs_path.stat().st_mtime)
-            return "/" + _join("static", rel_path) + f"?v={mtime}"
-        except OSError:
-            pass
-    return "/" + _join("static", rel_path)
+    rel_path = rel_path.lstrip("/")
+    fingerprinted = asset_manifest.fingerprinted(rel_path)
+    return "/" + _join("static", fingerprinted or rel_path)
 
 def _folder_for(kind: Kind, size: Size) -> str:
     if kind == "association":
@@ -56,44 +55,67 @@ def _folder_for(kind: Kind, size: Size) -> str:
         # no size variants in your tree for teams
         return _join("images", "countries", "teams")
     if kind == "stadium":
-        # no size variants in your tree for stadiums
+        # no size variants in your tree for stadiums (request a width instead)
         return _join("images", "stadiums")
     raise ValueError(f"Unknown kind: {kind}")
 
-def _image_url(kind: Kind, filename: Optional[str], size: Size = "normal", default_rel: Optional[str] = None) -> Optional[str]:
+def _resized_url(rel_path: str, width: int) -> str:
+    """
+    '/img/<bucket>/<hashed path>': the image resized on demand (see
+    core/images), or the plain static URL if the file doesn't exist.
+    """
+    rel_path = rel_path.lstrip("/")
+    fingerprinted = asset_manifest.fingerprinted(rel_path)
+    if fingerprinted is None:
+        return "/" + _join("static", rel_path)
+    return "/" + _join("img", str(width_bucket(width)), fingerprinted)
+
+def _image_url(kind: Kind, filename: Optional[str], size: Size = "normal", default_rel: Optional[str] = None,
+               width: Optional[int] = None) -> Optional[str]:
     """
     Build a size-aware static URL for the given entity kind and filename.
+    With `width`, the URL is for a variant of the image at most that many
+    pixels wide, generated on demand from the `size` folder.
     Returns None if filename is falsy and no default is provided.
     """
     if filename:
         rel = _join(_folder_for(kind, size), filename)
-        return _with_cache_bust(rel)
-    if default_rel:
-        return _with_cache_bust(default_rel.lstrip("/"))
-    return None
+    elif default_rel:
+        rel = default_rel.lstrip("/")
+    else:
+        return None
+    return _resized_url(rel, width) if width else _with_cache_bust(rel)
 
 # ---- Public helpers exposed to Jinja ----------------------------------------
 
-def association_logo_url(filename: Optional[str], size: Size = "normal") -> Optional[str]:
-    return _image_url("association", filename, size)
+def association_logo_url(filename: Optional[str], size: Size = "normal", width: Optional[int] = None) -> Optional[str]:
+    return _image_url("association", filename, size, width=width)
 
-def competition_logo_url(filename: Optional[str], size: Size = "normal") -> Optional[str]:
-    return _image_url("competition", filename, size)
+def competition_logo_url(filename: Optional[str], size: Size = "normal", width: Optional[int] = None) -> Optional[str]:
+    return _image_url("competition", filename, size, width=width)
 
-def club_logo_url(filename: Optional[str], size: Size = "normal") -> Optional[str]:
-    return _image_url("club", filename, size)
+def club_logo_url(filename: Optional[str], size: Size = "normal", width: Optional[int] = None) -> Optional[str]:
+    return _image_url("club", filename, size, width=width)
 
-def flag_url(filename: Optional[str], size: Size = "normal") -> Optional[str]:
+def flag_url(filename: Optional[str], size: Size = "normal", width: Optional[int] = None) -> Optional[str]:
     # size supports 'normal' or 'small' (big maps to normal)
-    return _image_url("country_flag", filename, size)
+    return _image_url("country_flag", filename, size, width=width)
 
-def team_logo_url(filename: Optional[str]) -> Optional[str]:
-    # teams have no size variants in your tree
-    return _image_url("team", filename, "normal")
+def team_logo_url(filename: Optional[str], width: Optional[int] = None) -> Optional[str]:
+    # teams have no size variants in your tree; pass a width for a resized one
+    return _image_url("team", filename, "normal", width=width)
 
-def stadium_photo_url(filename: Optional[str]) -> Optional[str]:
-    # stadiums have no size variants in your tree
-    return _image_url("stadium", filename, "normal")
+def stadium_photo_url(filename: Optional[str], country_slug: Optional[str] = None,
+                      width: Optional[int] = None) -> Optional[str]:
+    # photos live in per-country folders; pass a width for a resized one
+    return _image_url("stadium", _join(country_slug, filename) if filename else None, "normal", width=width)
+
+def image_url(rel_path: str, width: int) -> str:
+    """
+    Resized variant of any static image, at most `width` pixels wide.
+    rel_path: path relative to 'backend/app/static', like 'images/stadiums/spain/foo.jpg'
+    """
+    return _resized_url(rel_path, width)
 
 def static_url(rel_path: str) -> str:
     """
@@ -111,4 +133,5 @@ templates.env.globals.update(
     team_logo_url=team_logo_url,
     stadium_photo_url=stadium_photo_url,
     static_url=static_url,
+    image_url=image_url,
 )
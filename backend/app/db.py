@@ -1,11 +1,22 @@
 import os
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from .core.db_pool import pool_options, instrument
 
 DATABASE_URL = os.getenv("DATABASE_URL", "postgresql+psycopg://footuser:footpass@db:5432/football")
-engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+# Pool size, overflow, timeout, recycle and pre-ping come from DB_POOL_* (core/db_pool.py)
+engine = create_engine(DATABASE_URL, **pool_options(QueuePool))
+instrument(engine, "sync")
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 
+# Async engine for `async def` routes: same URL (psycopg 3 has both drivers),
+# its own pool. Routers move over one at a time; the rest keep get_db().
+async_engine = create_async_engine(DATABASE_URL, **pool_options(AsyncAdaptedQueuePool))
+instrument(async_engine.sync_engine, "async")
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
 class Base(DeclarativeBase):
     pass
 
@@ -15,3 +26,7 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,18 +1,37 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
 from fastapi.responses import HTMLResponse
-from fastapi.staticfiles import StaticFiles
 
-from .routers import associations, countries, clubs, competitions, fixtures, leagues, cups, players, imports, admin_import, stadiums, confederations
+from .routers import associations, countries, clubs, competitions, fixtures, leagues, cups, players, imports, admin_import, stadiums, confederations, teams, admin_cache, admin_db, admin_assets, api_v1, images
+from .core.assets import ASSET_WATCH, StaticAssets, asset_manifest
 from .core.templates import templates
+from .core.compression import CompressionMiddleware
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # scan app/static once up front so the first page render doesn't pay for it
+    asset_manifest.refresh()
+    if ASSET_WATCH:
+        asset_manifest.start_watcher()
+    yield
+    asset_manifest.stop_watcher()
+
+
+app = FastAPI(title="Football DB (Original Schema)", lifespan=lifespan)
 
-app = FastAPI(title="Football DB (Original Schema)")
+app.add_middleware(CompressionMiddleware)
 
-app.mount("/static", StaticFiles(directory="app/static"), name="static")
+# .br / .gz siblings written by `python -m app.precompress` are served as-is;
+# content-hashed names (foo.<hash>.png) map to the real file, cached immutable
+app.mount("/static", StaticAssets(directory="app/static"), name="static")
 
 app.include_router(associations.router)
 app.include_router(countries.router)
 app.include_router(stadiums.router)
 app.include_router(clubs.router)
+app.include_router(teams.router)
 app.include_router(competitions.router)
 app.include_router(players.router)
 app.include_router(fixtures.router)
@@ -20,9 +39,14 @@ app.include_router(imports.router)
 app.include_router(leagues.router)
 app.include_router(cups.router)
 app.include_router(admin_import.router)
+app.include_router(admin_cache.router)
+app.include_router(admin_db.router)
+app.include_router(admin_assets.router)
+app.include_router(images.router)
+app.include_router(api_v1.router)
 app.include_router(confederations.router)
 #app.include_router(reference.router)
 
 @app.get("/", response_class=HTMLResponse)
 def home(request: Request):
-    return templates.TemplateResponse("index.html", {"request": request})
+    return templates.TemplateResponse(request, "index.html")
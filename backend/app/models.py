@@ -260,6 +260,9 @@ class Fixture(Base):
     away_score: Mapped[int] = mapped_column(SmallInteger, default=0)
 
     winner_team_id: Mapped[int | None] = mapped_column(BigInteger, ForeignKey("team.team_id", ondelete="SET NULL"))
+    # server-side NOW() only: every row touched by one import shares the transaction timestamp
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now(),)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now(),)
 
 class Season(Base):
     __tablename__ = "season"
@@ -0,0 +1,92 @@
+"""
+Write precompressed .br / .gz siblings of the static text assets.
+
+    python -m app.precompress [--dir app/static] [--force]
+
+A variant gets the source file's mtime, so an edited source is detected
+(and skipped by the static server) until this runs again. Variants that
+are not smaller than the source are not kept. Runs at image build (Dockerfile);
+run it again after changing assets.
+"""
+import argparse
+import gzip
+import os
+import sys
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:  # .gz only
+    brotli = None
+
+STATIC_DIR = os.getenv("STATIC_DIR", str(Path(__file__).parent / "static"))
+
+# Text formats worth compressing; images and fonts are compressed already
+EXTENSIONS = {".css", ".js", ".mjs", ".map", ".json", ".svg", ".html", ".txt", ".xml", ".webmanifest"}
+MIN_SIZE = 256
+
+
+def _encoders():
+    yield ".gz", lambda data: gzip.compress(data, compresslevel=9, mtime=0)
+    if brotli is not None:
+        yield ".br", lambda data: brotli.compress(data, quality=11)
+
+
+def precompress(static_dir: Path, force: bool = False) -> dict:
+    stats = {"written": 0, "fresh": 0, "skipped": 0, "removed": 0}
+    encoders = list(_encoders())
+    for path in sorted(static_dir.rglob("*")):
+        if not path.is_file():
+            continue
+        if path.suffix in (".gz", ".br"):
+            # orphaned variant of a deleted source
+            if not path.with_suffix("").exists():
+                path.unlink()
+                stats["removed"] += 1
+            continue
+        if path.suffix.lower() not in EXTENSIONS:
+            continue
+
+        src_stat = path.stat()
+        data = None
+        for suffix, encode in encoders:
+            target = path.with_name(path.name + suffix)
+            if not force and target.exists() and target.stat().st_mtime == src_stat.st_mtime:
+                stats["fresh"] += 1
+                continue
+            if data is None:
+                data = path.read_bytes()
+            packed = encode(data) if len(data) >= MIN_SIZE else None
+            if packed is None or len(packed) >= len(data):
+                if target.exists():
+                    target.unlink()
+                    stats["removed"] += 1
+                stats["skipped"] += 1
+                continue
+            tmp = target.with_name(target.name + ".tmp")
+            tmp.write_bytes(packed)
+            os.utime(tmp, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+            tmp.replace(target)
+            stats["written"] += 1
+    return stats
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Precompress static assets (.br / .gz)")
+    parser.add_argument("--dir", default=STATIC_DIR, help="Static directory (default: %(default)s)")
+    parser.add_argument("--force", action="store_true", help="Rewrite variants even when up to date")
+    args = parser.parse_args(argv)
+
+    static_dir = Path(args.dir)
+    if not static_dir.is_dir():
+        print(f"[precompress] not a directory: {static_dir}", file=sys.stderr)
+        return 1
+    stats = precompress(static_dir, force=args.force)
+    if brotli is None:
+        print("[precompress] brotli not installed: writing .gz only", file=sys.stderr)
+    print(f"[precompress] {static_dir}: " + ", ".join(f"{k} {v}" for k, v in stats.items()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,31 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from ..core.assets import asset_manifest
+from ..core.images import image_cache
+
+router = APIRouter(prefix="/admin/assets", tags=["admin"])
+
+
+@router.get("", response_class=JSONResponse)
+def assets_stats():
+    """Static asset manifest: file count, last scan and whether the watcher runs."""
+    return asset_manifest.stats()
+
+
+@router.post("/refresh", response_class=JSONResponse)
+def refresh_assets():
+    """Rescan app/static after adding or replacing images outside the watcher."""
+    return asset_manifest.refresh()
+
+
+@router.get("/images", response_class=JSONResponse)
+def image_cache_stats():
+    """Resized-image disk cache: variants, bytes against the cap, hits / misses / evictions."""
+    return image_cache.stats()
+
+
+@router.post("/images/clear", response_class=JSONResponse)
+def clear_image_cache():
+    image_cache.clear()
+    return image_cache.stats()
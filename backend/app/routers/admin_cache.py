@@ -0,0 +1,25 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from ..core.data_version import data_versions
+from ..core.page_cache import page_cache
+
+router = APIRouter(prefix="/admin/cache", tags=["admin"])
+
+
+@router.get("", response_class=JSONResponse)
+def cache_stats():
+    """Rendered-page cache counters (hits, misses, evictions, size)."""
+    return page_cache.stats()
+
+
+@router.get("/versions", response_class=JSONResponse)
+def cache_versions():
+    """Data version and last bump per entity family (drives ETag / Last-Modified)."""
+    return data_versions()
+
+
+@router.post("/clear", response_class=JSONResponse)
+def clear_cache():
+    page_cache.clear()
+    return page_cache.stats()
@@ -0,0 +1,12 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from ..core.db_pool import pool_stats
+
+router = APIRouter(prefix="/admin/db", tags=["admin"])
+
+
+@router.get("/pool", response_class=JSONResponse)
+def db_pool():
+    """Pool configuration, checked-out / overflow connections and checkout, wait and hold latencies."""
+    return pool_stats()
@@ -11,9 +11,9 @@ router = APIRouter(prefix="/admin/import", tags=["admin"])
 def import_page(request: Request):
     # Render the page with a button; values shown for sanity/debug
     return templates.TemplateResponse(
+        request,
         "admin_import.html",
         {
-            "request": request,
             "data_dir": DATA_DIR,
             "manifest_path": MANIFEST_PATH,
             "base_url": DEFAULT_BASE_URL,
@@ -0,0 +1,442 @@
+"""
+Read-only JSON API (/api/v1) for the front end.
+
+Rows come from Core selects of labelled columns (no ORM objects) and are
+serialized with orjson. Every endpoint takes ?fields=a,b,c and selects only
+those columns; unknown names are a 400 listing the allowed ones. List
+filters mirror the HTML pages; fixtures and players page by keyset (cursor
+in the Link header). Responses carry the same ETag /
+Last-Modified validators as the pages.
+"""
+from __future__ import annotations
+
+from datetime import date, datetime
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import and_, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from ..db import get_async_db
+from ..core.data_version import conditional
+from ..core.keyset import FIXTURE_KEYSET, PLAYER_KEYSET, Keyset, next_link
+from ..models import Competition, Country, Fixture, Person, Player, Season, Stadium, Stage, StageRound, Team
+from ..services.table_variants import season_table_variants, VARIANT_LABELS
+
+router = APIRouter(prefix="/api/v1", tags=["api"], default_response_class=ORJSONResponse)
+
+FIELDS_DESCRIPTION = "Comma-separated subset of the fields to return (default: all)"
+CURSOR_DESCRIPTION = "Next-page cursor, from the Link header of the previous page"
+
+HomeTeam = aliased(Team)
+AwayTeam = aliased(Team)
+
+# field name -> column, per entity (also the default field order)
+COUNTRY_FIELDS = {
+    "country_id": Country.country_id,
+    "name": Country.name,
+    "fifa_code": Country.fifa_code,
+    "nat_association": Country.nat_association,
+    "status": Country.c_status,
+    "confed_ass_id": Country.confed_ass_id,
+    "flag_filename": Country.flag_filename,
+}
+COMPETITION_FIELDS = {
+    "competition_id": Competition.competition_id,
+    "slug": Competition.slug,
+    "name": Competition.name,
+    "type": Competition.type,
+    "tier": Competition.tier,
+    "cup_rank": Competition.cup_rank,
+    "gender": Competition.gender,
+    "age_group": Competition.age_group,
+    "status": Competition.status,
+    "country_id": Competition.country_id,
+    "country_name": Country.name,
+    "organizer_ass_id": Competition.organizer_ass_id,
+    "logo_filename": Competition.logo_filename,
+}
+SEASON_FIELDS = {
+    "season_id": Season.season_id,
+    "competition_id": Season.competition_id,
+    "name": Season.name,
+    "start_date": Season.start_date,
+    "end_date": Season.end_date,
+}
+FIXTURE_FIELDS = {
+    "fixture_id": Fixture.fixture_id,
+    "kickoff_utc": Fixture.kickoff_utc,
+    "fixture_status": Fixture.fixture_status,
+    "season_id": Stage.season_id,
+    "stage_id": StageRound.stage_id,
+    "stage_round_id": Fixture.stage_round_id,
+    "group_id": Fixture.group_id,
+    "home_team_id": Fixture.home_team_id,
+    "home_name": HomeTeam.name,
+    "away_team_id": Fixture.away_team_id,
+    "away_name": AwayTeam.name,
+    "ht_home_score": Fixture.ht_home_score,
+    "ht_away_score": Fixture.ht_away_score,
+    "ft_home_score": Fixture.ft_home_score,
+    "ft_away_score": Fixture.ft_away_score,
+    "et_home_score": Fixture.et_home_score,
+    "et_away_score": Fixture.et_away_score,
+    "pen_home_score": Fixture.pen_home_score,
+    "pen_away_score": Fixture.pen_away_score,
+    "winner_team_id": Fixture.winner_team_id,
+    "stadium_id": Fixture.stadium_id,
+    "stadium_name": Stadium.name,
+    "attendance": Fixture.attendance,
+}
+PLAYER_FIELDS = {
+    "player_id": Player.player_id,
+    "person_id": Player.person_id,
+    "full_name": Person.full_name,
+    "known_as": Person.known_as,
+    "birth_date": Person.birth_date,
+    "country_id": Person.country_id,
+    "country_name": Country.name,
+    "position": Player.player_position,
+    "active": Player.player_active,
+    "height_cm": Person.height_cm,
+    "photo_url": Person.photo_url,
+}
+STADIUM_FIELDS = {
+    "stadium_id": Stadium.stadium_id,
+    "name": Stadium.name,
+    "city": Stadium.city,
+    "country_id": Stadium.country_id,
+    "country_name": Country.name,
+    "capacity": Stadium.capacity,
+    "opened_year": Stadium.opened_year,
+    "closed_year": Stadium.closed_year,
+    "renovated_years": Stadium.renovated_years,
+    "tenants": Stadium.tenants,
+    "lat": Stadium.lat,
+    "lng": Stadium.lng,
+    "photo_filename": Stadium.photo_filename,
+}
+STANDING_FIELDS = ("position", "team_id", "name", "pld", "w", "d", "l", "gf", "ga", "gd", "pts")
+
+
+def _field_names(fields: str | None, allowed) -> list[str]:
+    if not fields:
+        return list(allowed)
+    names = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    unknown = [n for n in names if n not in allowed]
+    if unknown or not names:
+        raise HTTPException(400, f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(allowed)}")
+    return names
+
+
+def _columns(fields: str | None, allowed: dict[str, Any]) -> list:
+    """Labelled columns for ?fields= (all of `allowed` when absent)."""
+    return [allowed[n].label(n) for n in _field_names(fields, allowed)]
+
+
+async def _rows(db: AsyncSession, stmt) -> list[dict]:
+    return [dict(r) for r in (await db.execute(stmt)).mappings()]
+
+
+async def _page(db: AsyncSession, keyset: Keyset, stmt, cursor: str | None, limit: int) -> tuple[list[dict], str | None]:
+    rows, next_cursor = keyset.split((await db.execute(keyset.page(stmt, cursor, limit))).all(), limit)
+    return [keyset.strip(r) for r in rows], next_cursor
+
+
+async def _one(db: AsyncSession, stmt, what: str) -> dict:
+    row = (await db.execute(stmt)).mappings().first()
+    if row is None:
+        raise HTTPException(404, f"{what} not found")
+    return dict(row)
+
+
+# ---------------------------
+# Countries
+# ---------------------------
+
+@router.get("/countries")
+@conditional("country")
+async def api_countries(
+    q: str | None = Query(None, description="Search by country name"),
+    status: str | None = Query(None, pattern="^(active|historical)$"),
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db),
+):
+    stmt = select(*_columns(fields, COUNTRY_FIELDS)).order_by(Country.name)
+    if q:
+        stmt = stmt.where(Country.name.ilike(f"%{q.strip()}%"))
+    if status:
+        stmt = stmt.where(Country.c_status == status)
+    return ORJSONResponse(await _rows(db, stmt))
+
+
+@router.get("/countries/{country_id}")
+@conditional("country")
+async def api_country(
+    country_id: int,
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db),
+):
+    stmt = select(*_columns(fields, COUNTRY_FIELDS)).where(Country.country_id == country_id)
+    return ORJSONResponse(await _one(db, stmt, "Country"))
+
+
+# ---------------------------
+# Competitions and seasons
+# ---------------------------
+
+def _competitions_select(fields: str | None):
+    return (
+        select(*_columns(fields, COMPETITION_FIELDS))
+        .select_from(Competition)
+        .outerjoin(Country, Country.country_id == Competition.country_id)
+    )
+
+
+@router.get("/competitions")
+@conditional("competition", "country")
+async def api_competitions(
+    country_id: int | None = Query(None),
+    comp_type: str | None = Query(None, alias="type", description="league, cup, ..."),
+    status: str | None = Query(None, description="active, ..."),
+    limit: int | None = Query(None, ge=1),
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db),
+):
+    stmt = _competitions_select(fields).order_by(Competition.name)
+    if country_id:
+        stmt = stmt.where(Competition.country_id == country_id)
+    if comp_type:
+        stmt = stmt.where(Competition.type == comp_type)
+    if status:
+        stmt = stmt.where(Competition.status == status)
+    if limit:
+        stmt = stmt.limit(limit)
+    return ORJSONResponse(await _rows(db, stmt))
+
+
+@router.get("/competitions/{competition_id}")
+@conditional("competition", "country")
+async def api_competition(
+    competition_id: int,
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db),
+):
+    stmt = _competitions_select(fields).where(Competition.competition_id == competition_id)
+    return ORJSONResponse(await _one(db, stmt, "Competition"))
+
+
+@router.get("/competitions/{competition_id}/seasons")
+@conditional("season")
+async def api_competition_seasons(
+    competition_id: int,
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db),
+):
+    stmt = (
+        select(*_columns(fields, SEASON_FIELDS))
+        .where(Season.competition_id == competition_id)
+        .order_by(Season.start_date.desc().nulls_last(), Season.name.desc())
+    )
+    return ORJSONResponse(await _rows(db, stmt))
+
+
+@router.get("/seasons/{season_id}")
+@conditional("season")
+async def api_season(
+    season_id: int,
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db),
+):
+    stmt = select(*_columns(fields, SEASON_FIELDS)).where(Season.season_id == season_id)
+    return ORJSONResponse(await _one(db, stmt, "Season"))
+
+
+@router.get("/seasons/{season_id}/standings")
+@conditional("season", "fixture", "team")
+async def api_season_standings(
+    season_id: int,
+    variant: str = Query("overall", pattern=f"^({'|'.join(VARIANT_LABELS)})$"),
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """League table of the season (same rows and cache as the HTML table)."""
+    names = _field_names(fields, STANDING_FIELDS)
+    await _one(db, select(Season.season_id).where(Season.season_id == season_id), "Season")
+    variants = await db.run_sync(season_table_variants, season_id)
+    return ORJSONResponse([{n: row[n] for n in names} for row in variants[variant]])
+
+
+# ---------------------------
+# Fixtures
+# ---------------------------
+
+def _fixtures_select(fields: str | None):
+    return (
+        select(*_columns(fields, FIXTURE_FIELDS))
+        .select_from(Fixture)
+        .join(StageRound, StageRound.stage_round_id == Fixture.stage_round_id)
+        .join(Stage, Stage.stage_id == StageRound.stage_id)
+        .join(HomeTeam, HomeTeam.team_id == Fixture.home_team_id)
+        .join(AwayTeam, AwayTeam.team_id == Fixture.away_team_id)
+        .outerjoin(Stadium, Stadium.stadium_id == Fixture.stadium_id)
+    )
+
+
+def _fixtures_day(request: Request) -> str | None:
+    """?date=today resolves to a different day tomorrow: keep it in the ETag."""
+    if request.query_params.get("date") == "today":
+        return date.today().isoformat()
+    return None
+
+
+@router.get("/fixtures")
+@conditional("fixture", "team", "stadium", vary=_fixtures_day)
+async def api_fixtures(
+    request: Request,
+    date_from: date | None = Query(None),
+    date_to: date | None = Query(None),
+    on: str | None = Query(None, alias="date", pattern=r"^(today|\d{4}-\d{2}-\d{2})$",
+                           description="One day, YYYY-MM-DD or 'today' (sets date_from and date_to)"),
+    team_id: int | None = Query(None),
+    season_id: int | None = Query(None),
+    limit: int = Query(100, ge=1, le=500),
+    cursor: str | None = Query(None, description=CURSOR_DESCRIPTION),
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db),
+):
+    if on:
+        try:
+            date_from = date_to = date.today() if on == "today" else date.fromisoformat(on)
+        except ValueError:
+            raise HTTPException(400, f"Invalid date: {on}")
+    conds = []
+    if date_from:
+        conds.append(Fixture.kickoff_utc >= datetime.combine(date_from, datetime.min.time()).astimezone())
+    if date_to:
+        conds.append(Fixture.kickoff_utc <= datetime.combine(date_to, datetime.max.time()).astimezone())
+    if team_id:
+        conds.append((Fixture.home_team_id == team_id) | (Fixture.away_team_id == team_id))
+    if season_id:
+        conds.append(Stage.season_id == season_id)
+
+    stmt = _fixtures_select(fields)
+    if conds:
+        stmt = stmt.where(and_(*conds))
+    rows, next_cursor = await _page(db, FIXTURE_KEYSET, stmt, cursor, limit)
+    return ORJSONResponse(rows, headers=next_link(request, next_cursor))
+
+
+@router.get("/fixtures/{fixture_id}")
+@conditional("fixture", "team", "stadium")
+async def api_fixture(
+    fixture_id: int,
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db),
+):
+    stmt = _fixtures_select(fields).where(Fixture.fixture_id == fixture_id)
+    return ORJSONResponse(await _one(db, stmt, "Fixture"))
+
+
+# ---------------------------
+# Players
+# ---------------------------
+
+def _players_select(fields: str | None):
+    return (
+        select(*_columns(fields, PLAYER_FIELDS))
+        .select_from(Player)
+        .join(Person, Person.person_id == Player.person_id)
+        .outerjoin(Country, Country.country_id == Person.country_id)
+    )
+
+
+@router.get("/players")
+@conditional("player", "country")
+async def api_players(
+    request: Request,
+    q: str | None = Query(None),
+    country: str | None = Query(None, description="Country id, FIFA code or name"),
+    position: str | None = Query(None, description="GK, DF, MF or FW"),
+    active: str | None = Query(None, pattern="^(true|false)$"),
+    limit: int = Query(200, ge=1, le=1000),
+    cursor: str | None = Query(None, description=CURSOR_DESCRIPTION),
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db),
+):
+    stmt = _players_select(fields)
+    if q:
+        stmt = stmt.where(func.lower(Person.full_name).like(f"%{q.strip().lower()}%"))
+    if position:
+        stmt = stmt.where(Player.player_position == position.strip().upper())
+    if active:
+        stmt = stmt.where(Player.player_active == (active == "true"))
+    if country:
+        tok = country.strip()
+        if tok.isdigit():
+            stmt = stmt.where(Person.country_id == int(tok))
+        else:
+            sub = select(Country.country_id).where(
+                (Country.fifa_code == tok.upper()) | (func.lower(Country.name) == tok.lower())
+            )
+            stmt = stmt.where(Person.country_id.in_(sub))
+    rows, next_cursor = await _page(db, PLAYER_KEYSET, stmt, cursor, limit)
+    return ORJSONResponse(rows, headers=next_link(request, next_cursor))
+
+
+@router.get("/players/{player_id}")
+@conditional("player", "country")
+async def api_player(
+    player_id: int,
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db),
+):
+    stmt = _players_select(fields).where(Player.player_id == player_id)
+    return ORJSONResponse(await _one(db, stmt, "Player"))
+
+
+# ---------------------------
+# Stadiums
+# ---------------------------
+
+def _stadiums_select(fields: str | None):
+    return (
+        select(*_columns(fields, STADIUM_FIELDS))
+        .select_from(Stadium)
+        .outerjoin(Country, Country.country_id == Stadium.country_id)
+    )
+
+
+@router.get("/stadiums")
+@conditional("stadium", "country")
+async def api_stadiums(
+    q: str = Query("", description="Search by stadium name or city"),
+    status: str = Query("all", pattern="^(active|closed|all)$"),
+    country_id: int | None = Query(None),
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db),
+):
+    stmt = _stadiums_select(fields).order_by(Country.name.nulls_last(), Stadium.name)
+    if q:
+        ql = f"%{q.lower()}%"
+        stmt = stmt.where(func.lower(Stadium.name).like(ql) | func.lower(Stadium.city).like(ql))
+    if status == "active":
+        stmt = stmt.where(Stadium.closed_year.is_(None))
+    elif status == "closed":
+        stmt = stmt.where(Stadium.closed_year.is_not(None))
+    if country_id:
+        stmt = stmt.where(Stadium.country_id == country_id)
+    return ORJSONResponse(await _rows(db, stmt))
+
+
+@router.get("/stadiums/{stadium_id}")
+@conditional("stadium", "country")
+async def api_stadium(
+    stadium_id: int,
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db),
+):
+    stmt = _stadiums_select(fields).where(Stadium.stadium_id == stadium_id)
+    return ORJSONResponse(await _one(db, stmt, "Stadium"))
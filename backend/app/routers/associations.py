@@ -5,18 +5,21 @@ from sqlalchemy import select, or_
 from ..db import get_db
 from ..models import Association, Competition
 from ..core.templates import templates
+from ..core.data_version import conditional
 
 router = APIRouter(prefix="/associations", tags=["associations"])
 
 @router.get("", response_class=HTMLResponse)
+@conditional("association")
 def associations_page(request: Request, q: str | None = Query(None), db: Session = Depends(get_db)):
     stmt = select(Association)
     if q:
         stmt = stmt.where(Association.name.ilike(f"%{q}%") | Association.code.ilike(f"%{q}%"))
     rows = db.execute(stmt.order_by(Association.level, Association.code)).scalars().all()
-    return templates.TemplateResponse("associations.html", {"request": request, "rows": rows, "q": q or ""})
+    return templates.TemplateResponse(request, "associations.html", {"rows": rows, "q": q or ""})
 
 @router.get("/{ass_id}", response_class=HTMLResponse)
+@conditional("association", "competition")
 def association_detail(
     ass_id: int,
     request: Request,
@@ -75,9 +78,9 @@ def association_detail(
     child_domestics      = [c for c in child_comps if c.country_id is not None]
 
     return templates.TemplateResponse(
+        request,
         "association_detail.html",
         {
-            "request": request,
             "a": a,
             "parent": parent,
             "children": children,
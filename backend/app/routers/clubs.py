@@ -3,13 +3,17 @@ from fastapi.responses import HTMLResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 from ..db import get_db
-from ..models import Club, Country, Stadium
+from ..models import Club, Country, Stadium, Team
 from ..schemas import ClubCreate, ClubRead
 from ..core.templates import templates
+from ..core.data_version import conditional, bump_versions
+from ..core.page_cache import invalidate_pages
+from ..services.elo import rating_card
 
 router = APIRouter(prefix="/clubs", tags=["clubs"])
 
 @router.get("", response_class=HTMLResponse)
+@conditional("club", "country")
 def clubs_page(
     request: Request,
     q: str | None = None,
@@ -27,12 +31,14 @@ def clubs_page(
     country_map = {cid: cname for cid, cname in countries}
 
     return templates.TemplateResponse(
+        request,
         "clubs.html",
-        {"request": request, "clubs": rows, "q": q or "", "country_id": country_id, "country_map": country_map},
+        {"clubs": rows, "q": q or "", "country_id": country_id, "country_map": country_map},
     )
 
 
 @router.get("/{club_id}", response_class=HTMLResponse)
+@conditional("club", "country", "stadium", "team", "fixture")
 def club_detail_page(club_id: int, request: Request, db: Session = Depends(get_db)):
     club = db.execute(select(Club).where(Club.club_id == club_id)).scalar_one_or_none()
     if not club:
@@ -43,13 +49,22 @@ def club_detail_page(club_id: int, request: Request, db: Session = Depends(get_d
         country = db.execute(select(Country).where(Country.country_id == club.country_id)).scalar_one_or_none()
     if club.stadium_id:
         stadium = db.execute(select(Stadium).where(Stadium.stadium_id == club.stadium_id)).scalar_one_or_none()
+
+    # Elo of the club's (first) team
+    team = db.execute(
+        select(Team).where(Team.club_id == club.club_id, Team.type == "club").order_by(Team.team_id).limit(1)
+    ).scalar_one_or_none()
+    elo = rating_card(db, team.team_id) if team else None
+
     return templates.TemplateResponse(
+        request,
         "club_detail.html",
-        {"request": request, "club": club, "country": country, "stadium": stadium}
+        {"club": club, "country": country, "stadium": stadium, "team": team, "elo": elo}
     )
 
 
 @router.get("/api", response_model=list[ClubRead])
+@conditional("club")
 def list_clubs(country_id: int | None = None, limit: int = 200, db: Session = Depends(get_db)):
     stmt = select(Club)
     if country_id:
@@ -76,4 +91,6 @@ def create_club(payload: ClubCreate, db: Session = Depends(get_db)):
     db.add(row)
     db.commit()
     db.refresh(row)
+    bump_versions("club")
+    invalidate_pages("club")
     return ClubRead.model_validate(row, from_attributes=True)
@@ -1,19 +1,22 @@
 from typing import Dict, Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Request, Query
 from fastapi.responses import HTMLResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 from ..db import get_db
-from ..models import Competition, Country, Association, Season
-from ..core.templates import templates
+from ..models import Competition, Country, Association
+from ..core.templates import templates, static_url
+from ..core.data_version import conditional
+from ..core.page_cache import cached_page
+from ..services.all_time import competition_seasons, season_range, all_time_table, head_to_head
+from ..services.season_summary import competition_season_summaries
+from ..services.records import records_for
 from ..utils.comp_sort import international_sort_key, _gender_priority, _age_priority, _domestic_bucket, _type_priority, _league_metric, _cup_metric
 
 import unicodedata, re
 
 router = APIRouter(prefix="/competitions", tags=["competitions"])
 
-BASE_COMP_IMG = "/static/images/competitions"
-
 # ---------- Country → folder slug (baked) ----------
 COUNTRY_FOLDER_MAP: dict[str, str] = {
     "Afghanistan": "afghanistan", "Albania": "albania", "Algeria": "algeria",
@@ -106,20 +109,20 @@ def _image_base(country_name: Optional[str], federation_code: Optional[str]) ->
 def _federation_logo_url(fed_code: Optional[str]) -> Optional[str]:
     if not fed_code:
         return None
-    return f"/static/images/associations/small/{fed_code.lower()}.png"
+    return static_url(f"images/associations/small/{fed_code.lower()}.png")
 
 def _country_flag_url(country_obj: Optional[Country]) -> Optional[str]:
     if not country_obj:
         return None
     fn = getattr(country_obj, "flag_filename", None)
     if fn:
-        return f"/static/images/countries/flags/small/{fn}"
+        return static_url(f"images/countries/flags/small/{fn}")
     code3 = getattr(country_obj, "code_3", None) or getattr(country_obj, "iso3", None) or getattr(country_obj, "alpha3", None)
     if code3:
-        return f"/static/images/countries/flags/small/{code3.lower()}.png"
+        return static_url(f"images/countries/flags/small/{code3.lower()}.png")
     slug = COUNTRY_FOLDER_MAP.get(country_obj.name)
     if slug:
-        return f"/static/images/competitions/countries/{slug}/thumbs/{slug}.png"
+        return static_url(f"images/competitions/countries/{slug}/thumbs/{slug}.png")
     return None
 
 def _domestic_sort_key(x: Dict[str, Any]):
@@ -133,6 +136,8 @@ def _domestic_sort_key(x: Dict[str, Any]):
 
 # ---------- pages ----------
 @router.get("", response_class=HTMLResponse)
+@conditional("competition", "country", "association")
+@cached_page(("competition", None), ("country", None), ("association", None))
 def competitions_page(request: Request, db: Session = Depends(get_db)):
     comps: List[Competition] = db.execute(select(Competition).order_by(Competition.name)).scalars().all()
 
@@ -212,11 +217,14 @@ def competitions_page(request: Request, db: Session = Depends(get_db)):
     federations.sort(key=lambda g: (0 if g["code"] == "FIFA" else 1, g["name"]))
 
     return templates.TemplateResponse(
+        request,
         "competitions.html",
-        {"request": request, "federations": federations, "BASE_COMP_IMG": BASE_COMP_IMG},
+        {"federations": federations},
     )
 
 @router.get("/{competition_id}", response_class=HTMLResponse)
+@conditional("competition", "season", "fixture", "country", "association")
+@cached_page(("competition", "competition_id"), ("country", None), ("association", None))
 def competition_detail_page(competition_id: int, request: Request, db: Session = Depends(get_db)):
     comp = db.execute(select(Competition).where(Competition.competition_id == competition_id)).scalar_one_or_none()
     if not comp:
@@ -224,7 +232,8 @@ def competition_detail_page(competition_id: int, request: Request, db: Session =
 
     country = db.execute(select(Country).where(Country.country_id == comp.country_id)).scalar_one_or_none() if comp.country_id else None
     organizer = db.execute(select(Association).where(Association.ass_id == comp.organizer_ass_id)).scalar_one_or_none() if comp.organizer_ass_id else None
-    seasons = db.execute(select(Season).where(Season.competition_id == comp.competition_id)).scalars().all()
+    # every season with its precomputed winner (newest first), one query
+    seasons_sorted = competition_season_summaries(db, comp.competition_id)
 
     # Paths & assets
     country_name = country.name if country else None
@@ -233,28 +242,94 @@ def competition_detail_page(competition_id: int, request: Request, db: Session =
     country_flag_url = _country_flag_url(country) if country else None
     organizer_logo_url = _federation_logo_url(assoc_code) if assoc_code else None
 
-    # Sorting seasons (DESC by label; supports .season_name or .name)
-    def _season_label(s):
-        return getattr(s, "season_name", None) or getattr(s, "name", "") or ""
-
-    seasons_sorted = sorted(seasons, key=_season_label, reverse=True)
-    current_season_label = _season_label(seasons_sorted[0]) if seasons_sorted else None
+    current_season_label = seasons_sorted[0]["name"] if seasons_sorted else None
 
     return templates.TemplateResponse(
+        request,
         "competition_detail.html",
         {
-            "request": request,
             "competition": comp,
             "country": country,
             "organizer": organizer,
-            "seasons": seasons,  # original (optional)
+            "seasons": seasons_sorted,
             "seasons_sorted": seasons_sorted,
             "current_season_label": current_season_label,
             "image_base": image_base,
             "filename": comp.logo_filename,
-            "BASE_COMP_IMG": BASE_COMP_IMG,
             "country_flag_url": country_flag_url,
             "organizer_logo_url": organizer_logo_url,
         },
     )
 
+
+@router.get("/{competition_id}/all-time-table", response_class=HTMLResponse)
+@conditional("competition", "season", "fixture", "team")
+@cached_page(("competition", "competition_id"), ("team", None))
+def competition_all_time_table(
+    competition_id: int,
+    request: Request,
+    from_season: Optional[int] = Query(default=None, alias="from", description="First season_id (inclusive)"),
+    to_season: Optional[int] = Query(default=None, alias="to", description="Last season_id (inclusive)"),
+    team_id: Optional[int] = Query(default=None, description="Show this team's head-to-head records"),
+    db: Session = Depends(get_db),
+):
+    """
+    All-time table over a range of seasons, summed from the pre-aggregated
+    per-season rows in mv_team_season_totals (no fixture scan).
+    """
+    comp = db.execute(select(Competition).where(Competition.competition_id == competition_id)).scalar_one_or_none()
+    if not comp:
+        raise HTTPException(status_code=404, detail="Competition not found")
+
+    seasons = competition_seasons(db, competition_id)
+    selected = season_range(seasons, from_season, to_season)
+    season_ids = [s["season_id"] for s in selected]
+
+    rows = all_time_table(db, competition_id, season_ids)
+    h2h = head_to_head(db, competition_id, team_id, season_ids) if team_id else []
+    h2h_team = next((r for r in rows if r["team_id"] == team_id), None) if team_id else None
+
+    return templates.TemplateResponse(
+        request,
+        "all_time_table.html",
+        {
+            "competition": comp,
+            "seasons": seasons,
+            "first_season": selected[0] if selected else None,
+            "last_season": selected[-1] if selected else None,
+            "table": rows,
+            "team_id": team_id,
+            "h2h_team": h2h_team,
+            "h2h": h2h,
+        },
+    )
+
+
+@router.get("/{competition_id}/records", response_class=HTMLResponse)
+@conditional("competition", "season", "fixture", "team")
+@cached_page(("competition", "competition_id"), ("team", None))
+def competition_records(
+    competition_id: int,
+    request: Request,
+    season_id: Optional[int] = Query(default=None, description="Records of one season instead of all"),
+    db: Session = Depends(get_db),
+):
+    comp = db.execute(select(Competition).where(Competition.competition_id == competition_id)).scalar_one_or_none()
+    if not comp:
+        raise HTTPException(status_code=404, detail="Competition not found")
+
+    seasons = competition_seasons(db, competition_id)
+    season = next((s for s in seasons if s["season_id"] == season_id), None)
+    records = records_for(db, "season", season_id) if season else records_for(db, "competition", competition_id)
+
+    return templates.TemplateResponse(
+        request,
+        "records.html",
+        {
+            "title": f"{comp.name} – Records" + (f" {season['name']}" if season else ""),
+            "back_url": f"/competitions/{competition_id}",
+            "seasons": seasons,
+            "season_id": season["season_id"] if season else None,
+            "records": records,
+        },
+    )
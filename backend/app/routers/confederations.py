@@ -7,7 +7,10 @@ from sqlalchemy.orm import Session
 from ..db import get_db
 from ..models import Association, Country, Competition
 from ..core.templates import templates
+from ..core.data_version import conditional
+from ..core.page_cache import cached_page
 from ..utils.comp_sort import international_sort_key
+from ..services.coefficients import coefficient_rankings
 
 router = APIRouter(prefix="/confederations", tags=["confederations"])
 
@@ -18,6 +21,8 @@ def _is_confed_code(code: str | None) -> bool:
     return (code or "").strip().upper() in CONFED_CODES
 
 @router.get("", response_class=HTMLResponse, response_model=None)
+@conditional("association", "country")
+@cached_page(("association", None), ("country", None))
 def confederations_page(
     request: Request,
     q: str | None = Query(None),
@@ -40,9 +45,9 @@ def confederations_page(
     regionals.sort(key=lambda a: order_map.get(a.code, 999))
 
     return templates.TemplateResponse(
+        request,
         "confederations.html",
         {
-            "request": request,
             "q": q or "",
             "fifa": fifa,
             "regionals": regionals,
@@ -51,6 +56,8 @@ def confederations_page(
     )
 
 @router.get("/{ass_id}", response_class=HTMLResponse, response_model=None)
+@conditional("association", "country", "competition", "fixture")
+@cached_page(("association", "ass_id"), ("country", None), ("competition", None), ("fixture", None))
 def federation_detail(request: Request, ass_id: int, db: Session = Depends(get_db)):
     a = db.execute(select(Association).where(Association.ass_id == ass_id)).scalar_one_or_none()
     if not a:
@@ -139,10 +146,13 @@ def federation_detail(request: Request, ass_id: int, db: Session = Depends(get_d
     } for c in comps]
     intl_sorted = sorted(intl_vm, key=international_sort_key)
 
+    # --- Coefficient rankings (precomputed after fixture imports) ---
+    rankings = coefficient_rankings(db, a.ass_id)
+
     return templates.TemplateResponse(
+        request,
         "federation_detail.html",
         {
-            "request": request,
             "a": a,
             "level": level,
             "is_fifa": is_fifa,
@@ -152,5 +162,6 @@ def federation_detail(request: Request, ass_id: int, db: Session = Depends(get_d
             "countries_active": countries_active,  # confed or sub_confed
             "countries_former": countries_former,  # confed or sub_confed
             "intl_sorted": intl_sorted,
+            "rankings": rankings,
         },
     )
@@ -9,6 +9,8 @@ from sqlalchemy.orm import Session
 
 from ..db import get_db
 from ..core.templates import templates
+from ..core.data_version import conditional
+from ..core.page_cache import cached_page
 from ..models import Country, Association, Competition, Team
 from ..utils.comp_sort import international_sort_key
 
@@ -16,6 +18,8 @@ router = APIRouter(prefix="/countries", tags=["countries"])
 
 
 @router.get("", response_class=HTMLResponse)
+@conditional("country", "association")
+@cached_page(("country", None), ("association", None))
 def countries_page(
     request: Request,
     q: Optional[str] = Query(None, description="Search by country name"),
@@ -45,9 +49,9 @@ def countries_page(
         ass_map = {a.ass_id: a for a in assocs}
 
     return templates.TemplateResponse(
+        request,
         "countries.html",
         {
-            "request": request,
             "q": q or "",
             "active_countries": active_rows,
             "historical_countries": hist_rows,
@@ -57,6 +61,8 @@ def countries_page(
 
 
 @router.get("/{country_id}", response_class=HTMLResponse)
+@conditional("country", "association", "competition", "team")
+@cached_page(("country", "country_id"), ("association", None), ("competition", None), ("team", None))
 def country_detail_page(country_id: int, request: Request, db: Session = Depends(get_db)):
     # --- Country ---
     country: Optional[Country] = db.execute(
@@ -166,9 +172,9 @@ def country_detail_page(country_id: int, request: Request, db: Session = Depends
     fifa_png = (country.fifa_code.lower() + ".png") if getattr(country, "fifa_code", None) else None
 
     return templates.TemplateResponse(
+        request,
         "country_detail.html",
         {
-            "request": request,
             "country": country,
             "association": association,
             "leagues": leagues,
@@ -2,23 +2,29 @@ from datetime import datetime, date
 from fastapi import APIRouter, Depends, HTTPException, Request, Query
 from fastapi.responses import HTMLResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import select, and_
-from ..db import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, and_, text
+from ..db import get_db, get_async_db
 from ..models import Fixture, Team, Stadium
 from ..core.templates import templates
+from ..core.data_version import conditional
+from ..core.keyset import FIXTURE_KEYSET
+from ..services.match_model import predict_fixture
 
 router = APIRouter(prefix="/fixtures", tags=["fixtures"])
 
 @router.get("", response_class=HTMLResponse)
-def fixtures_page(
+@conditional("fixture", "team", "stadium")
+async def fixtures_page(
     request: Request,
     date_from: date | None = Query(None),
     date_to: date | None = Query(None),
     team_id: int | None = Query(None),
     limit: int = Query(100, ge=1, le=500),
-    db: Session = Depends(get_db),
+    cursor: str | None = Query(None, description="Next-page cursor from the previous page"),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    stmt = select(Fixture).order_by(Fixture.kickoff_utc.desc()).limit(limit)
+    stmt = select(Fixture)
 
     conds = []
     if date_from:
@@ -30,9 +36,11 @@ def fixtures_page(
         conds.append((Fixture.home_team_id == team_id) | (Fixture.away_team_id == team_id))
 
     if conds:
-        stmt = select(Fixture).where(and_(*conds)).order_by(Fixture.kickoff_utc.desc()).limit(limit)
+        stmt = stmt.where(and_(*conds))
 
-    rows = db.execute(stmt).scalars().all()
+    # newest first, by (kickoff_utc, fixture_id) keyset
+    page, next_cursor = FIXTURE_KEYSET.split((await db.execute(FIXTURE_KEYSET.page(stmt, cursor, limit))).all(), limit)
+    rows = [r[0] for r in page]
 
     # bulk fetch
     team_ids, stad_ids = set(), set()
@@ -45,18 +53,18 @@ def fixtures_page(
 
     teams_map = {}
     if team_ids:
-        teams = db.execute(select(Team).where(Team.team_id.in_(list(team_ids)))).scalars().all()
+        teams = (await db.execute(select(Team).where(Team.team_id.in_(list(team_ids))))).scalars().all()
         teams_map = {t.team_id: t for t in teams}
 
     stadiums_map = {}
     if stad_ids:
-        stadia = db.execute(select(Stadium).where(Stadium.stadium_id.in_(list(stad_ids)))).scalars().all()
+        stadia = (await db.execute(select(Stadium).where(Stadium.stadium_id.in_(list(stad_ids))))).scalars().all()
         stadiums_map = {s.stadium_id: s for s in stadia}
 
     return templates.TemplateResponse(
+        request,
         "fixtures.html",
         {
-            "request": request,
             "fixtures": rows,
             "teams": teams_map,
             "stadiums": stadiums_map,
@@ -64,10 +72,13 @@ def fixtures_page(
             "date_to": date_to.isoformat() if date_to else "",
             "team_id": team_id,
             "limit": limit,
+            "next_url": request.url.include_query_params(cursor=next_cursor) if next_cursor else None,
+            "first_url": request.url.remove_query_params("cursor") if cursor else None,
         },
     )
 
 @router.get("/{fixture_id}", response_class=HTMLResponse)
+@conditional("fixture", "team", "stadium", "season", "competition", "player")
 def fixture_detail_page(fixture_id: int, request: Request, db: Session = Depends(get_db)):
     f = db.execute(select(Fixture).where(Fixture.fixture_id == fixture_id)).scalar_one_or_none()
     if not f:
@@ -77,7 +88,19 @@ def fixture_detail_page(fixture_id: int, request: Request, db: Session = Depends
     winner = db.execute(select(Team).where(Team.team_id == f.winner_team_id)).scalar_one_or_none() if f.winner_team_id else None
     stadium = db.execute(select(Stadium).where(Stadium.stadium_id == f.stadium_id)).scalar_one_or_none() if f.stadium_id else None
 
+    # scoreline probabilities for matches still to play (stored model parameters, no fitting here)
+    prediction = None
+    if f.ft_home_score is None or f.ft_away_score is None:
+        season_id = db.execute(text("""
+            SELECT s.season_id FROM stage_round sr JOIN stage s ON s.stage_id = sr.stage_id
+            WHERE sr.stage_round_id = :rid
+        """), {"rid": f.stage_round_id}).scalar_one_or_none()
+        if season_id is not None:
+            prediction = predict_fixture(db, season_id, f.home_team_id, f.away_team_id)
+
     return templates.TemplateResponse(
+        request,
         "fixture_detail.html",
-        {"request": request, "f": f, "home": home, "away": away, "winner": winner, "stadium": stadium},
+        {"f": f, "home": home, "away": away, "winner": winner, "stadium": stadium,
+         "prediction": prediction},
     )
@@ -0,0 +1,48 @@
+from pathlib import PurePosixPath
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import FileResponse
+
+from ..core.assets import IMMUTABLE, asset_manifest, split_fingerprint
+from ..core.images import (
+    MEDIA_TYPES, SOURCE_FORMATS, WIDTHS, image_cache, negotiate_format, render_variant, variant_key,
+)
+
+router = APIRouter(prefix="/img", tags=["images"])
+
+
+@router.get("/{width}/{path:path}")
+def resized_image(width: int, path: str, request: Request):
+    """
+    `path` (a static image, plain or content-hashed) at most `width` pixels
+    wide, as AVIF / WebP when the Accept header allows. Rendered on first
+    request, then served from the disk cache.
+    """
+    if width not in WIDTHS:
+        raise HTTPException(400, f"Width must be one of {', '.join(map(str, WIDTHS))}")
+
+    real, digest = split_fingerprint(path)
+    if digest is not None and asset_manifest.get(path) is not None:
+        real, digest = path, None  # a real file whose name only looks hashed
+    info = asset_manifest.get(real)
+    source_format = SOURCE_FORMATS.get(PurePosixPath(real).suffix.lower())
+    if info is None or not real.startswith("images/") or source_format is None:
+        raise HTTPException(404, "Image not found")
+
+    fmt = negotiate_format(request.headers.get("accept", ""), source_format)
+    name = variant_key(real, info.mtime, info.size, width, fmt)
+    cached = image_cache.get(name)
+    if cached is None:
+        cached = image_cache.put(name, render_variant(asset_manifest.root / real, width, fmt))
+
+    if digest is None:
+        cache_control = "public, max-age=86400"
+    elif digest == asset_manifest.digest(real):
+        cache_control = IMMUTABLE
+    else:
+        cache_control = "no-cache"
+    return FileResponse(
+        cached,
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Cache-Control": cache_control, "Vary": "Accept"},
+    )
@@ -6,17 +6,18 @@ from io import TextIOWrapper
 from ..db import get_db
 from ..core.templates import templates
 from ..services.importers import import_rows, get_importer
-from ..services.importers.utils.bulk_team_sync import ensure_club_teams, ensure_national_teams  
 
 
 router = APIRouter(prefix="/import", tags=["import"])
 
 @router.get("", response_class=HTMLResponse)
 def import_page(request: Request):
-    return templates.TemplateResponse("import.html", {"request": request})
+    return templates.TemplateResponse(request, "import.html")
 
+# sync def: imports and the derived-data rebuild after them run in the
+# threadpool, not on the event loop
 @router.post("/csv")
-async def import_csv(
+def import_csv(
     request: Request,
     entity: str = Query(..., regex="^(country|countries|club|clubs|competition|competitions|player|players|coach|coaches|official|officials|stadium|stadiums|season|seasons|stage|stages|stage_round|stage_rounds|stage_group|stage_groups|stage_group_team|stage_group_teams|team|teams|fixture|fixtures|association|associations)$"),
     file: UploadFile = File(...),
@@ -38,13 +39,8 @@ async def import_csv(
         return JSONResponse({"inserted": 0, "skipped": 0, "errors": [], "entity": entity, "message": "No data"}, 200)
 
     try:
-        result = import_rows(entity, rows, db)  
-        if entity in ("club", "clubs"):
-            with db.begin():
-                ensure_club_teams(db)
-        elif entity in ("country", "countries"):
-            with db.begin():
-                ensure_national_teams(db)
+        # clubs / countries create their default teams in the importer's after_commit
+        result = import_rows(entity, rows, db)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Import failed: {e}")
 
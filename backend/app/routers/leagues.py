@@ -1,126 +1,81 @@
 from fastapi import APIRouter, Depends, HTTPException, Request, Query
 from fastapi.responses import HTMLResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import text, select
+from sqlalchemy import text
 from ..db import get_db
 from ..core.templates import templates
-from ..models import Season, Stage
+from ..core.data_version import conditional
+from ..core.page_cache import cached_page
+from ..core.cache import LRUCache
+from ..services.season_data import season_fixture_version, season_inputs
+from ..services.season_sim import load_season_simulation, simulate_season, place_probability, SIM_PAGE_SEASONS
+from ..services.scenarios import league_scenarios, load_league_scenarios, EUROPE_PLACES, RELEGATION_PLACES
+from ..services.form_guide import season_form
+from ..services.table_variants import season_table_variants, season_points_rule, season_points_adjustments, VARIANT_LABELS
+from ..services.season_structure import load_season_structure, stage_of_format
 
 router = APIRouter(prefix="/competitions/{comp_id}/seasons/{season_id}/league", tags=["league"])
 
-def _get_league_stage_id(db: Session, season_id: int) -> int:
-    """
-    Return the stage_id of the league-format stage for this season.
-    Pick the first stage with format='league' (or fallback to lowest stage_order).
-    """
-    # Prefer declared format='league'
-    row = db.execute(
-        select(Stage.stage_id)
-        .where(Stage.season_id == season_id)
-        .where(Stage.format.ilike("league"))
-        .order_by(Stage.stage_order.asc())
-        .limit(1)
-    ).scalar_one_or_none()
-    if row:
-        return int(row)
+# Computed tables per (season, fixture version, ...) — same key as the form guide
+_standings_cache = LRUCache(maxsize=256)
 
-    # Fallback: just take the first stage in order
-    row = db.execute(
-        select(Stage.stage_id)
-        .where(Stage.season_id == season_id)
-        .order_by(Stage.stage_order.asc())
-        .limit(1)
-    ).scalar_one_or_none()
+def _season_structure(db: Session, comp_id: int, season_id: int) -> dict:
+    """Cached season structure; 404 unless the season belongs to the competition."""
+    structure = load_season_structure(db, season_id)
+    if not structure or structure["competition_id"] != comp_id:
+        raise HTTPException(404, "Season not found for this competition")
+    return structure
 
-    if not row:
+
+def _league_stage(structure: dict) -> dict:
+    """
+    The league-format stage of the season: the first stage with format='league'
+    (or fallback to lowest stage_order).
+    """
+    stage = stage_of_format(structure, "league") or (structure["stages"][0] if structure["stages"] else None)
+    if not stage:
         raise HTTPException(404, "No stage found for this season")
-    return int(row)
+    return stage
 
 @router.get("/table", response_class=HTMLResponse)
+@conditional("competition", "season", "fixture", "team")
+@cached_page(("competition", "comp_id"), ("season", "season_id"), ("team", None))
 def league_table(comp_id: int, season_id: int, request: Request, db: Session = Depends(get_db)):
     """
-    Compute a classic 3-1-0 league table for fixtures of this season where FT scores exist.
-    Uses: fixture.ft_home_score / ft_away_score as the final result.
+    League table of this season's played fixtures (FT scores) under the season's
+    points rule, with home / away / first-half / second-half variants.
+    All variants come from one aggregation; the tabs switch client-side.
     """
     # Ensure season exists & belongs to comp
-    season = db.execute(
-        select(Season).where(Season.season_id == season_id, Season.competition_id == comp_id)
-    ).scalar_one_or_none()
-    if not season:
-        raise HTTPException(404, "Season not found for this competition")
+    _season_structure(db, comp_id, season_id)
 
-    sql = text("""
-        WITH season_fixtures AS (
-          SELECT f.*
-          FROM fixture f
-          JOIN stage_round sr ON sr.stage_round_id = f.stage_round_id
-          JOIN stage s ON s.stage_id = sr.stage_id
-          JOIN season se ON se.season_id = s.season_id
-          WHERE se.season_id = :season_id
-            AND f.ft_home_score IS NOT NULL
-            AND f.ft_away_score IS NOT NULL
-        ),
-        home AS (
-          SELECT home_team_id AS team_id,
-                 COUNT(*) AS pld,
-                 SUM(CASE WHEN ft_home_score > ft_away_score THEN 1 ELSE 0 END) AS w,
-                 SUM(CASE WHEN ft_home_score = ft_away_score THEN 1 ELSE 0 END) AS d,
-                 SUM(CASE WHEN ft_home_score < ft_away_score THEN 1 ELSE 0 END) AS l,
-                 SUM(ft_home_score) AS gf,
-                 SUM(ft_away_score) AS ga
-          FROM season_fixtures
-          GROUP BY home_team_id
-        ),
-        away AS (
-          SELECT away_team_id AS team_id,
-                 COUNT(*) AS pld,
-                 SUM(CASE WHEN ft_away_score > ft_home_score THEN 1 ELSE 0 END) AS w,
-                 SUM(CASE WHEN ft_away_score = ft_home_score THEN 1 ELSE 0 END) AS d,
-                 SUM(CASE WHEN ft_away_score < ft_home_score THEN 1 ELSE 0 END) AS l,
-                 SUM(ft_away_score) AS gf,
-                 SUM(ft_home_score) AS ga
-          FROM season_fixtures
-          GROUP BY away_team_id
-        ),
-        agg AS (
-          SELECT COALESCE(h.team_id, a.team_id) AS team_id,
-                 COALESCE(h.pld,0) + COALESCE(a.pld,0) AS pld,
-                 COALESCE(h.w,0)   + COALESCE(a.w,0)   AS w,
-                 COALESCE(h.d,0)   + COALESCE(a.d,0)   AS d,
-                 COALESCE(h.l,0)   + COALESCE(a.l,0)   AS l,
-                 COALESCE(h.gf,0)  + COALESCE(a.gf,0)  AS gf,
-                 COALESCE(h.ga,0)  + COALESCE(a.ga,0)  AS ga
-          FROM home h
-          FULL OUTER JOIN away a ON a.team_id = h.team_id
-        )
-        SELECT t.team_id, t.name,
-               a.pld, a.w, a.d, a.l, a.gf, a.ga,
-               (a.gf - a.ga) AS gd,
-               (a.w*3 + a.d) AS pts
-        FROM agg a
-        JOIN team t ON t.team_id = a.team_id
-        ORDER BY pts DESC, gd DESC, gf DESC, t.name ASC;
-    """)
-    rows = db.execute(sql, {"season_id": season_id}).mappings().all()
+    version = season_fixture_version(db, season_id)
+    variants = season_table_variants(db, season_id, version=version)
+    form = season_form(db, season_id, version=version)
 
     return templates.TemplateResponse(
+        request,
         "league_table.html",
-        {"request": request, "competition_id": comp_id, "season_id": season_id, "table": rows},
+        {
+            "competition_id": comp_id,
+            "season_id": season_id,
+            "table": variants["overall"],
+            "variants": variants,
+            "variant_labels": VARIANT_LABELS,
+            "form": form,
+        },
     )
 
 @router.get("/matchday/{n}", response_class=HTMLResponse)
+@conditional("competition", "season", "fixture", "team")
+@cached_page(("competition", "comp_id"), ("season", "season_id"), ("team", None))
 def league_matchday(comp_id: int, season_id: int, n: int, request: Request, db: Session = Depends(get_db)):
     """
     Show fixtures for matchday n (stage_round.stage_round_order = n) of the league stage of this season.
     """
-    # Validate season and get the league stage id
-    season = db.execute(
-        select(Season).where(Season.season_id == season_id, Season.competition_id == comp_id)
-    ).scalar_one_or_none()
-    if not season:
-        raise HTTPException(404, "Season not found for this competition")
-
-    league_stage_id = _get_league_stage_id(db, season_id)
+    # Validate season and get the league stage
+    league_stage = _league_stage(_season_structure(db, comp_id, season_id))
+    league_stage_id = league_stage["stage_id"]
 
     fixtures_sql = text("""
         SELECT f.fixture_id, f.kickoff_utc, f.fixture_status,
@@ -140,13 +95,12 @@ def league_matchday(comp_id: int, season_id: int, n: int, request: Request, db:
         raise HTTPException(404, f"No fixtures for matchday {n}")
 
     # total matchdays for this league stage
-    total_sql = text("SELECT COUNT(*) FROM stage_round WHERE stage_id = :stage_id;")
-    total_matchdays = db.execute(total_sql, {"stage_id": league_stage_id}).scalar_one()
+    total_matchdays = len(league_stage["rounds"])
 
     return templates.TemplateResponse(
+        request,
         "league_matchday.html",
         {
-            "request": request,
             "competition_id": comp_id,
             "season_id": season_id,
             "n": n,
@@ -155,6 +109,8 @@ def league_matchday(comp_id: int, season_id: int, n: int, request: Request, db:
         },
     )
 @router.get("/overview", response_class=HTMLResponse)
+@conditional("competition", "season", "fixture", "team", "simulation")
+@cached_page(("competition", "comp_id"), ("season", "season_id"), ("team", None))
 def league_overview(
     comp_id: int,
     season_id: int,
@@ -162,32 +118,21 @@ def league_overview(
     md: int | None = Query(default=None, description="Matchday to preview; default = last completed"),
     db: Session = Depends(get_db),
 ):
-    # Validate season
-    season = db.execute(
-        select(Season).where(Season.season_id == season_id, Season.competition_id == comp_id)
-    ).scalar_one_or_none()
-    if not season:
-        raise HTTPException(404, "Season not found for this competition")
-
-    # Identify league stage
-    league_stage_id = _get_league_stage_id(db, season_id)
+    # Validate season and identify league stage (cached structure, no queries when warm)
+    league_stage = _league_stage(_season_structure(db, comp_id, season_id))
+    league_stage_id = league_stage["stage_id"]
 
     # Total matchdays
-    total_matchdays = db.execute(
-        text("SELECT COUNT(*) FROM stage_round WHERE stage_id = :sid"), {"sid": league_stage_id}
-    ).scalar_one()
+    total_matchdays = len(league_stage["rounds"])
 
     # Choose default md = last matchday that has any FT score present
     if md is None:
-        last_md = db.execute(text("""
-            SELECT COALESCE(MAX(sr.stage_round_order), 1)
-            FROM stage_round sr
-            JOIN fixture f ON f.stage_round_id = sr.stage_round_id
-            WHERE sr.stage_id = :sid
-              AND f.ft_home_score IS NOT NULL
-              AND f.ft_away_score IS NOT NULL
-        """), {"sid": league_stage_id}).scalar_one()
-        md = last_md or 1
+        played = [r["stage_round_order"] for r in league_stage["rounds"] if r["n_played"]]
+        md = max(played) if played else 1
+
+    version = season_fixture_version(db, season_id)
+    points_rule = season_points_rule(db, season_id)
+    adjustments = season_points_adjustments(db, season_id)
 
     # ---- Final standings (snapshot if exists; else compute full season) ----
     has_snapshot = db.execute(text("""
@@ -199,7 +144,7 @@ def league_overview(
 
     if has_snapshot:
         final_rows = db.execute(text("""
-            SELECT lts.position, t.name, lts.played, lts.wins, lts.draws, lts.losses,
+            SELECT lts.position, lts.team_id, t.name, lts.played, lts.wins, lts.draws, lts.losses,
                    lts.goals_for AS gf, lts.goals_against AS ga, lts.goal_diff AS gd,
                    lts.points AS pts, lts.notes
             FROM league_table_snapshot lts
@@ -208,7 +153,7 @@ def league_overview(
             ORDER BY lts.position ASC, t.name ASC
         """), {"season_id": season_id}).mappings().all()
     else:
-        final_rows = _compute_standings(db, season_id, up_to_matchday=None)  # all MDs
+        final_rows = _cached_standings(db, season_id, None, version, points_rule, adjustments)  # all MDs
 
     # ---- Fixtures for selected matchday ----
     fixtures = db.execute(text("""
@@ -224,12 +169,55 @@ def league_overview(
     """), {"sid": league_stage_id, "n": md}).mappings().all()
 
     # ---- Standings as of selected matchday ----
-    md_rows = _compute_standings(db, season_id, up_to_matchday=md)
+    md_rows = _cached_standings(db, season_id, md, version, points_rule, adjustments)
+
+    # ---- Form guide / streaks (one query per table, cached with the standings) ----
+    final_form = season_form(db, season_id, version=version)
+    md_form = season_form(db, season_id, up_to_matchday=md, version=version, stage_id=league_stage_id)
+
+    # ---- Simulated outcome probabilities (stored in the background after imports) ----
+    inputs = season_inputs(version, points_rule, adjustments)
+    sim = load_season_simulation(db, season_id, inputs)
+    if sim is None:
+        # no run for the current fixtures / rule / adjustments yet: small in-request run
+        sim = simulate_season(
+            db,
+            season_id,
+            points_rule=points_rule,
+            adjustments=adjustments,
+            n_seasons=SIM_PAGE_SEASONS,
+        )
+    sim_rows = []
+    if sim:
+        n = sim["n_teams"]
+        for t in sim["teams"]:
+            sim_rows.append({
+                **t,
+                "p_title": place_probability(t, 1, 1),
+                "p_europe": place_probability(t, 1, EUROPE_PLACES),
+                "p_relegation": place_probability(t, n - RELEGATION_PLACES + 1, n),
+            })
+
+    # ---- Clinched / eliminated per target (exact in the last matchdays, stored after imports) ----
+    scenarios = None
+    if sim and sim["n_remaining"]:
+        scenarios = load_league_scenarios(db, season_id, league_stage_id, inputs)
+        if scenarios is None:
+            # not computed yet: bound check only, no enumeration in the request
+            scenarios = league_scenarios(
+                db,
+                season_id,
+                league_stage_id,
+                points_rule=points_rule,
+                adjustments=adjustments,
+                version=version,
+                max_games_left=0,
+            )
 
     return templates.TemplateResponse(
+        request,
         "league_overview.html",
         {
-            "request": request,
             "competition_id": comp_id,
             "season_id": season_id,
             "total_matchdays": total_matchdays,
@@ -237,40 +225,37 @@ def league_overview(
             "final_rows": final_rows,
             "fixtures": fixtures,
             "md_rows": md_rows,
+            "final_form": final_form,
+            "md_form": md_form,
+            "sim": sim,
+            "sim_rows": sim_rows,
+            "scen": scenarios,
+            "europe_places": EUROPE_PLACES,
+            "relegation_places": RELEGATION_PLACES,
         },
     )
 
 
-def _get_points_rule(db: Session, season_id: int) -> tuple[int, int, int]:
-    row = db.execute(text("""
-        SELECT win_points, draw_points, loss_points
-        FROM season_points_rule
-        WHERE season_id = :sid
-    """), {"sid": season_id}).first()
-    return (row[0], row[1], row[2]) if row else (3, 1, 0)
-
-
-def _get_points_adjustments(db: Session, season_id: int) -> dict[int, int]:
-    has_table = db.execute(text("""
-        SELECT EXISTS (
-          SELECT 1 FROM information_schema.tables
-          WHERE table_name = 'league_points_adjustment'
-        )
-    """)).scalar_one()
-    if not has_table:
-        return {}
-    rows = db.execute(text("""
-        SELECT team_id, COALESCE(SUM(points_delta),0) AS delta
-        FROM league_points_adjustment
-        WHERE season_id = :sid
-        GROUP BY team_id
-    """), {"sid": season_id}).mappings().all()
-    return {r["team_id"]: r["delta"] for r in rows}
+def _cached_standings(
+    db: Session,
+    season_id: int,
+    up_to_matchday: int | None,
+    version: tuple,
+    points_rule: tuple[int, int, int],
+    adjustments: dict[int, int],
+) -> list[dict]:
+    # rule/adjustments live outside the fixture table, so they are part of the key
+    key = ("standings", season_id, version, up_to_matchday, points_rule, tuple(sorted(adjustments.items())))
+    rows = _standings_cache.get(key)
+    if rows is None:
+        rows = [dict(r) for r in _compute_standings(db, season_id, up_to_matchday)]
+        _standings_cache.set(key, rows)
+    return rows
 
 
 def _compute_standings(db: Session, season_id: int, up_to_matchday: int | None):
     # Points rule
-    win_pts, draw_pts, loss_pts = _get_points_rule(db, season_id)
+    win_pts, draw_pts, loss_pts = season_points_rule(db, season_id)
     # Up-to filter (for "as-of matchday")
     md_filter = "TRUE" if up_to_matchday is None else "sr.stage_round_order <= :md"
 
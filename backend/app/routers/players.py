@@ -6,10 +6,13 @@ from ..db import get_db
 from ..models import Person, Player, Country
 from ..schemas import PlayerCreate, PlayerRead, PersonRead
 from ..core.templates import templates
+from ..core.data_version import conditional
+from ..core.keyset import PLAYER_KEYSET
 
 router = APIRouter(prefix="/players", tags=["players"])
 
 @router.get("", response_class=HTMLResponse)
+@conditional("player", "country")
 def players_page(
     request: Request,
     q: str | None = None,
@@ -17,6 +20,7 @@ def players_page(
     position: str | None = None,  # 'GK','DF','MF','FW'
     active: str | None = None,    # 'true' / 'false'
     limit: int = 200,
+    cursor: str | None = None,    # next-page cursor from the previous page
     db: Session = Depends(get_db),
 ):
     # Base query: we want Player rows, but we’ll join Person for filtering
@@ -50,11 +54,12 @@ def players_page(
             )
             stmt = stmt.where(Person.country_id.in_(sub))
 
-    rows = db.execute(stmt.order_by(Person.full_name).limit(limit)).all()
+    # by (full_name, person_id) keyset
+    rows, next_cursor = PLAYER_KEYSET.split(db.execute(PLAYER_KEYSET.page(stmt, cursor, limit)).all(), limit)
 
     # Split back to lists and maps that the template expects
-    player_list = [p for (p, _pe) in rows]
-    person_ids = {pe.person_id for (_p, pe) in rows}
+    player_list = [r.Player for r in rows]
+    person_ids = {r.Person.person_id for r in rows}
     persons_rows = db.execute(
         select(Person).where(Person.person_id.in_(person_ids))
     ).scalars().all()
@@ -71,9 +76,9 @@ def players_page(
     countries = {c.country_id: c for c in countries_rows}
 
     return templates.TemplateResponse(
+        request,
         "players.html",
         {
-            "request": request,
             "players": player_list,
             "persons": persons,
             "countries": countries,
@@ -82,10 +87,13 @@ def players_page(
             "position": position or "",
             "active": active,
             "limit": limit,
+            "next_url": request.url.include_query_params(cursor=next_cursor) if next_cursor else None,
+            "first_url": request.url.remove_query_params("cursor") if cursor else None,
         },
     )
 
 @router.get("/{player_id}", response_class=HTMLResponse)
+@conditional("player", "team", "club", "fixture")
 def player_detail_page(player_id: int, request: Request, db: Session = Depends(get_db)):
     p = db.execute(select(Player).where(Player.player_id == player_id)).scalar_one_or_none()
     if not p:
@@ -98,9 +106,9 @@ def player_detail_page(player_id: int, request: Request, db: Session = Depends(g
         country = db.execute(select(Country).where(Country.country_id == pe.country_id)).scalar_one_or_none()
 
     return templates.TemplateResponse(
+        request,
         "player_detail.html",
         {
-            "request": request,
             "player": p,
             "person": pe,
             "country": country,
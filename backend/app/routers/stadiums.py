@@ -8,7 +8,9 @@ from sqlalchemy.orm import Session
 from sqlalchemy import select, func
 
 from ..db import get_db
-from ..core.templates import templates
+from ..core.templates import templates, static_url, image_url
+from ..core.data_version import conditional
+from ..core.page_cache import cached_page
 from ..models import Country, Stadium
 
 router = APIRouter(prefix="/stadiums", tags=["Stadiums"])
@@ -36,6 +38,8 @@ def _status_clause(status: str):
     return Stadium.closed_year.is_(None)
 
 @router.get("", response_class=HTMLResponse, response_model=None)
+@conditional("stadium", "country")
+@cached_page(("stadium", None), ("country", None))
 def stadiums_index(
     request: Request,
     q: str = "",
@@ -116,9 +120,9 @@ def stadiums_index(
     closed_grouped = sort_groups(closed_map)
 
     return templates.TemplateResponse(
+        request,
         "stadiums.html",
         {
-            "request": request,
             "q": q,
             "status": status,
             "active_grouped": active_grouped,
@@ -127,6 +131,8 @@ def stadiums_index(
     )
 
 @router.get("/{stadium_id}", response_class=HTMLResponse, response_model=None)
+@conditional("stadium", "country", "club")
+@cached_page(("stadium", "stadium_id"), ("country", None), ("club", None))
 def stadium_detail(request: Request, stadium_id: int, db: Session = Depends(get_db)):
     stmt = (
         select(
@@ -153,12 +159,13 @@ def stadium_detail(request: Request, stadium_id: int, db: Session = Depends(get_
         return RedirectResponse("/stadiums", status_code=303)
 
     country_slug = slugify_country(r.country_name)
-    image_url = f"/static/images/stadiums/{country_slug}/{r.photo_filename}" if r.photo_filename else "/static/images/stadiums/stadium.png"
+    photo_rel = f"images/stadiums/{country_slug}/{r.photo_filename}" if r.photo_filename else "images/stadiums/stadium.png"
+    full_url = static_url(photo_rel)
 
     return templates.TemplateResponse(
+        request,
         "stadiums_detail.html",
         {
-            "request": request,
             "stadium": {
                 "id": r.stadium_id,
                 "name": r.name,
@@ -170,7 +177,8 @@ def stadium_detail(request: Request, stadium_id: int, db: Session = Depends(get_
                 "tenants": r.tenants,
                 "lat": r.lat,
                 "lng": r.lng,
-                "image_url": image_url,
+                "image_url": full_url,
+                "display_url": image_url(photo_rel, 768),
             },
             "country": {
                 "id": r.country_id,
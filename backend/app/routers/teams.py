@@ -1,4 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, Request, Query
+from datetime import date
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, Query
 from fastapi.responses import HTMLResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import select, and_, func
@@ -6,10 +8,17 @@ from ..db import get_db
 from ..models import Team, Club, Country
 from ..schemas import TeamRead, TeamCreate  # make sure TeamCreate exists (we shared a definition earlier)
 from ..core.templates import templates
+from ..core.data_version import conditional, bump_versions
+from ..core.page_cache import invalidate_pages
+from ..core.keyset import TEAM_KEYSET, next_link
+from ..services.elo import rating_card
+from ..services.world_ranking import ranking_as_of
+from ..services.records import records_for
 
 router = APIRouter(prefix="/teams", tags=["teams"])
 
 @router.get("", response_class=HTMLResponse)
+@conditional("team", "club", "country")
 def teams_page(
     request: Request,
     q: str | None = Query(None),
@@ -17,6 +26,7 @@ def teams_page(
     country_id: int | None = Query(None, description="Filter national teams by country_id"),
     club_id: int | None = Query(None, description="Filter club teams by club_id"),
     limit: int = Query(200, ge=1, le=1000),
+    cursor: str | None = Query(None, description="Next-page cursor from the previous page"),
     db: Session = Depends(get_db),
 ):
     stmt = select(Team)
@@ -41,7 +51,9 @@ def teams_page(
     if conds:
         stmt = stmt.where(and_(*conds))
 
-    rows = db.execute(stmt.order_by(Team.type.asc(), Team.name.asc()).limit(limit)).scalars().all()
+    # by (type, name, team_id) keyset
+    page, next_cursor = TEAM_KEYSET.split(db.execute(TEAM_KEYSET.page(stmt, cursor, limit)).all(), limit)
+    rows = [r.Team for r in page]
 
     # Hydrate related objects for display
     club_ids = {t.club_id for t in rows if t.club_id}
@@ -58,9 +70,9 @@ def teams_page(
         countries_map = {c.country_id: c for c in countries}
 
     return templates.TemplateResponse(
+        request,
         "teams.html",
         {
-            "request": request,
             "teams": rows,
             "q": q or "",
             "type": type or "",
@@ -69,11 +81,29 @@ def teams_page(
             "limit": limit,
             "clubs": clubs_map,
             "countries": countries_map,
+            "next_url": request.url.include_query_params(cursor=next_cursor) if next_cursor else None,
+            "first_url": request.url.remove_query_params("cursor") if cursor else None,
         },
     )
 
 
-@router.get("/{team_id}", response_class=HTMLResponse)
+@router.get("/world-ranking", response_class=HTMLResponse)
+@conditional("team", "fixture")
+def world_ranking_page(
+    request: Request,
+    db: Session = Depends(get_db),
+    as_of: date | None = Query(None, alias="date"),
+):
+    ranking = ranking_as_of(db, as_of)
+    return templates.TemplateResponse(
+        request,
+        "world_ranking.html",
+        {"ranking": ranking, "as_of": as_of},
+    )
+
+
+@router.get("/{team_id:int}", response_class=HTMLResponse)
+@conditional("team", "club", "country", "fixture")
 def team_detail_page(team_id: int, request: Request, db: Session = Depends(get_db)):
     t = db.execute(select(Team).where(Team.team_id == team_id)).scalar_one_or_none()
     if not t:
@@ -87,19 +117,44 @@ def team_detail_page(team_id: int, request: Request, db: Session = Depends(get_d
     if t.national_country_id:
         country = db.execute(select(Country).where(Country.country_id == t.national_country_id)).scalar_one_or_none()
 
+    elo = rating_card(db, t.team_id)
+
     return templates.TemplateResponse(
+        request,
         "team_detail.html",
-        {"request": request, "t": t, "club": club, "country": country},
+        {"t": t, "club": club, "country": country, "elo": elo},
+    )
+
+
+@router.get("/{team_id:int}/records", response_class=HTMLResponse)
+@conditional("team", "fixture")
+def team_records_page(team_id: int, request: Request, db: Session = Depends(get_db)):
+    t = db.execute(select(Team).where(Team.team_id == team_id)).scalar_one_or_none()
+    if not t:
+        raise HTTPException(status_code=404, detail="Team not found")
+
+    return templates.TemplateResponse(
+        request,
+        "records.html",
+        {
+            "title": f"{t.name} – Records",
+            "back_url": f"/teams/{team_id}",
+            "records": records_for(db, "team", team_id),
+        },
     )
 
 
 @router.get("/api", response_model=list[TeamRead])
+@conditional("team")
 def list_teams(
+    request: Request,
+    response: Response,
     q: str | None = None,
     type: str | None = None,
     country_id: int | None = None,
     club_id: int | None = None,
     limit: int = 200,
+    cursor: str | None = None,    # next-page cursor, from the Link header of the previous page
     db: Session = Depends(get_db),
 ):
     stmt = select(Team)
@@ -122,8 +177,9 @@ def list_teams(
     if conds:
         stmt = stmt.where(and_(*conds))
 
-    rows = db.execute(stmt.order_by(Team.type.asc(), Team.name.asc()).limit(limit)).scalars().all()
-    return [TeamRead.model_validate(r) for r in rows]
+    rows, next_cursor = TEAM_KEYSET.split(db.execute(TEAM_KEYSET.page(stmt, cursor, limit)).all(), limit)
+    response.headers.update(next_link(request, next_cursor))
+    return [TeamRead.model_validate(r.Team) for r in rows]
 
 
 @router.post("/api", response_model=TeamRead)
@@ -163,4 +219,6 @@ def create_team(payload: TeamCreate, db: Session = Depends(get_db)):
     db.add(row)
     db.commit()
     db.refresh(row)
+    bump_versions("team")
+    invalidate_pages("team")
     return TeamRead.model_validate(row)
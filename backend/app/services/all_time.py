@@ -0,0 +1,87 @@
+"""
+All-time / multi-season tables of a competition.
+
+Reads the per-(competition, season, team) rows of mv_team_season_totals and
+mv_head_to_head_season (see schema.sql) and sums them over the selected
+seasons, so a season range never touches the fixture table. Points use each
+season's points rule; point deductions are not carried into all-time tables.
+"""
+from __future__ import annotations
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+ALL_TIME_VIEWS = ("mv_team_season_totals", "mv_head_to_head_season")
+
+
+def refresh_all_time_views(db: Session) -> None:
+    """Refresh the aggregates without blocking readers. Caller commits."""
+    for view in ALL_TIME_VIEWS:
+        db.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view}"))
+
+
+def competition_seasons(db: Session, competition_id: int) -> list[dict]:
+    """Seasons of a competition, oldest first."""
+    rows = db.execute(text("""
+        SELECT season_id, name, start_date
+        FROM season
+        WHERE competition_id = :cid
+        ORDER BY start_date ASC NULLS LAST, name ASC
+    """), {"cid": competition_id}).mappings().all()
+    return [dict(r) for r in rows]
+
+
+def season_range(seasons: list[dict], from_id: int | None, to_id: int | None) -> list[dict]:
+    """Slice of `seasons` (oldest first) between two season ids, inclusive; open ends allowed."""
+    ids = [s["season_id"] for s in seasons]
+    lo = ids.index(from_id) if from_id in ids else 0
+    hi = ids.index(to_id) if to_id in ids else len(ids) - 1
+    if lo > hi:
+        lo, hi = hi, lo
+    return seasons[lo:hi + 1]
+
+
+def all_time_table(db: Session, competition_id: int, season_ids: list[int]) -> list[dict]:
+    if not season_ids:
+        return []
+    rows = db.execute(text("""
+        SELECT ROW_NUMBER() OVER (ORDER BY x.pts DESC, x.gf - x.ga DESC, x.gf DESC, t.name ASC)::INT AS position,
+               x.team_id, t.name, x.seasons,
+               x.pld, x.w, x.d, x.l, x.gf, x.ga, (x.gf - x.ga) AS gd, x.pts
+        FROM (
+          SELECT m.team_id,
+                 COUNT(*)  AS seasons,
+                 SUM(m.pld) AS pld, SUM(m.w) AS w, SUM(m.d) AS d, SUM(m.l) AS l,
+                 SUM(m.gf)  AS gf,  SUM(m.ga) AS ga,
+                 SUM(m.w * COALESCE(r.win_points, 3)
+                     + m.d * COALESCE(r.draw_points, 1)
+                     + m.l * COALESCE(r.loss_points, 0)) AS pts
+          FROM mv_team_season_totals m
+          LEFT JOIN season_points_rule r ON r.season_id = m.season_id
+          WHERE m.competition_id = :cid
+            AND m.season_id = ANY(:sids)
+          GROUP BY m.team_id
+        ) x
+        JOIN team t ON t.team_id = x.team_id
+        ORDER BY position ASC
+    """), {"cid": competition_id, "sids": season_ids}).mappings().all()
+    return [dict(r) for r in rows]
+
+
+def head_to_head(db: Session, competition_id: int, team_id: int, season_ids: list[int]) -> list[dict]:
+    """Record of one team against every opponent it met in the selected seasons."""
+    if not season_ids:
+        return []
+    rows = db.execute(text("""
+        SELECT h.opponent_id, t.name AS opponent_name,
+               SUM(h.pld) AS pld, SUM(h.w) AS w, SUM(h.d) AS d, SUM(h.l) AS l,
+               SUM(h.gf) AS gf, SUM(h.ga) AS ga
+        FROM mv_head_to_head_season h
+        JOIN team t ON t.team_id = h.opponent_id
+        WHERE h.competition_id = :cid
+          AND h.team_id = :tid
+          AND h.season_id = ANY(:sids)
+        GROUP BY h.opponent_id, t.name
+        ORDER BY SUM(h.pld) DESC, t.name ASC
+    """), {"cid": competition_id, "tid": team_id, "sids": season_ids}).mappings().all()
+    return [dict(r) for r in rows]
@@ -0,0 +1,249 @@
+"""
+Club and country coefficients (UEFA-style) per organizing confederation.
+
+Only international club competitions count: organizer = the confederation,
+no country, cup_rank "Clubs", men's senior. Per season (keyed by the year it
+starts) a club earns
+
+  match points — 2 per win, 1 per draw (after extra time; shoot-outs are
+                 draws); halved in qualifying, i.e. stages before the first
+                 groups/league stage of a season that has one
+  bonus points — GROUP_STAGE_BONUS for playing in the groups/league stage and
+                 KO_ROUND_BONUS per knockout tie after it
+
+with bonuses scaled by the competition tier. A country's season points are
+its clubs' points divided by the number of clubs it entered. Rankings sum the
+latest WINDOW season years.
+
+Season rows are rebuilt only for the (confederation, year) pairs touched by a
+fixture import, then that confederation's rankings are rewritten (see
+importers/utils/fixture_sync.py); pages read coefficient_ranking only.
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Iterable
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+WINDOW = 5
+WIN_POINTS, DRAW_POINTS = 2.0, 1.0
+QUALIFYING_FACTOR = 0.5
+GROUP_STAGE_BONUS = 4.0
+KO_ROUND_BONUS = 1.0
+TIER_FACTOR = {1: 1.0, 2: 0.5, 3: 0.25}
+RANKING_LIMIT = 50
+
+# international men's senior club competitions; season year = start year
+_COMP_FILTER = """
+    c.country_id IS NULL
+    AND lower(COALESCE(c.cup_rank, '')) IN ('clubs', 'club')
+    AND lower(COALESCE(c.gender, 'men')) IN ('m', 'men', 'male')
+    AND lower(COALESCE(c.age_group, 'senior')) IN ('senior', 'open')
+"""
+_SEASON_YEAR = "COALESCE(EXTRACT(YEAR FROM se.start_date)::INT, substring(se.name from '^[0-9]{4}')::INT)"
+
+
+def touched_pairs(db: Session, season_ids: Iterable[int]) -> list[tuple[int, int]]:
+    """(confederation ass_id, season year) of the given seasons that count for coefficients."""
+    ids = list(season_ids)
+    if not ids:
+        return []
+    rows = db.execute(text(f"""
+        SELECT DISTINCT c.organizer_ass_id, {_SEASON_YEAR} AS season_year
+        FROM season se
+        JOIN competition c ON c.competition_id = se.competition_id
+        WHERE se.season_id = ANY(:ids)
+          AND c.organizer_ass_id IS NOT NULL
+          AND {_COMP_FILTER}
+    """), {"ids": ids}).all()
+    return [(int(a), int(y)) for a, y in rows if y is not None]
+
+
+def rebuild_season_points(db: Session, ass_id: int, season_year: int) -> None:
+    """Recompute club and country points of one confederation-year. Caller commits."""
+    params = {"ass": ass_id, "year": season_year}
+    # stages with their competition tier, and whether they are qualifying / after the group stage
+    stages = db.execute(text(f"""
+        SELECT s.stage_id, s.format, c.tier,
+               s.stage_order < COALESCE(g.first_main, 0) AS qualifying,
+               (g.first_main IS NOT NULL AND s.stage_order > g.first_main) AS after_groups
+        FROM season se
+        JOIN competition c ON c.competition_id = se.competition_id
+        JOIN stage s ON s.season_id = se.season_id
+        LEFT JOIN (
+          SELECT season_id, MIN(stage_order) AS first_main
+          FROM stage
+          WHERE format IN ('groups', 'league')
+          GROUP BY season_id
+        ) g ON g.season_id = se.season_id
+        WHERE c.organizer_ass_id = :ass
+          AND {_SEASON_YEAR} = :year
+          AND {_COMP_FILTER}
+    """), params).mappings().all()
+    stage_info = {r["stage_id"]: r for r in stages}
+
+    matches: dict[int, int] = defaultdict(int)
+    match_pts: dict[int, float] = defaultdict(float)
+    bonus: dict[int, float] = defaultdict(float)
+    group_clubs: set[tuple[int, int]] = set()      # (stage, club) in a groups/league stage
+    country: dict[int, int | None] = {}
+
+    if stage_info:
+        fixtures = db.execute(text("""
+            SELECT sr.stage_id,
+                   th.club_id AS home_club, ch.country_id AS home_country,
+                   ta.club_id AS away_club, ca.country_id AS away_country,
+                   COALESCE(f.et_home_score, f.ft_home_score) AS hg,
+                   COALESCE(f.et_away_score, f.ft_away_score) AS ag
+            FROM fixture f
+            JOIN stage_round sr ON sr.stage_round_id = f.stage_round_id
+            JOIN team th ON th.team_id = f.home_team_id AND th.type = 'club'
+            JOIN team ta ON ta.team_id = f.away_team_id AND ta.type = 'club'
+            JOIN club ch ON ch.club_id = th.club_id
+            JOIN club ca ON ca.club_id = ta.club_id
+            WHERE sr.stage_id = ANY(:stage_ids)
+              AND f.ft_home_score IS NOT NULL AND f.ft_away_score IS NOT NULL
+        """), {"stage_ids": list(stage_info)}).mappings().all()
+
+        for f in fixtures:
+            st = stage_info[f["stage_id"]]
+            factor = QUALIFYING_FACTOR if st["qualifying"] else 1.0
+            country[f["home_club"]] = f["home_country"]
+            country[f["away_club"]] = f["away_country"]
+            for club, gf, ga in ((f["home_club"], f["hg"], f["ag"]), (f["away_club"], f["ag"], f["hg"])):
+                matches[club] += 1
+                if gf > ga:
+                    match_pts[club] += WIN_POINTS * factor
+                elif gf == ga:
+                    match_pts[club] += DRAW_POINTS * factor
+                if st["format"] in ("groups", "league"):
+                    group_clubs.add((f["stage_id"], club))
+
+        for stage_id, club in group_clubs:
+            bonus[club] += GROUP_STAGE_BONUS * TIER_FACTOR.get(stage_info[stage_id]["tier"], 0.25)
+
+        ko_stage_ids = [sid for sid, st in stage_info.items() if st["after_groups"]]
+        if ko_stage_ids:
+            ties = db.execute(text("""
+                SELECT kt.stage_id, ta.club_id AS a_club, tb.club_id AS b_club
+                FROM knockout_tie kt
+                JOIN team ta ON ta.team_id = kt.team_a_id AND ta.type = 'club'
+                JOIN team tb ON tb.team_id = kt.team_b_id AND tb.type = 'club'
+                WHERE kt.stage_id = ANY(:ids)
+            """), {"ids": ko_stage_ids}).mappings().all()
+            for t in ties:
+                per_tie = KO_ROUND_BONUS * TIER_FACTOR.get(stage_info[t["stage_id"]]["tier"], 0.25)
+                for club in (t["a_club"], t["b_club"]):
+                    if club in matches:
+                        bonus[club] += per_tie
+
+    db.execute(text("""
+        DELETE FROM club_coefficient_season WHERE ass_id = :ass AND season_year = :year
+    """), params)
+    db.execute(text("""
+        DELETE FROM country_coefficient_season WHERE ass_id = :ass AND season_year = :year
+    """), params)
+    if not matches:
+        return
+
+    db.execute(
+        text("""
+            INSERT INTO club_coefficient_season
+              (ass_id, season_year, club_id, country_id, matches, match_points, bonus_points, points)
+            VALUES (:ass, :year, :club, :country, :matches, :mp, :bp, :pts)
+        """),
+        [
+            {**params, "club": club, "country": country.get(club), "matches": n,
+             "mp": match_pts[club], "bp": bonus[club], "pts": match_pts[club] + bonus[club]}
+            for club, n in matches.items()
+        ],
+    )
+
+    by_country: dict[int, list[float]] = defaultdict(list)
+    for club in matches:
+        if country.get(club) is not None:
+            by_country[country[club]].append(match_pts[club] + bonus[club])
+    if by_country:
+        db.execute(
+            text("""
+                INSERT INTO country_coefficient_season (ass_id, season_year, country_id, clubs, points)
+                VALUES (:ass, :year, :country, :clubs, :pts)
+            """),
+            [
+                {**params, "country": c, "clubs": len(pts), "pts": sum(pts) / len(pts)}
+                for c, pts in by_country.items()
+            ],
+        )
+
+
+def rebuild_rankings(db: Session, ass_id: int) -> None:
+    """
+    Rewrite the club and country rankings of one confederation over the
+    WINDOW season years up to its latest one (missing years count 0). Caller commits.
+    """
+    latest = db.execute(text("""
+        SELECT MAX(season_year) FROM club_coefficient_season WHERE ass_id = :ass
+    """), {"ass": ass_id}).scalar_one_or_none()
+    db.execute(text("DELETE FROM coefficient_ranking WHERE ass_id = :ass"), {"ass": ass_id})
+    if latest is None:
+        return
+    years = list(range(latest - WINDOW + 1, latest + 1))
+    pos_of_year = {y: i for i, y in enumerate(years)}
+
+    for kind, table, key in (("club", "club_coefficient_season", "club_id"),
+                             ("country", "country_coefficient_season", "country_id")):
+        rows = db.execute(text(f"""
+            SELECT {key} AS entity_id, season_year, points
+            FROM {table}
+            WHERE ass_id = :ass AND season_year = ANY(:years)
+        """), {"ass": ass_id, "years": years}).all()
+        per_entity: dict[int, list[float]] = defaultdict(lambda: [0.0] * len(years))
+        for entity_id, year, pts in rows:
+            per_entity[entity_id][pos_of_year[year]] = float(pts)
+
+        ranked = sorted(per_entity.items(), key=lambda kv: (-sum(kv[1]), -kv[1][-1], kv[0]))
+        if ranked:
+            db.execute(
+                text("""
+                    INSERT INTO coefficient_ranking
+                      (ass_id, kind, entity_id, position, total, season_points, first_year, last_year)
+                    VALUES (:ass, :kind, :entity, :pos, :total, :pts, :first, :last)
+                """),
+                [
+                    {"ass": ass_id, "kind": kind, "entity": entity_id, "pos": i,
+                     "total": sum(pts), "pts": pts, "first": years[0], "last": years[-1]}
+                    for i, (entity_id, pts) in enumerate(ranked, start=1)
+                ],
+            )
+
+
+def update_coefficients(db: Session, season_ids: Iterable[int]) -> None:
+    """Incremental update after a fixture import: touched confederation-years, then their rankings."""
+    pairs = touched_pairs(db, season_ids)
+    for ass_id, year in pairs:
+        rebuild_season_points(db, ass_id, year)
+    for ass_id in sorted({a for a, _ in pairs}):
+        rebuild_rankings(db, ass_id)
+
+
+def coefficient_rankings(db: Session, ass_id: int, limit: int = RANKING_LIMIT) -> dict:
+    """Stored club and country rankings of a confederation (top `limit` each)."""
+    rows = db.execute(text("""
+        SELECT r.kind, r.entity_id, r.position, r.total, r.season_points, r.first_year, r.last_year,
+               COALESCE(cl.name, co.name) AS name, clc.name AS country_name
+        FROM coefficient_ranking r
+        LEFT JOIN club cl     ON r.kind = 'club'    AND cl.club_id = r.entity_id
+        LEFT JOIN country clc ON clc.country_id = cl.country_id
+        LEFT JOIN country co  ON r.kind = 'country' AND co.country_id = r.entity_id
+        WHERE r.ass_id = :ass AND r.position <= :limit
+        ORDER BY r.kind, r.position
+    """), {"ass": ass_id, "limit": limit}).mappings().all()
+
+    out = {"clubs": [], "countries": [], "years": []}
+    for r in rows:
+        out["clubs" if r["kind"] == "club" else "countries"].append(dict(r))
+        if not out["years"]:
+            out["years"] = list(range(r["first_year"], r["last_year"] + 1))
+    return out
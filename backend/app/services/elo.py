@@ -0,0 +1,188 @@
+"""
+Elo team ratings over all played fixtures.
+
+Fixtures are replayed in (kickoff_utc, fixture_id) order. Each played fixture
+writes one compact history row per team (rating after the match) into
+team_elo_history; team_elo keeps the current rating per team.
+
+After an import only the tail is replayed: history from the earliest changed
+kickoff onwards is dropped, ratings are seeded from the last history row
+before it, and the later fixtures are replayed.
+"""
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+BASE_RATING = 1500.0
+K_FACTOR = 20.0
+HOME_ADVANTAGE = 65.0
+HISTORY_INSERT_BATCH = 2000
+
+
+def goal_diff_multiplier(gd: int) -> float:
+    """World Football Elo margin multiplier: 1, 1.5, then (11 + gd) / 8."""
+    gd = abs(gd)
+    if gd <= 1:
+        return 1.0
+    if gd == 2:
+        return 1.5
+    return (11.0 + gd) / 8.0
+
+
+def expected_score(r_home: float, r_away: float, home_advantage: float = HOME_ADVANTAGE) -> float:
+    return 1.0 / (1.0 + 10.0 ** ((r_away - (r_home + home_advantage)) / 400.0))
+
+
+def rate_match(r_home: float, r_away: float, home_goals: int, away_goals: int) -> tuple[float, float]:
+    """New (home, away) ratings after one result. Shoot-outs count as draws."""
+    if home_goals > away_goals:
+        actual = 1.0
+    elif home_goals < away_goals:
+        actual = 0.0
+    else:
+        actual = 0.5
+    delta = K_FACTOR * goal_diff_multiplier(home_goals - away_goals) * (actual - expected_score(r_home, r_away))
+    return r_home + delta, r_away - delta
+
+
+def update_ratings_from(db: Session, since_kickoff: datetime | None) -> int:
+    """
+    Replay every played fixture with kickoff_utc >= since_kickoff
+    (everything when None, or when no history exists yet).
+    Returns the number of fixtures replayed. Caller commits.
+    """
+    has_history = db.execute(text("SELECT EXISTS (SELECT 1 FROM team_elo_history)")).scalar_one()
+    if since_kickoff is None or not has_history:
+        since_kickoff = None
+        dropped = db.execute(text("DELETE FROM team_elo_history RETURNING team_id")).scalars().all()
+        ratings: dict[int, float] = {}
+    else:
+        dropped = db.execute(text("""
+            DELETE FROM team_elo_history
+            WHERE kickoff_utc >= :since
+            RETURNING team_id
+        """), {"since": since_kickoff}).scalars().all()
+        seed = db.execute(text("""
+            SELECT DISTINCT ON (team_id) team_id, rating
+            FROM team_elo_history
+            ORDER BY team_id, kickoff_utc DESC, fixture_id DESC
+        """)).all()
+        ratings = {int(t): float(r) for t, r in seed}
+
+    fixtures = db.execute(text(f"""
+        SELECT fixture_id, kickoff_utc, home_team_id, away_team_id,
+               COALESCE(et_home_score, ft_home_score) AS hg,
+               COALESCE(et_away_score, ft_away_score) AS ag
+        FROM fixture
+        WHERE ft_home_score IS NOT NULL
+          AND ft_away_score IS NOT NULL
+          {"AND kickoff_utc >= :since" if since_kickoff is not None else ""}
+        ORDER BY kickoff_utc ASC, fixture_id ASC
+    """), {"since": since_kickoff}).all()
+
+    touched: set[int] = set(int(t) for t in dropped)
+    batch: list[dict] = []
+    for fid, kickoff, home_id, away_id, hg, ag in fixtures:
+        r_home = ratings.get(home_id, BASE_RATING)
+        r_away = ratings.get(away_id, BASE_RATING)
+        r_home, r_away = rate_match(r_home, r_away, hg, ag)
+        ratings[home_id] = r_home
+        ratings[away_id] = r_away
+        touched.update((home_id, away_id))
+        batch.append({"team_id": home_id, "kickoff": kickoff, "fid": fid, "rating": r_home})
+        batch.append({"team_id": away_id, "kickoff": kickoff, "fid": fid, "rating": r_away})
+        if len(batch) >= HISTORY_INSERT_BATCH:
+            _insert_history(db, batch)
+            batch = []
+    if batch:
+        _insert_history(db, batch)
+
+    _refresh_current(db, touched)
+    return len(fixtures)
+
+
+def _insert_history(db: Session, rows: list[dict]) -> None:
+    db.execute(text("""
+        INSERT INTO team_elo_history (team_id, kickoff_utc, fixture_id, rating)
+        VALUES (:team_id, :kickoff, :fid, :rating)
+    """), rows)
+
+
+def _refresh_current(db: Session, team_ids: set[int]) -> None:
+    """Rewrite team_elo for the given teams from their latest history row."""
+    if not team_ids:
+        return
+    ids = list(team_ids)
+    db.execute(text("DELETE FROM team_elo WHERE team_id = ANY(:ids)"), {"ids": ids})
+    db.execute(text("""
+        INSERT INTO team_elo (team_id, rating, games, last_fixture_id, last_kickoff_utc)
+        SELECT DISTINCT ON (h.team_id)
+               h.team_id, h.rating,
+               COUNT(*) OVER (PARTITION BY h.team_id) AS games,
+               h.fixture_id, h.kickoff_utc
+        FROM team_elo_history h
+        WHERE h.team_id = ANY(:ids)
+        ORDER BY h.team_id, h.kickoff_utc DESC, h.fixture_id DESC
+    """), {"ids": ids})
+
+
+# ---- Read helpers for pages -------------------------------------------------
+
+def current_ratings(db: Session, team_ids: list[int]) -> dict[int, dict]:
+    if not team_ids:
+        return {}
+    rows = db.execute(text("""
+        SELECT e.team_id, e.rating, e.games, e.last_kickoff_utc,
+               1 + (SELECT COUNT(*) FROM team_elo o WHERE o.rating > e.rating) AS rank
+        FROM team_elo e
+        WHERE e.team_id = ANY(:ids)
+    """), {"ids": list(team_ids)}).mappings().all()
+    return {r["team_id"]: dict(r) for r in rows}
+
+
+def rating_history(db: Session, team_id: int, limit: int = 100) -> list[dict]:
+    """Last `limit` ratings of a team, oldest first."""
+    rows = db.execute(text("""
+        SELECT kickoff_utc, fixture_id, rating
+        FROM team_elo_history
+        WHERE team_id = :tid
+        ORDER BY kickoff_utc DESC, fixture_id DESC
+        LIMIT :lim
+    """), {"tid": team_id, "lim": limit}).mappings().all()
+    return [dict(r) for r in reversed(rows)]
+
+
+def sparkline_points(values: list[float], width: int = 160, height: int = 32, pad: int = 2) -> str:
+    """SVG polyline 'x,y x,y ...' for a small inline sparkline."""
+    if not values:
+        return ""
+    if len(values) == 1:
+        values = values * 2
+    lo, hi = min(values), max(values)
+    span = (hi - lo) or 1.0
+    step = (width - 2 * pad) / (len(values) - 1)
+    pts = []
+    for i, v in enumerate(values):
+        x = pad + i * step
+        y = pad + (height - 2 * pad) * (1.0 - (v - lo) / span)
+        pts.append(f"{x:.1f},{y:.1f}")
+    return " ".join(pts)
+
+
+def rating_card(db: Session, team_id: int) -> dict | None:
+    """Everything the team/club pages show: current rating, rank and sparkline."""
+    cur = current_ratings(db, [team_id]).get(team_id)
+    if not cur:
+        return None
+    hist = rating_history(db, team_id)
+    values = [h["rating"] for h in hist]
+    return {
+        **cur,
+        "history": hist,
+        "min": min(values) if values else None,
+        "max": max(values) if values else None,
+        "sparkline": sparkline_points(values),
+    }
@@ -0,0 +1,94 @@
+"""
+Form guide and current streaks for every team of a season.
+
+One query per table: played fixtures are unfolded into one row per team and
+match, numbered newest-first with ROW_NUMBER(), and then aggregated per team.
+A streak is the number of matches before the first one that breaks it
+(the lowest row number with a loss / a win / a blank), or every match when
+nothing breaks it yet.
+"""
+from __future__ import annotations
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from ..core.cache import LRUCache
+from .season_data import season_fixture_version
+
+FORM_LENGTH = 5
+
+_cache = LRUCache(maxsize=256)
+
+
+def season_form(
+    db: Session,
+    season_id: int,
+    up_to_matchday: int | None = None,
+    last_n: int = FORM_LENGTH,
+    version: tuple | None = None,
+    stage_id: int | None = None,
+) -> dict[int, dict]:
+    """
+    {team_id: {"form": "WDLWW" (oldest → newest), "unbeaten", "winless", "scoring"}}
+    for every team with a played fixture in the season (optionally only in one
+    stage, and only up to a matchday). Round numbers restart in every stage, so
+    pass `stage_id` with `up_to_matchday`. Cached per season fixture version;
+    pass `version` when the caller already has it.
+    """
+    if version is None:
+        version = season_fixture_version(db, season_id)
+    key = (season_id, version, stage_id, up_to_matchday, last_n)
+    cached = _cache.get(key)
+    if cached is not None:
+        return cached
+
+    md_filter = "TRUE" if up_to_matchday is None else "sr.stage_round_order <= :md"
+    stage_filter = "TRUE" if stage_id is None else "sr.stage_id = :stage_id"
+    rows = db.execute(text(f"""
+        WITH played AS (
+          SELECT f.fixture_id, f.kickoff_utc, f.home_team_id, f.away_team_id,
+                 f.ft_home_score, f.ft_away_score
+          FROM fixture f
+          JOIN stage_round sr ON sr.stage_round_id = f.stage_round_id
+          JOIN stage s ON s.stage_id = sr.stage_id
+          WHERE s.season_id = :season_id
+            AND f.ft_home_score IS NOT NULL
+            AND f.ft_away_score IS NOT NULL
+            AND {stage_filter}
+            AND {md_filter}
+        ),
+        team_match AS (
+          SELECT home_team_id AS team_id, fixture_id, kickoff_utc,
+                 ft_home_score AS gf, ft_away_score AS ga
+          FROM played
+          UNION ALL
+          SELECT away_team_id, fixture_id, kickoff_utc,
+                 ft_away_score, ft_home_score
+          FROM played
+        ),
+        numbered AS (
+          SELECT team_id, gf,
+                 CASE WHEN gf > ga THEN 'W' WHEN gf = ga THEN 'D' ELSE 'L' END AS res,
+                 ROW_NUMBER() OVER (PARTITION BY team_id ORDER BY kickoff_utc DESC, fixture_id DESC) AS rn
+          FROM team_match
+        )
+        SELECT team_id,
+               STRING_AGG(res, '' ORDER BY rn DESC) FILTER (WHERE rn <= :last_n) AS form,
+               COALESCE(MIN(rn) FILTER (WHERE res = 'L'), COUNT(*) + 1) - 1 AS unbeaten,
+               COALESCE(MIN(rn) FILTER (WHERE res = 'W'), COUNT(*) + 1) - 1 AS winless,
+               COALESCE(MIN(rn) FILTER (WHERE gf = 0), COUNT(*) + 1) - 1 AS scoring
+        FROM numbered
+        GROUP BY team_id
+    """), {"season_id": season_id, "stage_id": stage_id, "md": up_to_matchday, "last_n": last_n}).mappings().all()
+
+    result = {
+        r["team_id"]: {
+            "form": r["form"] or "",
+            "unbeaten": int(r["unbeaten"]),
+            "winless": int(r["winless"]),
+            "scoring": int(r["scoring"]),
+        }
+        for r in rows
+    }
+    _cache.set(key, result)
+    return result
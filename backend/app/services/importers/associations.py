@@ -10,6 +10,7 @@ import json, re
 
 class AssociationsImporter(BaseImporter):
     entity = "associations"
+    families = ("association",)
 
     def _resolve_parent_id(self, token: str | None, db: Session) -> int | None:
         """
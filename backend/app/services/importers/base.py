@@ -3,6 +3,9 @@ from dataclasses import dataclass
 from typing import Dict, Any, Iterable, Tuple
 from sqlalchemy.orm import Session
 
+from app.core.data_version import bump_versions
+from app.core.page_cache import invalidate_pages
+
 @dataclass
 class ImportResult:
     inserted: int = 0
@@ -14,6 +17,9 @@ class ImportResult:
 
 class BaseImporter:
     entity: str
+    # entity families this importer writes: their data version is bumped
+    # (core/data_version.py) and cached pages built from them are evicted
+    families: tuple[str, ...] = ()
 
     def import_rows(self, rows: Iterable[Dict[str, Any]], db: Session) -> ImportResult:
         res = ImportResult(inserted=0, skipped=0, errors=[])
@@ -29,8 +35,16 @@ class BaseImporter:
                 res.skipped += 1
                 res.errors.append(f"Row {i}: {e}")
         db.commit()
+        self.after_commit(db)
+        bump_versions(*self.families)
+        for family in self.families:
+            invalidate_pages(family)
         return res
 
+    def after_commit(self, db: Session) -> None:
+        """Hook for importers whose entity feeds derived data or in-process caches."""
+        pass
+
     def parse_row(self, raw: Dict[str, Any], db: Session) -> Tuple[bool, Dict[str, Any]]:
         raise NotImplementedError
 
@@ -5,9 +5,17 @@ from .base import BaseImporter
 from app.models import Club
 from .utils.helpers import _to_int
 from .utils.resolvers import resolve_country_id, resolve_stadium_id
+from .utils.bulk_team_sync import ensure_club_teams
 
 class ClubsImporter(BaseImporter):
     entity = "clubs"
+    families = ("club", "team")
+
+    def after_commit(self, db: Session) -> None:
+        # default 'club' team per club (inserts / renames team rows), before
+        # the "team" version is bumped
+        ensure_club_teams(db)
+        db.commit()
 
     def parse_row(self, raw: Dict[str, Any], db: Session) -> Tuple[bool, Dict[str, Any]]:
         name = (raw.pop("name", None) or raw.pop("Name", None) or "").strip()
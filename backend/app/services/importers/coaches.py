@@ -8,6 +8,7 @@ from .utils.helpers import _parse_iso_date
 
 class CoachesImporter(BaseImporter):
     entity = "coaches"
+    families = ("coach",)
 
     def parse_row(self, raw: Dict[str, Any], db: Session) -> Tuple[bool, Dict[str, Any]]:
         full_name = (raw.get("full_name") or "").strip()
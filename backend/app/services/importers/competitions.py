@@ -17,6 +17,7 @@ class CompetitionsImporter(BaseImporter):
     """
 
     entity = "competitions"
+    families = ("competition",)
 
     # ---------- simple utils ----------
 
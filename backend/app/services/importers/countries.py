@@ -6,10 +6,18 @@ from sqlalchemy.dialects.postgresql import insert
 from .base import BaseImporter
 from app.models import Country
 from .utils.resolvers import resolve_association_id
+from .utils.bulk_team_sync import ensure_national_teams
 
 
 class CountriesImporter(BaseImporter):
     entity = "countries"
+    families = ("country", "team")
+
+    def after_commit(self, db: Session) -> None:
+        # default national team per country (inserts / renames team rows),
+        # before the "team" version is bumped
+        ensure_national_teams(db)
+        db.commit()
 
     def parse_row(self, raw: Dict[str, Any], db: Session) -> Tuple[bool, Dict[str, Any]]:
         # name
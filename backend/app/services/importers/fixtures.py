@@ -1,10 +1,11 @@
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, Tuple, Iterable
 from sqlalchemy.orm import Session
 from sqlalchemy import select, and_, func, or_
 from sqlalchemy.dialects.postgresql import insert
-from .base import BaseImporter
+from .base import BaseImporter, ImportResult
 from app.models import (Fixture, Season, Stage, Club, StageRound, StageGroup, StageGroupTeam, Competition,Team, Stadium,)
 from .utils.helpers import _to_int, _to_bool, _parse_dt, _decide_winner
+from .utils.fixture_sync import sync_after_fixture_import
 
 
 
@@ -29,6 +30,7 @@ class FixturesImporter(BaseImporter):
       - fixture_status also accepts legacy header 'status'
     """
     entity = "fixtures"
+    families = ("fixture",)
 
     # ---------- resolvers ----------
 
@@ -155,6 +157,13 @@ class FixturesImporter(BaseImporter):
 
     # ---------- importer API ----------
 
+    def import_rows(self, rows: Iterable[Dict[str, Any]], db: Session) -> ImportResult:
+        # Transaction timestamp of this import == updated_at of every fixture it touches
+        since = db.execute(select(func.now())).scalar_one()
+        res = super().import_rows(rows, db)
+        sync_after_fixture_import(db, since)
+        return res
+
     def parse_row(self, raw: Dict[str, Any], db: Session) -> Tuple[bool, Dict[str, Any]]:
         kickoff        = _parse_dt(raw.get("kickoff_utc") or raw.get("kickoff"))
         stage_round_id = self._resolve_stage_round_id(raw, db)
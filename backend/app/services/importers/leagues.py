@@ -7,6 +7,7 @@ from app.models import Country, League
 
 class LeaguesImporter(BaseImporter):
     entity = "leagues"
+    families = ("competition",)
 
     def parse_row(self, raw: Dict[str, Any], db: Session) -> Tuple[bool, Dict[str, Any]]:
         name = (raw.get("name") or raw.get("Name") or "").strip()
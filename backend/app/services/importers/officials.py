@@ -8,6 +8,7 @@ from .utils.helpers import _to_int, _parse_iso_date
 
 class OfficialsImporter(BaseImporter):
     entity = "officials"
+    families = ("official",)
 
     def _resolve_association(self, token, db: Session) -> int | None:
         if token is None: return None
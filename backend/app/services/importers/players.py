@@ -10,6 +10,7 @@ ALLOWED_POS = {"GK", "DF", "MF", "FW"}
 
 class PlayersImporter(BaseImporter):
     entity = "players"
+    families = ("player",)
 
     def _resolve_country_id(self, token, db: Session) -> int | None:
         if token is None: return None
@@ -3,11 +3,17 @@ from sqlalchemy.orm import Session
 from sqlalchemy import select, func, text
 from sqlalchemy.dialects.postgresql import insert
 from .base import BaseImporter
+from app.services.season_structure import invalidate_season_structure
 from app.models import Season, Competition
 from .utils.helpers import _to_int, _parse_date
 
 class SeasonsImporter(BaseImporter):
     entity = "seasons"
+    families = ("season", "competition")
+
+    def after_commit(self, db: Session) -> None:
+        # stages / rounds / groups are cached per season
+        invalidate_season_structure()
 
     def _resolve_competition_id(self, token: str | None, db: Session) -> int | None:
         """
@@ -9,6 +9,7 @@ from .utils.resolvers import resolve_country_id
 
 class StadiumsImporter(BaseImporter):
     entity = "stadiums"
+    families = ("stadium",)
 
     def parse_row(self, raw: Dict[str, Any], db: Session) -> Tuple[bool, Dict[str, Any]]:
         name = (raw.pop("name", None) or "").strip()
@@ -16,6 +16,7 @@ class StageGroupTeamsImporter(BaseImporter):
     - team: id or exact team name (case-insensitive)
     """
     entity = "stage_group_teams"
+    families = ("season",)
 
     def _resolve_team_id(self, token, db: Session) -> int | None:
         as_int = _to_int(token)
@@ -3,11 +3,17 @@ from sqlalchemy.orm import Session
 from sqlalchemy import select, func, and_
 from sqlalchemy.dialects.postgresql import insert
 from .base import BaseImporter
+from app.services.season_structure import invalidate_season_structure
 from app.models import StageRound, Stage, Season, Competition
 from .utils.helpers import _to_int, _to_bool
 
 class StageRoundsImporter(BaseImporter):
     entity = "stage_rounds"
+    families = ("season",)
+
+    def after_commit(self, db: Session) -> None:
+        # stages / rounds / groups are cached per season
+        invalidate_season_structure()
 
     def _resolve_stage_id(self, token, db: Session, ctx: Dict[str, Any]) -> int | None:
         sid = _to_int(token)
@@ -3,12 +3,18 @@ from sqlalchemy.orm import Session
 from sqlalchemy import select, func
 from sqlalchemy.dialects.postgresql import insert
 from .base import BaseImporter
+from app.services.season_structure import invalidate_season_structure
 from app.models import Stage, Season, Competition
 from .utils.helpers import _to_int
 
 ALLOWED_FORMATS = {"league","groups","knockout","qualification","playoffs"}
 class StagesImporter(BaseImporter):
     entity = "stages"
+    families = ("season",)
+
+    def after_commit(self, db: Session) -> None:
+        # stages / rounds / groups are cached per season
+        invalidate_season_structure()
 
     def _resolve_season_id(self, season_token, comp_token, db: Session) -> int | None:
         """
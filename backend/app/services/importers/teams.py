@@ -9,6 +9,7 @@ from .utils.resolvers import resolve_club_id,resolve_country_id
 
 class TeamsImporter(BaseImporter):
     entity = "teams"
+    families = ("team",)
 
     def parse_row(self, raw: Dict[str, Any], db: Session) -> Tuple[bool, Dict[str, Any]]:
         name = (raw.pop("name", None) or "").strip()
@@ -0,0 +1,86 @@
+# backend/app/services/importers/utils/fixture_sync.py
+from datetime import datetime
+
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+
+from app.services.elo import update_ratings_from
+from app.services.all_time import refresh_all_time_views
+from app.services.knockout import rebuild_knockout_ties
+from app.services.season_summary import rebuild_season_summaries
+from app.services.match_model import refit_season_models
+from app.services.season_sim import queue_season_simulations
+from app.services.coefficients import update_coefficients
+from app.services.world_ranking import update_world_ranking
+from app.services.records import update_records
+from app.services.season_structure import invalidate_season_structure
+from app.core.data_version import bump_versions
+from app.core.page_cache import invalidate_pages
+
+
+def sync_after_fixture_import(db: Session, since: datetime) -> None:
+    """
+    Refresh data derived from fixtures after a fixture import committed.
+    `since` is the import transaction's NOW(): every inserted/changed fixture
+    carries it as updated_at, so `updated_at >= since` is the touched set.
+    Idempotent; commits its own work.
+    """
+    earliest = db.execute(text("""
+        SELECT MIN(kickoff_utc) FROM fixture WHERE updated_at >= :since
+    """), {"since": since}).scalar_one_or_none()
+    if earliest is None:
+        return
+
+    # Elo: replay from the earliest changed kickoff
+    update_ratings_from(db, earliest)
+
+    # National team world ranking: replay from the earliest changed international
+    update_world_ranking(db, since)
+
+    touched = db.execute(text("""
+        SELECT DISTINCT s.season_id, s.stage_id, se.competition_id
+        FROM fixture f
+        JOIN stage_round sr ON sr.stage_round_id = f.stage_round_id
+        JOIN stage s ON s.stage_id = sr.stage_id
+        JOIN season se ON se.season_id = s.season_id
+        WHERE f.updated_at >= :since
+    """), {"since": since}).all()
+    season_ids = {int(r[0]) for r in touched}
+    stage_ids = [int(r[1]) for r in touched]
+    competition_ids = {int(r[2]) for r in touched}
+
+    # Knockout ties of the touched stages
+    rebuild_knockout_ties(db, stage_ids)
+
+    # All-time / head-to-head aggregates
+    refresh_all_time_views(db)
+
+    # Winner / runner-up / final / totals of the touched seasons (reads the
+    # ties and the all-time views above)
+    rebuild_season_summaries(db, season_ids)
+
+    # Club / country coefficients of the touched confederation-years (reads the ties)
+    update_coefficients(db, season_ids)
+
+    # Dixon–Coles parameters of the touched seasons
+    refit_season_models(db, season_ids)
+
+    # Records of the touched competitions, seasons and teams
+    update_records(db, since)
+
+    db.commit()
+
+    # Outcome probabilities of the touched league seasons: seconds each, so
+    # they are simulated in the background, never in this request
+    queue_season_simulations(season_ids)
+
+    # Fixture counts in the cached season structures
+    invalidate_season_structure(season_ids)
+
+    # Rendered pages of the touched seasons / competitions and fixture-wide pages
+    invalidate_pages("season", season_ids)
+    invalidate_pages("competition", competition_ids)
+    invalidate_pages("fixture")
+
+    # ETags of fixture-derived pages (bumped again now that the derived data is in)
+    bump_versions("fixture")
@@ -0,0 +1,333 @@
+"""
+Knockout ties of knockout/playoffs stages, persisted in knockout_tie.
+
+A tie is every fixture of one stage between the same two teams, whatever the
+round names say: legs in "1st Leg"/"2nd Leg" rounds, replays or a single final
+all pair up the same way. The tie belongs to the round of its first leg; the
+winner's next tie is the first later-round tie they appear in.
+
+Built after fixture imports (see importers/utils/fixture_sync.py), so bracket
+pages only read rows.
+"""
+from __future__ import annotations
+
+import os
+from collections import defaultdict
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from ..core.cache import LRUCache
+
+KNOCKOUT_FORMATS = ("knockout", "playoffs")
+
+_layout_cache = LRUCache(maxsize=256)
+
+
+def knockout_stage_ids(db: Session, stage_ids: list[int]) -> list[int]:
+    """The subset of `stage_ids` whose format is knockout/playoffs."""
+    if not stage_ids:
+        return []
+    return [int(s) for s in db.execute(text("""
+        SELECT stage_id FROM stage
+        WHERE stage_id = ANY(:ids) AND format = ANY(:formats)
+    """), {"ids": list(stage_ids), "formats": list(KNOCKOUT_FORMATS)}).scalars().all()]
+
+
+def _leg_goals(leg) -> tuple[int | None, int | None]:
+    """Final score of a leg for the aggregate: after extra time when played."""
+    if leg["ft_home_score"] is None or leg["ft_away_score"] is None:
+        return None, None
+    if leg["et_home_score"] is not None and leg["et_away_score"] is not None:
+        return leg["et_home_score"], leg["et_away_score"]
+    return leg["ft_home_score"], leg["ft_away_score"]
+
+
+def _build_tie(legs: list) -> dict:
+    first, last = legs[0], legs[-1]
+    a_id, b_id = first["home_team_id"], first["away_team_id"]
+
+    agg_a = agg_b = 0
+    played = 0
+    for leg in legs:
+        hg, ag = _leg_goals(leg)
+        if hg is None:
+            continue
+        played += 1
+        if leg["home_team_id"] == a_id:
+            agg_a += hg; agg_b += ag
+        else:
+            agg_a += ag; agg_b += hg
+
+    pen_a = pen_b = None
+    if last["went_to_penalties"] and last["pen_home_score"] is not None and last["pen_away_score"] is not None:
+        if last["home_team_id"] == a_id:
+            pen_a, pen_b = last["pen_home_score"], last["pen_away_score"]
+        else:
+            pen_a, pen_b = last["pen_away_score"], last["pen_home_score"]
+
+    winner = None
+    complete = played == len(legs)
+    if complete and agg_a != agg_b:
+        winner = a_id if agg_a > agg_b else b_id
+    elif complete and pen_a is not None and pen_a != pen_b:
+        winner = a_id if pen_a > pen_b else b_id
+    elif complete and last["winner_team_id"] in (a_id, b_id):
+        # level on aggregate but decided otherwise (away goals, coin toss, ...)
+        winner = last["winner_team_id"]
+
+    return {
+        "stage_round_id": first["stage_round_id"],
+        "round_order": first["stage_round_order"],
+        "kickoff": first["kickoff_utc"],
+        "team_a_id": a_id,
+        "team_b_id": b_id,
+        "leg1_fixture_id": first["fixture_id"],
+        "leg2_fixture_id": last["fixture_id"] if len(legs) > 1 else None,
+        "legs": len(legs),
+        "legs_played": played,
+        "agg_a": agg_a if played else None,
+        "agg_b": agg_b if played else None,
+        "went_to_extra_time": any(bool(l["went_to_extra_time"]) for l in legs),
+        "went_to_penalties": pen_a is not None,
+        "pen_a": pen_a,
+        "pen_b": pen_b,
+        "winner_team_id": winner,
+    }
+
+
+def rebuild_stage_ties(db: Session, stage_id: int) -> int:
+    """Replace the knockout_tie rows of one stage. Returns the number of ties. Caller commits."""
+    fixtures = db.execute(text("""
+        SELECT f.fixture_id, f.stage_round_id, sr.stage_round_order, f.kickoff_utc,
+               f.home_team_id, f.away_team_id,
+               f.ft_home_score, f.ft_away_score, f.et_home_score, f.et_away_score,
+               f.pen_home_score, f.pen_away_score,
+               f.went_to_extra_time, f.went_to_penalties, f.winner_team_id
+        FROM fixture f
+        JOIN stage_round sr ON sr.stage_round_id = f.stage_round_id
+        WHERE sr.stage_id = :sid
+          AND f.fixture_status NOT IN ('canceled', 'cancelled')
+        ORDER BY sr.stage_round_order ASC, f.kickoff_utc ASC, f.fixture_id ASC
+    """), {"sid": stage_id}).mappings().all()
+
+    by_pair: dict[tuple[int, int], list] = defaultdict(list)
+    for f in fixtures:
+        a, b = f["home_team_id"], f["away_team_id"]
+        by_pair[(min(a, b), max(a, b))].append(f)
+
+    ties = [_build_tie(legs) for legs in by_pair.values()]
+    ties.sort(key=lambda t: (t["round_order"], t["kickoff"], t["leg1_fixture_id"]))
+
+    tie_order: dict[int, int] = defaultdict(int)
+    for t in ties:
+        tie_order[t["stage_round_id"]] += 1
+        t["tie_order"] = tie_order[t["stage_round_id"]]
+
+    db.execute(text("DELETE FROM knockout_tie WHERE stage_id = :sid"), {"sid": stage_id})
+    for t in ties:
+        t["tie_id"] = db.execute(text("""
+            INSERT INTO knockout_tie (
+              stage_id, stage_round_id, tie_order, team_a_id, team_b_id,
+              leg1_fixture_id, leg2_fixture_id, legs, legs_played, agg_a, agg_b,
+              went_to_extra_time, went_to_penalties, pen_a, pen_b, winner_team_id
+            ) VALUES (
+              :stage_id, :stage_round_id, :tie_order, :team_a_id, :team_b_id,
+              :leg1_fixture_id, :leg2_fixture_id, :legs, :legs_played, :agg_a, :agg_b,
+              :went_to_extra_time, :went_to_penalties, :pen_a, :pen_b, :winner_team_id
+            )
+            RETURNING tie_id
+        """), {**t, "stage_id": stage_id}).scalar_one()
+
+    # Winner's next tie: the first tie in a later round that includes them
+    links = []
+    for i, t in enumerate(ties):
+        w = t["winner_team_id"]
+        if w is None:
+            continue
+        for nxt in ties[i + 1:]:
+            if nxt["round_order"] > t["round_order"] and w in (nxt["team_a_id"], nxt["team_b_id"]):
+                links.append({"tie_id": t["tie_id"], "next_tie_id": nxt["tie_id"]})
+                break
+    if links:
+        db.execute(text("UPDATE knockout_tie SET next_tie_id = :next_tie_id WHERE tie_id = :tie_id"), links)
+
+    return len(ties)
+
+
+def rebuild_knockout_ties(db: Session, stage_ids: list[int]) -> None:
+    """Rebuild ties for the knockout/playoffs stages among `stage_ids`. Caller commits."""
+    for stage_id in knockout_stage_ids(db, stage_ids):
+        rebuild_stage_ties(db, stage_id)
+
+
+def rebuild_season_ties(db: Session, season_ids: list[int]) -> None:
+    """Rebuild ties for every knockout/playoffs stage of `season_ids` (app/backfill.py). Caller commits."""
+    stage_ids = db.execute(text("SELECT stage_id FROM stage WHERE season_id = ANY(:ids)"),
+                           {"ids": list(season_ids)}).scalars().all()
+    rebuild_knockout_ties(db, [int(s) for s in stage_ids])
+
+
+def load_stage_ties(db: Session, stage_id: int) -> list[dict]:
+    """
+    Every tie of a stage with team names, both legs and round names,
+    in bracket order (round, tie_order). One indexed query.
+    """
+    rows = db.execute(text("""
+        SELECT kt.tie_id, kt.stage_round_id, sr.name AS round_name, sr.stage_round_order,
+               kt.tie_order, kt.legs, kt.legs_played, kt.next_tie_id,
+               kt.team_a_id, ta.name AS a_name, kt.team_b_id, tb.name AS b_name,
+               kt.agg_a, kt.agg_b, kt.went_to_extra_time, kt.went_to_penalties, kt.pen_a, kt.pen_b,
+               kt.winner_team_id, tw.name AS winner_name,
+               f1.fixture_id AS l1_fixture_id, f1.kickoff_utc AS l1_kickoff_utc, f1.fixture_status AS l1_fixture_status,
+               f1.home_team_id AS l1_home_id, f1.ft_home_score AS l1_ft_home_score, f1.ft_away_score AS l1_ft_away_score,
+               f1.went_to_extra_time AS l1_went_to_extra_time, f1.went_to_penalties AS l1_went_to_penalties,
+               f1.pen_home_score AS l1_pen_home_score, f1.pen_away_score AS l1_pen_away_score,
+               f2.fixture_id AS l2_fixture_id, f2.kickoff_utc AS l2_kickoff_utc, f2.fixture_status AS l2_fixture_status,
+               f2.home_team_id AS l2_home_id, f2.ft_home_score AS l2_ft_home_score, f2.ft_away_score AS l2_ft_away_score,
+               f2.went_to_extra_time AS l2_went_to_extra_time, f2.went_to_penalties AS l2_went_to_penalties,
+               f2.pen_home_score AS l2_pen_home_score, f2.pen_away_score AS l2_pen_away_score,
+               sr2.name AS l2_round_name
+        FROM knockout_tie kt
+        JOIN stage_round sr ON sr.stage_round_id = kt.stage_round_id
+        JOIN team ta ON ta.team_id = kt.team_a_id
+        JOIN team tb ON tb.team_id = kt.team_b_id
+        LEFT JOIN team tw ON tw.team_id = kt.winner_team_id
+        JOIN fixture f1 ON f1.fixture_id = kt.leg1_fixture_id
+        LEFT JOIN fixture f2 ON f2.fixture_id = kt.leg2_fixture_id
+        LEFT JOIN stage_round sr2 ON sr2.stage_round_id = f2.stage_round_id
+        WHERE kt.stage_id = :sid
+        ORDER BY sr.stage_round_order ASC, kt.tie_order ASC
+    """), {"sid": stage_id}).mappings().all()
+    return [_tie_view(r) for r in rows]
+
+
+def _leg_view(r, p: str, a_name: str, b_name: str, a_id: int) -> dict | None:
+    if r[f"{p}_fixture_id"] is None:
+        return None
+    a_home = r[f"{p}_home_id"] == a_id
+    return {
+        "fixture_id": r[f"{p}_fixture_id"],
+        "kickoff_utc": r[f"{p}_kickoff_utc"],
+        "fixture_status": r[f"{p}_fixture_status"],
+        "home_name": a_name if a_home else b_name,
+        "away_name": b_name if a_home else a_name,
+        "ft_home_score": r[f"{p}_ft_home_score"],
+        "ft_away_score": r[f"{p}_ft_away_score"],
+        "went_to_extra_time": r[f"{p}_went_to_extra_time"],
+        "went_to_penalties": r[f"{p}_went_to_penalties"],
+        "pen_home_score": r[f"{p}_pen_home_score"],
+        "pen_away_score": r[f"{p}_pen_away_score"],
+    }
+
+
+def _agg_text(x: int, y: int, et: bool, pen_x: int | None, pen_y: int | None) -> str:
+    text_ = f"{x}–{y}" + (" (ET)" if et else "")
+    if pen_x is not None:
+        text_ += f" (Pens {pen_x}–{pen_y})"
+    return text_
+
+
+def _tie_view(r) -> dict:
+    a_name, b_name = r["a_name"], r["b_name"]
+    leg1 = _leg_view(r, "l1", a_name, b_name, r["team_a_id"])
+    leg2 = _leg_view(r, "l2", a_name, b_name, r["team_a_id"])
+
+    agg_text = agg_text_leg2_home = None
+    if r["agg_a"] is not None:
+        agg_text = _agg_text(r["agg_a"], r["agg_b"], r["went_to_extra_time"], r["pen_a"], r["pen_b"])
+        # same aggregate from the point of view of the last leg's home side
+        if leg2 and r["l2_home_id"] != r["team_a_id"]:
+            agg_text_leg2_home = _agg_text(r["agg_b"], r["agg_a"], r["went_to_extra_time"], r["pen_b"], r["pen_a"])
+        else:
+            agg_text_leg2_home = agg_text
+
+    return {
+        "tie_id": r["tie_id"],
+        "round_id": r["stage_round_id"],
+        "round_name": r["round_name"],
+        "leg2_round_name": r["l2_round_name"],
+        "tie_order": r["tie_order"],
+        "a_name": a_name,
+        "b_name": b_name,
+        "legs": [l for l in (leg1, leg2) if l],
+        "leg1": leg1,
+        "leg2": leg2,
+        "legs_played": r["legs_played"],
+        "complete": r["legs_played"] == r["legs"],
+        "agg_text": agg_text,
+        "agg_text_leg2_home": agg_text_leg2_home,
+        "winner": r["winner_name"],
+        "next_tie_id": r["next_tie_id"],
+    }
+
+
+# ---- Bracket layout ---------------------------------------------------------
+
+def stage_bracket_version(db: Session, stage_id: int) -> tuple:
+    """
+    (fixture count, latest fixture update, latest tie id) of a stage. Ties get
+    new ids on every rebuild, so the version also moves when only ties changed.
+    """
+    row = db.execute(text("""
+        SELECT (SELECT COUNT(*) FROM fixture f
+                JOIN stage_round sr ON sr.stage_round_id = f.stage_round_id
+                WHERE sr.stage_id = :sid),
+               (SELECT MAX(f.updated_at) FROM fixture f
+                JOIN stage_round sr ON sr.stage_round_id = f.stage_round_id
+                WHERE sr.stage_id = :sid),
+               (SELECT MAX(tie_id) FROM knockout_tie WHERE stage_id = :sid)
+    """), {"sid": stage_id}).first()
+    return (int(row[0] or 0), row[1], row[2])
+
+
+def version_etag(stage_id: int, version: tuple) -> str:
+    n, updated, tie = version
+    stamp = int(updated.timestamp() * 1_000_000) if updated else 0
+    return f'W/"bracket-{stage_id}-{n}-{stamp}-{tie or 0}"'
+
+
+def bracket_layout(ties: list[dict]) -> dict:
+    """
+    Columns (rounds holding first legs, ties in bracket order) and the
+    per-round pairing blocks used by the mini tables. Ties arrive sorted.
+    """
+    columns: list[dict] = []
+    for tie in ties:
+        if not columns or columns[-1]["round_id"] != tie["round_id"]:
+            columns.append({"round_id": tie["round_id"], "round_name": tie["round_name"], "ties": []})
+        columns[-1]["ties"].append(tie)
+
+    paired_blocks = []
+    for col in columns:
+        second = next(
+            (t["leg2_round_name"] for t in col["ties"]
+             if t["leg2_round_name"] and t["leg2_round_name"] != col["round_name"]),
+            None,
+        )
+        title = col["round_name"]
+        if second:
+            # "Quarter-finals 1st Leg" + "Quarter-finals 2nd Leg" -> "Quarter-finals"
+            title = os.path.commonprefix([col["round_name"], second]).rstrip(" -–—:(") or col["round_name"]
+        paired_blocks.append({
+            "round_title": title,
+            "first_round_name": col["round_name"],
+            "second_round_name": second,
+            "pairs": col["ties"],
+        })
+    return {"columns": columns, "paired_blocks": paired_blocks}
+
+
+def load_bracket(db: Session, stage_id: int, version: tuple) -> dict:
+    """
+    Bracket layout of a stage at `version` (stage_bracket_version), cached per
+    version. Routes check the version's ETag first and only call this on a miss.
+    Read-only: stages imported before knockout_tie existed show no ties until
+    `python -m app.backfill --step ties` has run.
+    """
+    key = (stage_id, version)
+    layout = _layout_cache.get(key)
+    if layout is None:
+        layout = bracket_layout(load_stage_ties(db, stage_id))
+        _layout_cache.set(key, layout)
+    return layout
@@ -0,0 +1,243 @@
+"""
+Dixon–Coles / Poisson match outcome model.
+
+Goals are independent Poisson counts with
+    log λ_home = intercept + home_adv + attack[home] - defence[away]
+    log λ_away = intercept + attack[away] - defence[home]
+fitted by weighted maximum likelihood (Newton steps on the full design
+matrix, small ridge penalty on the team terms) over a competition's played
+fixtures, each weighted exp(-xi · days before the reference date). The
+Dixon–Coles ρ then corrects the 0-0 / 1-0 / 0-1 / 1-1 cells.
+
+Fitted per competition-season after fixture imports (see
+importers/utils/fixture_sync.py) and stored in match_model /
+match_model_team; pages only read the parameters.
+"""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Iterable
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+XI = 0.0019                # per day: weights halve in ~1 year
+MIN_WEIGHT = 1e-3          # older fixtures are left out of the fit
+RIDGE = 0.5                # penalty on attack/defence (shrinks sparse teams to average)
+NEWTON_STEPS = 25
+RHO_GRID = np.linspace(-0.2, 0.2, 81)
+MAX_GOALS = 10
+MIN_FIXTURES = 20          # fewer played fixtures than this: no model
+
+
+def load_competition_results(db: Session, competition_id: int, until: datetime | None):
+    """Played fixtures of a competition (all seasons) up to `until`, one query."""
+    return db.execute(text("""
+        SELECT f.home_team_id, f.away_team_id, f.ft_home_score, f.ft_away_score, f.kickoff_utc
+        FROM fixture f
+        JOIN stage_round sr ON sr.stage_round_id = f.stage_round_id
+        JOIN stage s ON s.stage_id = sr.stage_id
+        JOIN season se ON se.season_id = s.season_id
+        WHERE se.competition_id = :cid
+          AND f.ft_home_score IS NOT NULL
+          AND f.ft_away_score IS NOT NULL
+          AND f.kickoff_utc IS NOT NULL
+          AND (CAST(:until AS TIMESTAMPTZ) IS NULL OR f.kickoff_utc <= :until)
+    """), {"cid": competition_id, "until": until}).all()
+
+
+def _dc_tau(hg: np.ndarray, ag: np.ndarray, lam: np.ndarray, mu: np.ndarray, rho: float) -> np.ndarray:
+    tau = np.ones_like(lam)
+    tau = np.where((hg == 0) & (ag == 0), 1.0 - lam * mu * rho, tau)
+    tau = np.where((hg == 0) & (ag == 1), 1.0 + lam * rho, tau)
+    tau = np.where((hg == 1) & (ag == 0), 1.0 + mu * rho, tau)
+    tau = np.where((hg == 1) & (ag == 1), 1.0 - rho, tau)
+    return tau
+
+
+def fit_dixon_coles(home: np.ndarray, away: np.ndarray, hg: np.ndarray, ag: np.ndarray,
+                    weights: np.ndarray, n_teams: int) -> dict:
+    """
+    Fit on index arrays (teams 0..n_teams-1). Returns
+    {"intercept", "home_adv", "rho", "attack": array, "defence": array}.
+    """
+    m = len(home)
+    p = 2 + 2 * n_teams                     # intercept, home_adv, attack[n], defence[n]
+    rows = np.arange(m)
+
+    # stacked design: first m rows are home goals, next m away goals
+    X = np.zeros((2 * m, p))
+    X[:, 0] = 1.0
+    X[rows, 1] = 1.0
+    X[rows, 2 + home] = 1.0
+    X[rows, 2 + n_teams + away] = -1.0
+    X[m + rows, 2 + away] = 1.0
+    X[m + rows, 2 + n_teams + home] = -1.0
+    y = np.concatenate([hg, ag]).astype(np.float64)
+    w = np.concatenate([weights, weights])
+
+    penalty = np.full(p, RIDGE)
+    penalty[:2] = 0.0
+    theta = np.zeros(p)
+    theta[0] = np.log(max((w * y).sum() / w.sum(), 0.1))
+
+    for _ in range(NEWTON_STEPS):
+        lam = np.exp(X @ theta)
+        grad = X.T @ (w * (y - lam)) - penalty * theta
+        hess = (X * (w * lam)[:, None]).T @ X + np.diag(penalty)
+        step = np.linalg.solve(hess + 1e-9 * np.eye(p), grad)
+        theta += step
+        if np.abs(step).max() < 1e-6:
+            break
+
+    lam = np.exp(X[:m] @ theta)
+    mu = np.exp(X[m:] @ theta)
+    best_rho, best_ll = 0.0, -np.inf
+    for rho in RHO_GRID:
+        tau = _dc_tau(hg, ag, lam, mu, rho)
+        if (tau <= 0).any():
+            continue
+        ll = (weights * np.log(tau)).sum()
+        if ll > best_ll:
+            best_rho, best_ll = float(rho), ll
+
+    return {
+        "intercept": float(theta[0]),
+        "home_adv": float(theta[1]),
+        "rho": best_rho,
+        "attack": theta[2:2 + n_teams],
+        "defence": theta[2 + n_teams:],
+    }
+
+
+def fit_season_model(db: Session, season_id: int) -> bool:
+    """
+    Fit and store the model of one season from its competition's history up to
+    the season's last fixture. Returns False when there is too little data.
+    Caller commits.
+    """
+    meta = db.execute(text("""
+        SELECT se.competition_id, MAX(f.kickoff_utc) AS last_kickoff
+        FROM season se
+        LEFT JOIN stage s        ON s.season_id = se.season_id
+        LEFT JOIN stage_round sr ON sr.stage_id = s.stage_id
+        LEFT JOIN fixture f      ON f.stage_round_id = sr.stage_round_id
+        WHERE se.season_id = :sid
+        GROUP BY se.competition_id
+    """), {"sid": season_id}).first()
+    if meta is None:
+        return False
+
+    rows = load_competition_results(db, meta[0], meta[1])
+    if len(rows) < MIN_FIXTURES:
+        return False
+
+    reference = max(r[4] for r in rows)
+    days = np.array([(reference - r[4]).total_seconds() / 86400.0 for r in rows])
+    weights = np.exp(-XI * days)
+    keep = weights >= MIN_WEIGHT
+    rows = [r for r, k in zip(rows, keep) if k]
+    weights = weights[keep]
+    if len(rows) < MIN_FIXTURES:
+        return False
+
+    team_ids = sorted({r[0] for r in rows} | {r[1] for r in rows})
+    idx = {t: i for i, t in enumerate(team_ids)}
+    fit = fit_dixon_coles(
+        np.array([idx[r[0]] for r in rows]),
+        np.array([idx[r[1]] for r in rows]),
+        np.array([r[2] for r in rows]),
+        np.array([r[3] for r in rows]),
+        weights,
+        len(team_ids),
+    )
+
+    db.execute(text("""
+        INSERT INTO match_model (season_id, competition_id, fitted_at, reference_utc,
+                                 n_fixtures, intercept, home_adv, rho, xi)
+        VALUES (:sid, :cid, NOW(), :ref, :n, :intercept, :home_adv, :rho, :xi)
+        ON CONFLICT (season_id) DO UPDATE SET
+          competition_id = EXCLUDED.competition_id,
+          fitted_at      = EXCLUDED.fitted_at,
+          reference_utc  = EXCLUDED.reference_utc,
+          n_fixtures     = EXCLUDED.n_fixtures,
+          intercept      = EXCLUDED.intercept,
+          home_adv       = EXCLUDED.home_adv,
+          rho            = EXCLUDED.rho,
+          xi             = EXCLUDED.xi
+    """), {
+        "sid": season_id, "cid": meta[0], "ref": reference, "n": len(rows),
+        "intercept": fit["intercept"], "home_adv": fit["home_adv"], "rho": fit["rho"], "xi": XI,
+    })
+    db.execute(text("DELETE FROM match_model_team WHERE season_id = :sid"), {"sid": season_id})
+    db.execute(
+        text("""
+            INSERT INTO match_model_team (season_id, team_id, attack, defence)
+            VALUES (:sid, :tid, :attack, :defence)
+        """),
+        [
+            {"sid": season_id, "tid": t, "attack": float(fit["attack"][i]), "defence": float(fit["defence"][i])}
+            for t, i in idx.items()
+        ],
+    )
+    return True
+
+
+def refit_season_models(db: Session, season_ids: Iterable[int]) -> None:
+    for sid in sorted(set(season_ids)):
+        fit_season_model(db, sid)
+
+
+def outcome_matrix(lam: float, mu: float, rho: float, max_goals: int = MAX_GOALS) -> np.ndarray:
+    """P(home = i, away = j) for i, j in 0..max_goals, Dixon–Coles adjusted and renormalised."""
+    goals = np.arange(max_goals + 1)
+    log_fact = np.cumsum(np.log(np.maximum(goals, 1)))
+    ph = np.exp(goals * np.log(lam) - lam - log_fact)
+    pa = np.exp(goals * np.log(mu) - mu - log_fact)
+    matrix = np.outer(ph, pa)
+    matrix[0, 0] *= 1.0 - lam * mu * rho
+    matrix[0, 1] *= 1.0 + lam * rho
+    matrix[1, 0] *= 1.0 + mu * rho
+    matrix[1, 1] *= 1.0 - rho
+    return matrix / matrix.sum()
+
+
+def predict_fixture(db: Session, season_id: int, home_team_id: int, away_team_id: int) -> dict | None:
+    """
+    Outcome probabilities from the stored parameters (one query, no fitting).
+    Teams without parameters (e.g. newcomers) count as average.
+    None when the season has no fitted model.
+    """
+    rows = db.execute(text("""
+        SELECT m.intercept, m.home_adv, m.rho, m.fitted_at, m.n_fixtures,
+               mt.team_id, mt.attack, mt.defence
+        FROM match_model m
+        LEFT JOIN match_model_team mt
+               ON mt.season_id = m.season_id AND mt.team_id IN (:home, :away)
+        WHERE m.season_id = :sid
+    """), {"sid": season_id, "home": home_team_id, "away": away_team_id}).mappings().all()
+    if not rows:
+        return None
+    m = rows[0]
+    params = {r["team_id"]: (r["attack"], r["defence"]) for r in rows if r["team_id"] is not None}
+    att_h, def_h = params.get(home_team_id, (0.0, 0.0))
+    att_a, def_a = params.get(away_team_id, (0.0, 0.0))
+
+    lam = float(np.exp(m["intercept"] + m["home_adv"] + att_h - def_a))
+    mu = float(np.exp(m["intercept"] + att_a - def_h))
+    matrix = outcome_matrix(lam, mu, m["rho"])
+
+    top = np.argsort(matrix, axis=None)[::-1][:5]
+    return {
+        "lambda_home": lam,
+        "lambda_away": mu,
+        "p_home": float(np.tril(matrix, -1).sum()),
+        "p_draw": float(np.trace(matrix)),
+        "p_away": float(np.triu(matrix, 1).sum()),
+        "top_scores": [(int(i // matrix.shape[1]), int(i % matrix.shape[1]), float(matrix.flat[i])) for i in top],
+        "matrix": matrix[:6, :6].tolist(),
+        "fitted_at": m["fitted_at"],
+        "n_fixtures": m["n_fixtures"],
+    }
+
@@ -0,0 +1,211 @@
+"""
+Records per competition, season and team, persisted in record_entry.
+
+Single-match records (biggest win/defeat, highest scoring, attendance) and
+runs (wins, unbeaten, failing to score) are computed in one set-based
+statement per scope kind: runs are gaps-and-islands over ROW_NUMBER() per
+(scope, team), and every category keeps its TOP_N entries. Goals include
+extra time; shoot-outs do not count.
+
+Only the scopes touched by a fixture import are rebuilt (see
+importers/utils/fixture_sync.py); pages read record_entry only.
+"""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Iterable
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+TOP_N = 10
+MIN_RUN = 2
+SCOPE_BATCH = 500
+
+CATEGORIES = {
+    "biggest_win": "Biggest wins",
+    "biggest_defeat": "Heaviest defeats",
+    "highest_scoring": "Highest scoring matches",
+    "attendance": "Highest attendances",
+    "win_run": "Longest winning runs",
+    "unbeaten_run": "Longest unbeaten runs",
+    "scoreless_run": "Longest runs without scoring",
+}
+RUN_CATEGORIES = ("win_run", "unbeaten_run", "scoreless_run")
+
+# scope -> (filter on fixtures, scope id of the home row, of the away row, filter on team rows)
+_SCOPES = {
+    "competition": ("se.competition_id = ANY(:ids)", "competition_id", "competition_id", "TRUE"),
+    "season": ("se.season_id = ANY(:ids)", "season_id", "season_id", "TRUE"),
+    "team": ("(f.home_team_id = ANY(:ids) OR f.away_team_id = ANY(:ids))",
+             "home_team_id", "away_team_id", "team_id = ANY(:ids)"),
+}
+
+
+def _records_sql(scope: str) -> str:
+    fixture_filter, home_scope, away_scope, row_filter = _SCOPES[scope]
+    per_team = scope == "team"
+    # a competition/season lists each match once (home row); a team from its own side
+    matches = "scoped" if per_team else "scoped WHERE is_home"
+    margin_win = "gf - ga" if per_team else "ABS(gf - ga)"
+    cond_win = "gf > ga" if per_team else "gf <> ga"
+    defeats = """
+          UNION ALL
+          SELECT scope_id, 'biggest_defeat', (ga - gf)::INT, opponent_id,
+                 fixture_id, NULL::BIGINT, kickoff_utc, kickoff_utc, FALSE, (gf + ga)::INT
+          FROM matches WHERE gf < ga
+    """ if per_team else ""
+
+    return f"""
+        WITH base AS (
+          SELECT f.fixture_id, f.kickoff_utc, f.attendance, se.competition_id, se.season_id,
+                 f.home_team_id, f.away_team_id,
+                 COALESCE(f.et_home_score, f.ft_home_score) AS hg,
+                 COALESCE(f.et_away_score, f.ft_away_score) AS ag
+          FROM fixture f
+          JOIN stage_round sr ON sr.stage_round_id = f.stage_round_id
+          JOIN stage s        ON s.stage_id = sr.stage_id
+          JOIN season se      ON se.season_id = s.season_id
+          WHERE f.ft_home_score IS NOT NULL
+            AND f.ft_away_score IS NOT NULL
+            AND {fixture_filter}
+        ),
+        tm AS (
+          SELECT {home_scope} AS scope_id, fixture_id, kickoff_utc, attendance,
+                 home_team_id AS team_id, away_team_id AS opponent_id, hg AS gf, ag AS ga, TRUE AS is_home
+          FROM base
+          UNION ALL
+          SELECT {away_scope}, fixture_id, kickoff_utc, attendance,
+                 away_team_id, home_team_id, ag, hg, FALSE
+          FROM base
+        ),
+        scoped AS (
+          SELECT * FROM tm WHERE {row_filter}
+        ),
+        matches AS (
+          SELECT * FROM {matches}
+        ),
+        single AS (
+          SELECT scope_id, 'biggest_win' AS category, ({margin_win})::INT AS value,
+                 CASE WHEN gf > ga THEN team_id ELSE opponent_id END AS team_id,
+                 fixture_id, NULL::BIGINT AS last_fixture_id,
+                 kickoff_utc AS start_utc, kickoff_utc AS end_utc, FALSE AS ongoing,
+                 (gf + ga)::INT AS tiebreak
+          FROM matches WHERE {cond_win}
+          {defeats}
+          UNION ALL
+          SELECT scope_id, 'highest_scoring', (gf + ga)::INT, NULL::BIGINT,
+                 fixture_id, NULL::BIGINT, kickoff_utc, kickoff_utc, FALSE, ABS(gf - ga)::INT
+          FROM matches
+          UNION ALL
+          SELECT scope_id, 'attendance', attendance, NULL::BIGINT,
+                 fixture_id, NULL::BIGINT, kickoff_utc, kickoff_utc, FALSE, 0
+          FROM matches WHERE attendance IS NOT NULL AND attendance > 0
+        ),
+        seq AS (
+          SELECT scope_id, team_id, fixture_id, kickoff_utc, gf, ga,
+                 ROW_NUMBER() OVER (PARTITION BY scope_id, team_id ORDER BY kickoff_utc, fixture_id) AS n,
+                 COUNT(*) OVER (PARTITION BY scope_id, team_id) AS last_n
+          FROM scoped
+        ),
+        run_rows AS (
+          SELECT 'win_run' AS category, scope_id, team_id, fixture_id, kickoff_utc, n, last_n,
+                 n - ROW_NUMBER() OVER (PARTITION BY scope_id, team_id ORDER BY n) AS grp
+          FROM seq WHERE gf > ga
+          UNION ALL
+          SELECT 'unbeaten_run', scope_id, team_id, fixture_id, kickoff_utc, n, last_n,
+                 n - ROW_NUMBER() OVER (PARTITION BY scope_id, team_id ORDER BY n)
+          FROM seq WHERE gf >= ga
+          UNION ALL
+          SELECT 'scoreless_run', scope_id, team_id, fixture_id, kickoff_utc, n, last_n,
+                 n - ROW_NUMBER() OVER (PARTITION BY scope_id, team_id ORDER BY n)
+          FROM seq WHERE gf = 0
+        ),
+        runs AS (
+          SELECT scope_id, category, COUNT(*)::INT AS value, team_id,
+                 (ARRAY_AGG(fixture_id ORDER BY n))[1] AS fixture_id,
+                 (ARRAY_AGG(fixture_id ORDER BY n DESC))[1] AS last_fixture_id,
+                 MIN(kickoff_utc) AS start_utc, MAX(kickoff_utc) AS end_utc,
+                 MAX(n) = MAX(last_n) AS ongoing, 0 AS tiebreak
+          FROM run_rows
+          GROUP BY scope_id, category, team_id, grp
+          HAVING COUNT(*) >= :min_run
+        ),
+        ranked AS (
+          SELECT r.*,
+                 ROW_NUMBER() OVER (
+                   PARTITION BY scope_id, category
+                   ORDER BY value DESC, tiebreak DESC, start_utc ASC, fixture_id ASC
+                 ) AS rank
+          FROM (SELECT * FROM single UNION ALL SELECT * FROM runs) r
+        )
+        INSERT INTO record_entry (scope, scope_id, category, rank, value, team_id,
+                                  fixture_id, last_fixture_id, start_utc, end_utc, ongoing)
+        SELECT :scope, scope_id, category, rank, value, team_id,
+               fixture_id, last_fixture_id, start_utc, end_utc, ongoing
+        FROM ranked
+        WHERE rank <= :top
+    """
+
+
+def rebuild_records(db: Session, scope: str, scope_ids: Iterable[int]) -> None:
+    """Recompute every category of the given scopes. Caller commits."""
+    ids = sorted(set(scope_ids))
+    sql = text(_records_sql(scope))
+    for i in range(0, len(ids), SCOPE_BATCH):
+        chunk = ids[i:i + SCOPE_BATCH]
+        db.execute(text("""
+            DELETE FROM record_entry WHERE scope = :scope AND scope_id = ANY(:ids)
+        """), {"scope": scope, "ids": chunk})
+        db.execute(sql, {"scope": scope, "ids": chunk, "top": TOP_N, "min_run": MIN_RUN})
+
+
+def update_records(db: Session, since: datetime) -> None:
+    """
+    Incremental update after a fixture import: the competitions, seasons and
+    teams of every fixture with updated_at >= since. Caller commits.
+    """
+    rows = db.execute(text("""
+        SELECT DISTINCT se.competition_id, se.season_id, f.home_team_id, f.away_team_id
+        FROM fixture f
+        JOIN stage_round sr ON sr.stage_round_id = f.stage_round_id
+        JOIN stage s        ON s.stage_id = sr.stage_id
+        JOIN season se      ON se.season_id = s.season_id
+        WHERE f.updated_at >= :since
+    """), {"since": since}).all()
+    if not rows:
+        return
+    rebuild_records(db, "competition", {r[0] for r in rows})
+    rebuild_records(db, "season", {r[1] for r in rows})
+    rebuild_records(db, "team", {r[2] for r in rows} | {r[3] for r in rows})
+
+
+def records_for(db: Session, scope: str, scope_id: int) -> list[dict]:
+    """
+    Stored records of one scope, one query, as
+    [{"category", "label", "run", "entries": [...]}] in CATEGORIES order
+    (categories without entries are left out).
+    """
+    rows = db.execute(text("""
+        SELECT r.category, r.rank, r.value, r.team_id, t.name AS team_name,
+               r.fixture_id, r.last_fixture_id, r.start_utc, r.end_utc, r.ongoing,
+               f.home_team_id, th.name AS home_name, f.away_team_id, ta.name AS away_name,
+               COALESCE(f.et_home_score, f.ft_home_score) AS home_score,
+               COALESCE(f.et_away_score, f.ft_away_score) AS away_score
+        FROM record_entry r
+        LEFT JOIN team t     ON t.team_id = r.team_id
+        LEFT JOIN fixture f  ON f.fixture_id = r.fixture_id AND r.category <> ALL(:runs)
+        LEFT JOIN team th    ON th.team_id = f.home_team_id
+        LEFT JOIN team ta    ON ta.team_id = f.away_team_id
+        WHERE r.scope = :scope AND r.scope_id = :sid
+        ORDER BY r.category, r.rank
+    """), {"scope": scope, "sid": scope_id, "runs": list(RUN_CATEGORIES)}).mappings().all()
+
+    by_category: dict[str, list[dict]] = {}
+    for r in rows:
+        by_category.setdefault(r["category"], []).append(dict(r))
+    return [
+        {"category": c, "label": label, "run": c in RUN_CATEGORIES, "entries": by_category[c]}
+        for c, label in CATEGORIES.items()
+        if c in by_category
+    ]
@@ -0,0 +1,418 @@
+"""
+"Who can still qualify / clinch" for groups and league stages.
+
+Positions are decided on points only: level points count against a team when
+checking whether it has clinched a place and in its favour when checking
+whether it is eliminated, so both answers hold whatever the tiebreakers say.
+
+For each team and target (top k) two questions are asked of the remaining
+fixtures, each with the team's own results fixed at their extreme (all lost /
+all won — anything else only helps / hurts it):
+
+  clinched   — can k other teams end level with or above its worst total?
+  eliminated — can at most k-1 other teams end strictly above its best total?
+
+Each question is answered by enumerating the other fixtures as a matrix of
+points states (one row per distinct state, one column per undecided team):
+every fixture multiplies the rows by its three results, points are capped at
+the threshold and duplicate rows merged (memoization), teams whose last
+fixture was played fold into a counter, and rows whose bounds can no longer
+change the answer are pruned. Fixtures involving a team already settled on
+one side of the threshold are fixed to the adversarial result up front.
+
+League seasons take up to a second to enumerate, so they are computed in the
+background after fixture imports (season_sim.queue_season_simulations) and
+stored in league_scenarios; the overview reads the stored result and only
+runs the bound check in the request until it is there. Groups are small
+enough to enumerate on a cache miss.
+"""
+from __future__ import annotations
+
+import json
+from collections import Counter
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from ..core.cache import LRUCache
+from .season_data import load_season_fixtures, season_fixture_version, season_inputs
+from .table_variants import season_points_adjustments, season_points_rule
+
+MAX_STATES = 20_000      # rows per enumeration before giving up (status stays "open")
+MAX_GAMES_LEFT = 5       # beyond this, only the bound check runs (early season)
+GROUP_PLACES = 2
+EUROPE_PLACES = 4        # league targets (also the overview's probability bands)
+RELEGATION_PLACES = 3
+
+RESULTS = ("W", "D", "L")
+
+_cache = LRUCache(maxsize=256)
+
+
+def _settle(pts: np.ndarray, fixtures: list[tuple[int, int]], threshold: int, rule, at_least: bool):
+    """
+    Fix every fixture involving a team that is on a known side of the
+    threshold whatever happens: the undecided side gets the result that serves
+    the question (the win when asking "at least", the loss for "at most").
+    Returns (points, fixtures still to enumerate).
+    """
+    win, draw, loss = rule
+    pts = pts.copy()
+    n = len(pts)
+    while fixtures:
+        games = np.bincount(np.asarray(fixtures).ravel(), minlength=n)
+        decided = (pts + loss * games >= threshold) | (pts + win * games < threshold)
+        rest = []
+        for i, j in fixtures:
+            if decided[i] and decided[j]:
+                pts[i] += win; pts[j] += loss          # neither can cross; any result will do
+            elif decided[i] or decided[j]:
+                live, other = (j, i) if decided[i] else (i, j)
+                pts[live] += win if at_least else loss
+                pts[other] += loss if at_least else win
+            else:
+                rest.append((i, j))
+        if len(rest) == len(fixtures):
+            break
+        fixtures = rest
+    return pts, fixtures
+
+
+def _elimination_order(fixtures: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    """Play out the team with the fewest fixtures first, so columns fold away early."""
+    remaining, order = list(fixtures), []
+    while remaining:
+        deg = Counter(t for f in remaining for t in f)
+        t = min(deg, key=lambda x: (deg[x], x))
+        order += [f for f in remaining if t in f]
+        remaining = [f for f in remaining if t not in f]
+    return order
+
+
+def _can_reach(pts, fixtures, threshold: int, k: int, rule, at_least: bool) -> bool | None:
+    """
+    Can the `fixtures` (index pairs into `pts`) end with at least (at_least)
+    or at most (not at_least) `k` teams on >= threshold points?
+    None when the enumeration outgrows MAX_STATES.
+    """
+    win, draw, loss = rule
+    pts, fixtures = _settle(np.asarray(pts, dtype=np.int64), list(fixtures), threshold, rule, at_least)
+
+    live = sorted({t for f in fixtures for t in f})
+    count = int(sum(1 for t in range(len(pts)) if t not in live and pts[t] >= threshold))
+    cols = list(live)
+    left = np.array([sum(t in f for f in fixtures) for t in cols], dtype=np.int64)
+    states = np.minimum(pts[cols], threshold)[None, :]
+    counts = np.array([count], dtype=np.int64)
+
+    inc_home = np.array([win, draw, loss], dtype=np.int64)
+    inc_away = inc_home[::-1]
+
+    for i, j in _elimination_order(fixtures):
+        ci, cj = cols.index(i), cols.index(j)
+        n_states = states.shape[0]
+        states = np.repeat(states, 3, axis=0)
+        counts = np.repeat(counts, 3)
+        states[:, ci] = np.minimum(states[:, ci] + np.tile(inc_home, n_states), threshold)
+        states[:, cj] = np.minimum(states[:, cj] + np.tile(inc_away, n_states), threshold)
+        left[ci] -= 1
+        left[cj] -= 1
+
+        done = [c for c in (ci, cj) if left[c] == 0]
+        if done:
+            counts = counts + (states[:, done] >= threshold).sum(axis=1)
+            states = np.delete(states, done, axis=1)
+            left = np.delete(left, done)
+            cols = [t for c, t in enumerate(cols) if c not in done]
+
+        lower = counts + (states >= threshold).sum(axis=1)
+        upper = counts + (states + win * left >= threshold).sum(axis=1)
+        if at_least:
+            if (lower >= k).any():
+                return True
+            keep = upper >= k
+        else:
+            if (upper <= k).any():
+                return True
+            keep = lower <= k
+        if not keep.any():
+            return False
+        merged = np.unique(np.column_stack([states[keep], counts[keep]]), axis=0)
+        if merged.shape[0] > MAX_STATES:
+            return None
+        states, counts = merged[:, :-1], merged[:, -1]
+
+    return bool((counts >= k).any()) if at_least else bool((counts <= k).any())
+
+
+def _others(pts: np.ndarray, fixtures, t: int):
+    """Points and fixtures of everyone but `t`, re-indexed."""
+    keep = [i for i in range(len(pts)) if i != t]
+    pos = {old: new for new, old in enumerate(keep)}
+    return pts[keep], [(pos[i], pos[j]) for i, j in fixtures]
+
+
+def _apply(pts: np.ndarray, fixture: tuple[int, int], home_result: str, rule) -> np.ndarray:
+    win, draw, loss = rule
+    pts = pts.copy()
+    i, j = fixture
+    gi, gj = {"W": (win, loss), "D": (draw, draw), "L": (loss, win)}[home_result]
+    pts[i] += gi
+    pts[j] += gj
+    return pts
+
+
+def _status(pts: np.ndarray, fixtures, t: int, k: int, rule) -> str:
+    """'clinched' | 'eliminated' | 'open' for team index t and the top k."""
+    if k >= len(pts):
+        return "clinched"
+    win, draw, loss = rule
+    own = [f for f in fixtures if t in f]
+    rest = [f for f in fixtures if t not in f]
+
+    worst, best = pts.copy(), pts.copy()
+    for i, j in own:
+        opp = j if i == t else i
+        worst[t] += loss; worst[opp] += win
+        best[t] += win; best[opp] += loss
+
+    others, others_fx = _others(worst, rest, t)
+    if _can_reach(others, others_fx, int(worst[t]), k, rule, at_least=True) is False:
+        return "clinched"
+    others, others_fx = _others(best, rest, t)
+    if _can_reach(others, others_fx, int(best[t]) + 1, k - 1, rule, at_least=False) is False:
+        return "eliminated"
+    return "open"
+
+
+def _bound_status(pts: np.ndarray, games: np.ndarray, t: int, k: int, rule) -> str:
+    """Cheap sufficient check without enumeration (early season)."""
+    win, draw, loss = rule
+    lo, hi = pts + loss * games, pts + win * games
+    others = np.arange(len(pts)) != t
+    if (hi[others] >= lo[t]).sum() < k:
+        return "clinched"
+    if (lo[others] > hi[t]).sum() >= k:
+        return "eliminated"
+    return "open"
+
+
+def compute_scenarios(
+    fixtures,
+    names: dict[int, str],
+    targets: dict[str, int],
+    points_rule: tuple[int, int, int] = (3, 1, 0),
+    adjustments: dict[int, int] | None = None,
+    max_games_left: int = MAX_GAMES_LEFT,
+) -> dict:
+    """
+    Mathematical status of every team for each target ({label: top k}).
+
+    `fixtures` are rows with home/away team ids and FT scores (None = still
+    to play), in kickoff order. When any team has more than `max_games_left`
+    games to play, every team only gets the bound check and no next-result
+    breakdown.
+
+    {"targets", "exact", "n_remaining", "teams": [{team_id, name, pts, max_pts,
+      games_left, status: {label: str}, next: None | {opponent, home,
+      outcomes: {label: {"W"|"D"|"L": str}}}}]}
+    """
+    win, draw, loss = points_rule
+    team_ids = sorted(names, key=lambda t: (names[t], t))
+    idx = {t: i for i, t in enumerate(team_ids)}
+    n = len(team_ids)
+
+    pts = np.zeros(n, dtype=np.int64)
+    remaining: list[tuple[int, int]] = []
+    for f in fixtures:
+        h, a = idx[f["home_team_id"]], idx[f["away_team_id"]]
+        if f["ft_home_score"] is None or f["ft_away_score"] is None:
+            remaining.append((h, a))
+        elif f["ft_home_score"] > f["ft_away_score"]:
+            pts[h] += win; pts[a] += loss
+        elif f["ft_home_score"] < f["ft_away_score"]:
+            pts[h] += loss; pts[a] += win
+        else:
+            pts[h] += draw; pts[a] += draw
+    for team_id, delta in (adjustments or {}).items():
+        if team_id in idx:
+            pts[idx[team_id]] += delta
+
+    games = np.bincount(np.asarray(remaining, dtype=np.int64).ravel(), minlength=n) if remaining else np.zeros(n, dtype=np.int64)
+    exact = int(games.max(initial=0)) <= max_games_left
+
+    teams = []
+    for t, team_id in enumerate(team_ids):
+        if exact:
+            status = {label: _status(pts, remaining, t, k, points_rule) for label, k in targets.items()}
+        else:
+            status = {label: _bound_status(pts, games, t, k, points_rule) for label, k in targets.items()}
+
+        nxt = None
+        own = [f for f in remaining if t in f]
+        if exact and own and any(s == "open" for s in status.values()):
+            fx = own[0]
+            home = fx[0] == t
+            rest = [f for f in remaining if f is not fx]
+            outcomes = {}
+            for label, k in targets.items():
+                if status[label] != "open":
+                    continue
+                outcomes[label] = {}
+                for r in RESULTS:
+                    home_result = r if home else {"W": "L", "D": "D", "L": "W"}[r]
+                    outcomes[label][r] = _status(_apply(pts, fx, home_result, points_rule), rest, t, k, points_rule)
+            nxt = {"opponent": names[team_ids[fx[1] if home else fx[0]]], "home": home, "outcomes": outcomes}
+
+        teams.append({
+            "team_id": team_id,
+            "name": names[team_id],
+            "pts": int(pts[t]),
+            "max_pts": int(pts[t] + win * games[t]),
+            "games_left": int(games[t]),
+            "status": status,
+            "next": nxt,
+        })
+    teams.sort(key=lambda x: (-x["pts"], -x["max_pts"], x["name"]))
+
+    return {"targets": targets, "exact": exact, "n_remaining": len(remaining), "teams": teams}
+
+
+# ---- Loaders -----------------------------------------------------------------
+
+def group_scenarios(db: Session, group_id: int, places: int = GROUP_PLACES) -> dict | None:
+    """Scenarios for one group (3-1-0 + group_points_adjustment, like the live group table)."""
+    version = db.execute(text("""
+        SELECT COUNT(*), MAX(updated_at) FROM fixture WHERE group_id = :gid
+    """), {"gid": group_id}).first()
+    key = ("group", group_id, tuple(version), places)
+    cached = _cache.get(key)
+    if cached is not None:
+        return cached
+
+    fixtures = db.execute(text("""
+        SELECT f.home_team_id, th.name AS home_name,
+               f.away_team_id, ta.name AS away_name,
+               f.ft_home_score, f.ft_away_score
+        FROM fixture f
+        JOIN team th ON th.team_id = f.home_team_id
+        JOIN team ta ON ta.team_id = f.away_team_id
+        WHERE f.group_id = :gid
+          AND f.fixture_status NOT IN ('canceled', 'cancelled')
+        ORDER BY f.kickoff_utc ASC, f.fixture_id ASC
+    """), {"gid": group_id}).mappings().all()
+    if not fixtures:
+        return None
+    names: dict[int, str] = {}
+    for f in fixtures:
+        names[f["home_team_id"]] = f["home_name"]
+        names[f["away_team_id"]] = f["away_name"]
+    for r in db.execute(text("""
+        SELECT sgt.team_id, t.name
+        FROM stage_group_team sgt
+        JOIN team t ON t.team_id = sgt.team_id
+        WHERE sgt.group_id = :gid
+    """), {"gid": group_id}).mappings():
+        names.setdefault(r["team_id"], r["name"])
+    adjustments = dict(db.execute(text("""
+        SELECT team_id, SUM(points_delta) FROM group_points_adjustment
+        WHERE group_id = :gid GROUP BY team_id
+    """), {"gid": group_id}).all())
+
+    result = compute_scenarios(fixtures, names, {"Qualify": places}, adjustments=adjustments)
+    _cache.set(key, result)
+    return result
+
+
+def league_targets(n_teams: int) -> dict[str, int]:
+    return {"Title": 1, f"Top {EUROPE_PLACES}": EUROPE_PLACES, "Survival": n_teams - RELEGATION_PLACES}
+
+
+def league_stage_id(db: Session, season_id: int) -> int | None:
+    """The season's league stage: the first with format 'league', else the first stage."""
+    return db.execute(text("""
+        SELECT stage_id FROM stage
+        WHERE season_id = :sid
+        ORDER BY (LOWER(format) = 'league') DESC NULLS LAST, stage_order ASC
+        LIMIT 1
+    """), {"sid": season_id}).scalar_one_or_none()
+
+
+def league_scenarios(
+    db: Session,
+    season_id: int,
+    stage_id: int,
+    points_rule: tuple[int, int, int] = (3, 1, 0),
+    adjustments: dict[int, int] | None = None,
+    version: tuple | None = None,
+    max_games_left: int = MAX_GAMES_LEFT,
+) -> dict | None:
+    """
+    Scenarios for the league stage of a season (other stages' fixtures don't
+    count), with league_targets() for its teams. Points as in the standings.
+    """
+    adjustments = adjustments or {}
+    version = version or season_fixture_version(db, season_id)
+    key = ("league", season_id, stage_id, version, tuple(points_rule), tuple(sorted(adjustments.items())), max_games_left)
+    cached = _cache.get(key)
+    if cached is not None:
+        return cached
+
+    fixtures = load_season_fixtures(db, season_id, stage_id=stage_id)
+    if not fixtures:
+        return None
+    names: dict[int, str] = {}
+    for f in fixtures:
+        names[f["home_team_id"]] = f["home_name"]
+        names[f["away_team_id"]] = f["away_name"]
+
+    result = compute_scenarios(fixtures, names, league_targets(len(names)), points_rule, adjustments, max_games_left)
+    _cache.set(key, result)
+    return result
+
+
+def store_league_scenarios(db: Session, season_id: int) -> bool:
+    """
+    Compute and store the league scenarios of a season with their inputs.
+    Returns False (and removes any stored result) when there is nothing to
+    store. Caller commits.
+    """
+    db.execute(text("DELETE FROM league_scenarios WHERE season_id = :sid"), {"sid": season_id})
+    stage_id = league_stage_id(db, season_id)
+    if stage_id is None:
+        return False
+    version = season_fixture_version(db, season_id)
+    points_rule = season_points_rule(db, season_id)
+    adjustments = season_points_adjustments(db, season_id)
+    result = league_scenarios(db, season_id, stage_id, points_rule, adjustments, version)
+    if result is None:
+        return False
+    db.execute(text("""
+        INSERT INTO league_scenarios (season_id, stage_id, inputs, computed_at, result)
+        VALUES (:sid, :stage_id, :inputs, NOW(), CAST(:result AS JSON))
+    """), {"sid": season_id, "stage_id": stage_id, "inputs": season_inputs(version, points_rule, adjustments),
+           "result": json.dumps(result)})
+    return True
+
+
+def update_league_scenarios(db: Session, season_ids) -> None:
+    """Recompute the stored scenarios of the league seasons among `season_ids`."""
+    if not season_ids:
+        return
+    league_ids = db.execute(text("""
+        SELECT se.season_id
+        FROM season se
+        JOIN competition c ON c.competition_id = se.competition_id
+        WHERE se.season_id = ANY(:ids) AND LOWER(c.type) = 'league'
+    """), {"ids": sorted(set(season_ids))}).scalars().all()
+    for sid in league_ids:
+        store_league_scenarios(db, sid)
+
+
+def load_league_scenarios(db: Session, season_id: int, stage_id: int, inputs: str) -> dict | None:
+    """The stored scenarios of a season, or None when missing or computed from other inputs (season_inputs)."""
+    return db.execute(text("""
+        SELECT result FROM league_scenarios
+        WHERE season_id = :sid AND stage_id = :stage_id AND inputs = :inputs
+    """), {"sid": season_id, "stage_id": stage_id, "inputs": inputs}).scalar_one_or_none()
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import hashlib
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+
+def season_fixture_version(db: Session, season_id: int) -> tuple:
+    """
+    Cheap fingerprint of a season's fixtures: (count, latest updated_at).
+    Anything derived from the fixtures of a season can be cached under it.
+    """
+    row = db.execute(text("""
+        SELECT COUNT(f.fixture_id), MAX(f.updated_at)
+        FROM fixture f
+        JOIN stage_round sr ON sr.stage_round_id = f.stage_round_id
+        JOIN stage s ON s.stage_id = sr.stage_id
+        WHERE s.season_id = :season_id
+    """), {"season_id": season_id}).first()
+    return (int(row[0] or 0), row[1])
+
+
+def season_inputs(version: tuple, points_rule: tuple[int, int, int], adjustments: dict[int, int]) -> str:
+    """
+    Fingerprint of what a stored, fixture-derived result of a season depends
+    on: fixture version, points rule and adjustments.
+    """
+    count, updated_at = version
+    stamp = updated_at.isoformat() if updated_at is not None else ""
+    raw = f"{count}|{stamp}|{tuple(points_rule)}|{sorted(adjustments.items())}"
+    return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+
+
+def load_season_fixtures(db: Session, season_id: int, stage_id: int | None = None):
+    """
+    All fixtures of a season (played and remaining), with the team names;
+    only those of one stage with `stage_id`. Same fixture → stage_round →
+    stage → season chain as the standings queries. Canceled fixtures are left
+    out; postponed ones count as remaining.
+    """
+    stage_filter = "TRUE" if stage_id is None else "s.stage_id = :stage_id"
+    return db.execute(text(f"""
+        SELECT f.fixture_id, f.kickoff_utc, f.fixture_status,
+               sr.stage_round_order,
+               f.home_team_id, th.name AS home_name,
+               f.away_team_id, ta.name AS away_name,
+               f.ft_home_score, f.ft_away_score
+        FROM fixture f
+        JOIN stage_round sr ON sr.stage_round_id = f.stage_round_id
+        JOIN stage s ON s.stage_id = sr.stage_id
+        JOIN team th ON th.team_id = f.home_team_id
+        JOIN team ta ON ta.team_id = f.away_team_id
+        WHERE s.season_id = :season_id
+          AND {stage_filter}
+          AND f.fixture_status NOT IN ('canceled', 'cancelled')
+        ORDER BY f.kickoff_utc ASC, f.fixture_id ASC
+    """), {"season_id": season_id, "stage_id": stage_id}).mappings().all()
@@ -0,0 +1,380 @@
+"""
+Monte Carlo season outcome simulator.
+
+Played fixtures give every team an attack and a defence rate (goals scored /
+conceded per game relative to the league average, shrunk towards 1.0 early in
+the season). Remaining fixtures are simulated as independent Poisson scorelines.
+All simulated seasons are drawn at once as (seasons × fixtures) arrays and
+turned into per-team points / goals with two matrix products, so there is no
+Python loop over seasons or fixtures.
+
+A full run (SIM_SEASONS) takes seconds, so it never runs in a request:
+fixture imports queue the touched seasons (queue_season_simulations) for a
+background thread with its own session, which stores the result in
+season_simulation / season_simulation_team. Each stored run records the
+inputs it was simulated from (fixture version, points rule, adjustments);
+the league overview only uses a run whose inputs still match. Seasons
+without a matching run (queued, older than the import hook, or with
+adjustments edited since) fall back to a SIM_PAGE_SEASONS run in the
+request, single-flight per key, until the queue or `python -m app.backfill
+--step simulations` catches up.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from ..core.cache import LRUCache
+from ..core.data_version import bump_versions
+from ..core.page_cache import invalidate_pages
+from .scenarios import update_league_scenarios
+from .season_data import load_season_fixtures, season_fixture_version, season_inputs
+from .table_variants import season_points_adjustments, season_points_rule
+
+DEFAULT_SEASONS = int(os.getenv("SIM_SEASONS", "100000"))      # stored runs (import hook, backfill)
+SIM_PAGE_SEASONS = int(os.getenv("SIM_PAGE_SEASONS", "5000"))   # in-request fallback
+SIM_WORKERS = int(os.getenv("SIM_WORKERS", "0"))  # 0/1 = simulate in-process
+CHUNK_SEASONS = 20_000      # bounds the (seasons × fixtures) arrays per chunk
+PRIOR_GAMES = 4.0           # pseudo-games at league average mixed into each team's rates
+DEFAULT_HOME_GOALS = 1.5
+DEFAULT_AWAY_GOALS = 1.2
+
+_cache = LRUCache(maxsize=64)
+
+# One computation per cache key at a time; concurrent misses wait for it
+_inflight: dict[tuple, threading.Lock] = {}
+_inflight_lock = threading.Lock()
+
+# Seasons waiting for a stored run, drained by one background thread
+_queue: set[int] = set()
+_queue_lock = threading.Lock()
+_queue_worker: threading.Thread | None = None
+
+
+def _team_rates(played, idx: dict[int, int], n_teams: int):
+    """Expected home/away goals and per-team attack/defence multipliers."""
+    gf = np.zeros(n_teams)
+    ga = np.zeros(n_teams)
+    games = np.zeros(n_teams)
+    home_goals = away_goals = 0
+    for f in played:
+        h, a = idx[f["home_team_id"]], idx[f["away_team_id"]]
+        hs, as_ = f["ft_home_score"], f["ft_away_score"]
+        gf[h] += hs; ga[h] += as_; games[h] += 1
+        gf[a] += as_; ga[a] += hs; games[a] += 1
+        home_goals += hs
+        away_goals += as_
+
+    if played:
+        mu_home = max(home_goals / len(played), 0.2)
+        mu_away = max(away_goals / len(played), 0.2)
+    else:
+        mu_home, mu_away = DEFAULT_HOME_GOALS, DEFAULT_AWAY_GOALS
+    avg = (mu_home + mu_away) / 2.0
+
+    attack = (gf + PRIOR_GAMES * avg) / ((games + PRIOR_GAMES) * avg)
+    defence = (ga + PRIOR_GAMES * avg) / ((games + PRIOR_GAMES) * avg)
+    return mu_home, mu_away, attack, defence
+
+
+def _simulate_chunk(args) -> np.ndarray:
+    """
+    Simulate one chunk of seasons; returns a (teams × positions) count matrix.
+    Module-level so it can run in a worker process.
+    """
+    seed, n, lam_h, lam_a, home_inc, away_inc, base_pts, base_gf, base_ga, rule = args
+    win_pts, draw_pts, loss_pts = rule
+    n_teams = base_pts.shape[0]
+    rng = np.random.default_rng(seed)
+
+    hg = rng.poisson(lam_h, size=(n, lam_h.shape[0])).astype(np.float64)
+    ag = rng.poisson(lam_a, size=(n, lam_a.shape[0])).astype(np.float64)
+
+    home_pts = np.where(hg > ag, win_pts, np.where(hg == ag, draw_pts, loss_pts))
+    away_pts = np.where(ag > hg, win_pts, np.where(hg == ag, draw_pts, loss_pts))
+
+    pts = base_pts + home_pts @ home_inc + away_pts @ away_inc
+    gf = base_gf + hg @ home_inc + ag @ away_inc
+    ga = base_ga + ag @ home_inc + hg @ away_inc
+
+    # pts DESC, gd DESC, gf DESC; stable sort keeps name order (team index) for full ties
+    key = (pts.astype(np.int64) * 1_000_000
+           + (gf - ga + 1000).astype(np.int64) * 1_000
+           + gf.astype(np.int64))
+    order = np.argsort(-key, axis=1, kind="stable")          # [season, position] -> team
+    flat = order * n_teams + np.arange(n_teams)[None, :]      # team * T + position
+    return np.bincount(flat.ravel(), minlength=n_teams * n_teams).reshape(n_teams, n_teams)
+
+
+def simulate_season(
+    db: Session,
+    season_id: int,
+    points_rule: tuple[int, int, int] = (3, 1, 0),
+    adjustments: dict[int, int] | None = None,
+    n_seasons: int = DEFAULT_SEASONS,
+    workers: int = SIM_WORKERS,
+    seed: int = 2024,
+) -> dict | None:
+    """
+    Position-probability matrix for every team of the season.
+
+    Returns None when the season has no fixtures. Results are cached per
+    (season, fixture version, rule, adjustments, n_seasons); concurrent
+    misses of the same key compute it once.
+    """
+    adjustments = adjustments or {}
+    version = season_fixture_version(db, season_id)
+    key = (season_id, version, tuple(points_rule), tuple(sorted(adjustments.items())), n_seasons)
+    cached = _cache.get(key)
+    if cached is not None:
+        return cached
+
+    with _inflight_lock:
+        lock = _inflight.setdefault(key, threading.Lock())
+    try:
+        with lock:
+            cached = _cache.get(key)
+            if cached is None:
+                cached = _simulate(db, season_id, points_rule, adjustments, n_seasons, workers, seed)
+                if cached is not None:
+                    _cache.set(key, cached)
+            return cached
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+
+
+def _simulate(db: Session, season_id: int, points_rule: tuple[int, int, int], adjustments: dict[int, int],
+              n_seasons: int, workers: int, seed: int) -> dict | None:
+    fixtures = load_season_fixtures(db, season_id)
+    if not fixtures:
+        return None
+
+    names: dict[int, str] = {}
+    for f in fixtures:
+        names[f["home_team_id"]] = f["home_name"]
+        names[f["away_team_id"]] = f["away_name"]
+    team_ids = sorted(names, key=lambda t: (names[t], t))
+    idx = {t: i for i, t in enumerate(team_ids)}
+    n_teams = len(team_ids)
+
+    played = [f for f in fixtures if f["ft_home_score"] is not None and f["ft_away_score"] is not None]
+    remaining = [f for f in fixtures if f["ft_home_score"] is None or f["ft_away_score"] is None]
+
+    win_pts, draw_pts, loss_pts = points_rule
+    base_pts = np.zeros(n_teams)
+    base_gf = np.zeros(n_teams)
+    base_ga = np.zeros(n_teams)
+    for f in played:
+        h, a = idx[f["home_team_id"]], idx[f["away_team_id"]]
+        hs, as_ = f["ft_home_score"], f["ft_away_score"]
+        base_gf[h] += hs; base_ga[h] += as_
+        base_gf[a] += as_; base_ga[a] += hs
+        if hs > as_:
+            base_pts[h] += win_pts; base_pts[a] += loss_pts
+        elif hs < as_:
+            base_pts[h] += loss_pts; base_pts[a] += win_pts
+        else:
+            base_pts[h] += draw_pts; base_pts[a] += draw_pts
+    for team_id, delta in adjustments.items():
+        if team_id in idx:
+            base_pts[idx[team_id]] += delta
+
+    mu_home, mu_away, attack, defence = _team_rates(played, idx, n_teams)
+    home_idx = np.array([idx[f["home_team_id"]] for f in remaining], dtype=np.int64)
+    away_idx = np.array([idx[f["away_team_id"]] for f in remaining], dtype=np.int64)
+    lam_h = mu_home * attack[home_idx] * defence[away_idx]
+    lam_a = mu_away * attack[away_idx] * defence[home_idx]
+
+    # fixture → team incidence matrices (remaining × teams)
+    home_inc = np.zeros((len(remaining), n_teams))
+    away_inc = np.zeros((len(remaining), n_teams))
+    home_inc[np.arange(len(remaining)), home_idx] = 1.0
+    away_inc[np.arange(len(remaining)), away_idx] = 1.0
+
+    sizes = [CHUNK_SEASONS] * (n_seasons // CHUNK_SEASONS)
+    if n_seasons % CHUNK_SEASONS:
+        sizes.append(n_seasons % CHUNK_SEASONS)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = [
+        (s, n, lam_h, lam_a, home_inc, away_inc, base_pts, base_gf, base_ga, (win_pts, draw_pts, loss_pts))
+        for s, n in zip(seeds, sizes)
+    ]
+
+    if workers and workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            counts = sum(pool.map(_simulate_chunk, jobs))
+    else:
+        counts = sum(_simulate_chunk(j) for j in jobs)
+
+    probs = counts / float(n_seasons)
+    positions = np.arange(1, n_teams + 1)
+
+    # expected final points: current points + expected points from the remaining fixtures
+    p_home, p_draw, p_away = _outcome_probs(lam_h, lam_a)
+    exp_home = p_home * win_pts + p_draw * draw_pts + p_away * loss_pts
+    exp_away = p_away * win_pts + p_draw * draw_pts + p_home * loss_pts
+    exp_pts = base_pts + exp_home @ home_inc + exp_away @ away_inc
+
+    teams = []
+    for i, team_id in enumerate(team_ids):
+        teams.append({
+            "team_id": team_id,
+            "name": names[team_id],
+            "probs": [float(p) for p in probs[i]],
+            "expected_position": float((probs[i] * positions).sum()),
+            "expected_pts": float(exp_pts[i]),
+        })
+    teams.sort(key=lambda t: (t["expected_position"], t["name"]))
+
+    result = {
+        "season_id": season_id,
+        "n_seasons": n_seasons,
+        "n_teams": n_teams,
+        "n_played": len(played),
+        "n_remaining": len(remaining),
+        "teams": teams,
+    }
+    return result
+
+
+def store_season_simulation(db: Session, season_id: int, n_seasons: int = DEFAULT_SEASONS) -> bool:
+    """
+    Simulate a season under its points rule and adjustments and store the
+    result with its inputs. Returns False (and removes any stored run) when
+    the season has no fixtures. Caller commits.
+    """
+    points_rule = season_points_rule(db, season_id)
+    adjustments = season_points_adjustments(db, season_id)
+    sim = simulate_season(db, season_id, points_rule=points_rule, adjustments=adjustments, n_seasons=n_seasons)
+    db.execute(text("DELETE FROM season_simulation WHERE season_id = :sid"), {"sid": season_id})
+    if sim is None:
+        return False
+    inputs = season_inputs(season_fixture_version(db, season_id), points_rule, adjustments)
+    db.execute(text("""
+        INSERT INTO season_simulation (season_id, simulated_at, inputs, n_seasons, n_played, n_remaining)
+        VALUES (:sid, NOW(), :inputs, :n_seasons, :n_played, :n_remaining)
+    """), {"sid": season_id, "inputs": inputs, "n_seasons": sim["n_seasons"],
+           "n_played": sim["n_played"], "n_remaining": sim["n_remaining"]})
+    db.execute(
+        text("""
+            INSERT INTO season_simulation_team (season_id, team_id, expected_position, expected_pts, probs)
+            VALUES (:sid, :tid, :exp_pos, :exp_pts, :probs)
+        """),
+        [
+            {"sid": season_id, "tid": t["team_id"], "exp_pos": t["expected_position"],
+             "exp_pts": t["expected_pts"], "probs": t["probs"]}
+            for t in sim["teams"]
+        ],
+    )
+    return True
+
+
+def update_season_simulations(db: Session, season_ids) -> None:
+    """Re-simulate the league seasons among `season_ids` (cup seasons are skipped)."""
+    if not season_ids:
+        return
+    league_ids = db.execute(text("""
+        SELECT se.season_id
+        FROM season se
+        JOIN competition c ON c.competition_id = se.competition_id
+        WHERE se.season_id = ANY(:ids) AND LOWER(c.type) = 'league'
+    """), {"ids": sorted(set(season_ids))}).scalars().all()
+    for sid in league_ids:
+        store_season_simulation(db, sid)
+
+
+def queue_season_simulations(season_ids) -> None:
+    """
+    Re-simulate `season_ids` and store their league scenarios
+    (services/scenarios) in the background, after the caller committed the
+    fixtures. Seasons already waiting are done once.
+    """
+    global _queue_worker
+    with _queue_lock:
+        _queue.update(int(s) for s in season_ids)
+        if _queue and (_queue_worker is None or not _queue_worker.is_alive()):
+            _queue_worker = threading.Thread(target=_drain_queue, name="season-simulations", daemon=True)
+            _queue_worker.start()
+
+
+def _drain_queue() -> None:
+    from ..db import SessionLocal
+
+    while True:
+        with _queue_lock:
+            if not _queue:
+                return
+            season_id = _queue.pop()
+        try:
+            with SessionLocal() as db:
+                update_season_simulations(db, [season_id])
+                update_league_scenarios(db, [season_id])
+                db.commit()
+        except Exception:
+            traceback.print_exc()
+            continue
+        # pages rendered from the in-request fallback
+        invalidate_pages("season", [season_id])
+        bump_versions("simulation")
+
+
+def load_season_simulation(db: Session, season_id: int, inputs: str) -> dict | None:
+    """
+    The stored run of a season in simulate_season()'s shape, or None when
+    there is none or it was simulated from other `inputs` (season_inputs).
+    """
+    meta = db.execute(text("""
+        SELECT n_seasons, n_played, n_remaining
+        FROM season_simulation
+        WHERE season_id = :sid AND inputs = :inputs
+    """), {"sid": season_id, "inputs": inputs}).first()
+    if meta is None:
+        return None
+    rows = db.execute(text("""
+        SELECT st.team_id, t.name, st.probs, st.expected_position, st.expected_pts
+        FROM season_simulation_team st
+        JOIN team t ON t.team_id = st.team_id
+        WHERE st.season_id = :sid
+        ORDER BY st.expected_position, t.name
+    """), {"sid": season_id}).mappings().all()
+    return {
+        "season_id": season_id,
+        "n_seasons": meta[0],
+        "n_teams": len(rows),
+        "n_played": meta[1],
+        "n_remaining": meta[2],
+        "teams": [
+            {"team_id": r["team_id"], "name": r["name"], "probs": list(r["probs"]),
+             "expected_position": r["expected_position"], "expected_pts": r["expected_pts"]}
+            for r in rows
+        ],
+    }
+
+
+def _outcome_probs(lam_h: np.ndarray, lam_a: np.ndarray, max_goals: int = 10):
+    """Exact home/draw/away probabilities for independent Poisson scorelines."""
+    if lam_h.size == 0:
+        empty = np.zeros(0)
+        return empty, empty, empty
+    goals = np.arange(max_goals + 1)
+    log_fact = np.cumsum(np.log(np.maximum(goals, 1)))
+    ph = np.exp(goals[None, :] * np.log(lam_h)[:, None] - lam_h[:, None] - log_fact[None, :])
+    pa = np.exp(goals[None, :] * np.log(lam_a)[:, None] - lam_a[:, None] - log_fact[None, :])
+    grid = ph[:, :, None] * pa[:, None, :]           # fixture × home goals × away goals
+    p_home = np.tril(np.ones((max_goals + 1, max_goals + 1)), -1)
+    return (grid * p_home).sum(axis=(1, 2)), np.trace(grid, axis1=1, axis2=2), (grid * p_home.T).sum(axis=(1, 2))
+
+
+def place_probability(team: dict, first: int, last: int) -> float:
+    """P(team finishes between positions first..last, 1-based, inclusive)."""
+    probs = team["probs"]
+    first = max(first, 1)
+    last = min(last, len(probs))
+    return float(sum(probs[first - 1:last])) if first <= last else 0.0
@@ -0,0 +1,132 @@
+"""
+Season structure: season → stages → rounds (+ fixture counts) → groups.
+
+Loaded with two grouped queries into plain dicts and cached per season, so
+pages that need the shape of a season (which stages, which format, how many
+rounds / matches, which groups) don't query stage by stage. Anything that
+changes stages, rounds, groups or fixtures must call
+invalidate_season_structure().
+"""
+from __future__ import annotations
+
+from typing import Iterable
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from ..core.cache import LRUCache
+from .knockout import KNOCKOUT_FORMATS
+
+_cache = LRUCache(maxsize=512)
+
+
+def load_season_structure(db: Session, season_id: int) -> dict | None:
+    """
+    {"season_id", "competition_id", "name", "stages": [stage, ...]} with stages
+    in stage_order, or None when the season does not exist. Each stage:
+    {"stage_id", "name", "stage_order", "format", "n_fixtures", "n_played",
+     "rounds": [{"stage_round_id", "name", "stage_round_order", "two_legs",
+                 "n_fixtures", "n_played"}, ...],
+     "groups": [{"group_id", "name", "code"}, ...]}
+    """
+    cached = _cache.get(season_id)
+    if cached is not None:
+        return cached
+
+    rows = db.execute(text("""
+        SELECT se.competition_id, se.name AS season_name,
+               s.stage_id, s.name AS stage_name, s.stage_order, s.format,
+               sr.stage_round_id, sr.name AS round_name, sr.stage_round_order, sr.two_legs,
+               COUNT(f.fixture_id) AS n_fixtures,
+               COUNT(f.fixture_id) FILTER (
+                 WHERE f.ft_home_score IS NOT NULL AND f.ft_away_score IS NOT NULL
+               ) AS n_played
+        FROM season se
+        LEFT JOIN stage s        ON s.season_id = se.season_id
+        LEFT JOIN stage_round sr ON sr.stage_id = s.stage_id
+        LEFT JOIN fixture f      ON f.stage_round_id = sr.stage_round_id
+        WHERE se.season_id = :sid
+        GROUP BY se.competition_id, se.name,
+                 s.stage_id, s.name, s.stage_order, s.format,
+                 sr.stage_round_id, sr.name, sr.stage_round_order, sr.two_legs
+        ORDER BY s.stage_order ASC, sr.stage_round_order ASC
+    """), {"sid": season_id}).mappings().all()
+    if not rows:
+        return None
+
+    stages: dict[int, dict] = {}
+    for r in rows:
+        if r["stage_id"] is None:
+            continue
+        st = stages.get(r["stage_id"])
+        if st is None:
+            st = stages[r["stage_id"]] = {
+                "stage_id": r["stage_id"],
+                "name": r["stage_name"],
+                "stage_order": r["stage_order"],
+                "format": r["format"],
+                "n_fixtures": 0,
+                "n_played": 0,
+                "rounds": [],
+                "groups": [],
+            }
+        if r["stage_round_id"] is None:
+            continue
+        st["rounds"].append({
+            "stage_round_id": r["stage_round_id"],
+            "name": r["round_name"],
+            "stage_round_order": r["stage_round_order"],
+            "two_legs": bool(r["two_legs"]),
+            "n_fixtures": int(r["n_fixtures"]),
+            "n_played": int(r["n_played"]),
+        })
+        st["n_fixtures"] += int(r["n_fixtures"])
+        st["n_played"] += int(r["n_played"])
+
+    if stages:
+        groups = db.execute(text("""
+            SELECT group_id, stage_id, name, code
+            FROM stage_group
+            WHERE stage_id = ANY(:ids)
+            ORDER BY code, name
+        """), {"ids": list(stages)}).mappings().all()
+        for g in groups:
+            stages[g["stage_id"]]["groups"].append(
+                {"group_id": g["group_id"], "name": g["name"], "code": g["code"]}
+            )
+
+    structure = {
+        "season_id": season_id,
+        "competition_id": rows[0]["competition_id"],
+        "name": rows[0]["season_name"],
+        "stages": list(stages.values()),
+    }
+    _cache.set(season_id, structure)
+    return structure
+
+
+def invalidate_season_structure(season_ids: Iterable[int] | None = None) -> None:
+    """Drop cached structures (all of them when `season_ids` is None)."""
+    if season_ids is None:
+        _cache.clear()
+        return
+    for sid in season_ids:
+        _cache.pop(sid)
+
+
+# ---- Lookups on a loaded structure (no queries) ----------------------------
+
+def find_stage(structure: dict, stage_id: int) -> dict | None:
+    return next((s for s in structure["stages"] if s["stage_id"] == stage_id), None)
+
+
+def stage_of_format(structure: dict, fmt: str) -> dict | None:
+    """First stage (by stage_order) of the given format."""
+    fmt = fmt.lower()
+    return next((s for s in structure["stages"] if (s["format"] or "").lower() == fmt), None)
+
+
+def latest_knockout_stage(structure: dict) -> dict | None:
+    """Latest knockout/playoffs stage that has rounds with fixtures."""
+    ko = [s for s in structure["stages"] if s["format"] in KNOCKOUT_FORMATS and s["rounds"] and s["n_fixtures"]]
+    return ko[-1] if ko else None
@@ -0,0 +1,184 @@
+"""
+Competition season summaries, persisted in competition_season_summary.
+
+One row per season with the champion, runner-up, the final (tie and fixtures),
+the current top of the table and fixture/goal totals. Cups (and any season
+whose latest knockout stage ends in a single tie) are decided by that final;
+leagues by the table once every fixture is played. Table points use the
+season's points rule and adjustments, read from mv_team_season_totals, so the
+all-time views must be refreshed first.
+
+Rebuilt after fixture imports (see importers/utils/fixture_sync.py); pages
+only read rows.
+"""
+from __future__ import annotations
+
+from typing import Iterable
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from .knockout import KNOCKOUT_FORMATS
+
+
+def _season_totals(db: Session, season_id: int):
+    return db.execute(text("""
+        SELECT se.competition_id, c.type AS competition_type,
+               COUNT(f.fixture_id) AS n_fixtures,
+               COUNT(f.fixture_id) FILTER (
+                 WHERE f.ft_home_score IS NOT NULL AND f.ft_away_score IS NOT NULL
+               ) AS n_played,
+               COALESCE(SUM(f.ft_home_score + f.ft_away_score), 0) AS goals
+        FROM season se
+        JOIN competition c       ON c.competition_id = se.competition_id
+        LEFT JOIN stage s        ON s.season_id = se.season_id
+        LEFT JOIN stage_round sr ON sr.stage_id = s.stage_id
+        LEFT JOIN fixture f      ON f.stage_round_id = sr.stage_round_id
+        WHERE se.season_id = :sid
+        GROUP BY se.competition_id, c.type
+    """), {"sid": season_id}).mappings().first()
+
+
+def _final_tie(db: Session, season_id: int):
+    """
+    The last-round tie of the season's latest knockout stage, when that round
+    holds exactly one tie (a final, not e.g. a round of promotion play-offs).
+    """
+    rows = db.execute(text("""
+        WITH ko AS (
+          SELECT s.stage_id
+          FROM stage s
+          WHERE s.season_id = :sid
+            AND s.format = ANY(:formats)
+            AND EXISTS (SELECT 1 FROM knockout_tie kt WHERE kt.stage_id = s.stage_id)
+          ORDER BY s.stage_order DESC
+          LIMIT 1
+        ),
+        last_round AS (
+          SELECT kt.stage_round_id
+          FROM knockout_tie kt
+          JOIN ko ON ko.stage_id = kt.stage_id
+          JOIN stage_round sr ON sr.stage_round_id = kt.stage_round_id
+          ORDER BY sr.stage_round_order DESC
+          LIMIT 1
+        )
+        SELECT kt.tie_id, kt.team_a_id, kt.team_b_id, kt.winner_team_id,
+               kt.leg1_fixture_id, kt.leg2_fixture_id
+        FROM knockout_tie kt
+        JOIN last_round lr ON lr.stage_round_id = kt.stage_round_id
+    """), {"sid": season_id, "formats": list(KNOCKOUT_FORMATS)}).mappings().all()
+    return rows[0] if len(rows) == 1 else None
+
+
+def _table_top(db: Session, season_id: int) -> list:
+    """Top two of the season table (all stages, points rule + adjustments)."""
+    return db.execute(text("""
+        SELECT m.team_id,
+               (m.w * COALESCE(r.win_points, 3)
+                + m.d * COALESCE(r.draw_points, 1)
+                + m.l * COALESCE(r.loss_points, 0)
+                + COALESCE(adj.delta, 0))::INT AS pts
+        FROM mv_team_season_totals m
+        JOIN team t ON t.team_id = m.team_id
+        LEFT JOIN season_points_rule r ON r.season_id = m.season_id
+        LEFT JOIN (
+          SELECT team_id, SUM(points_delta) AS delta
+          FROM league_points_adjustment
+          WHERE season_id = :sid
+          GROUP BY team_id
+        ) adj ON adj.team_id = m.team_id
+        WHERE m.season_id = :sid
+        ORDER BY pts DESC, (m.gf - m.ga) DESC, m.gf DESC, t.name ASC
+        LIMIT 2
+    """), {"sid": season_id}).mappings().all()
+
+
+def rebuild_season_summary(db: Session, season_id: int) -> None:
+    """Recompute and upsert one season's summary row. Caller commits."""
+    totals = _season_totals(db, season_id)
+    if totals is None:
+        return
+
+    n_fixtures, n_played = int(totals["n_fixtures"]), int(totals["n_played"])
+    top = _table_top(db, season_id)
+    final = None if (totals["competition_type"] or "").lower() == "league" else _final_tie(db, season_id)
+
+    decided_by = winner = runner_up = None
+    if final is not None:
+        if final["winner_team_id"] is not None:
+            decided_by = "final"
+            winner = final["winner_team_id"]
+            runner_up = final["team_b_id"] if winner == final["team_a_id"] else final["team_a_id"]
+    elif n_fixtures and n_played == n_fixtures and top:
+        decided_by = "table"
+        winner = top[0]["team_id"]
+        runner_up = top[1]["team_id"] if len(top) > 1 else None
+
+    db.execute(text("""
+        INSERT INTO competition_season_summary (
+          competition_id, season_id, decided_by, winner_team_id, runner_up_team_id,
+          final_tie_id, final_leg1_fixture_id, final_leg2_fixture_id,
+          top_team_id, top_points, n_fixtures, n_played, goals, updated_at
+        ) VALUES (
+          :cid, :sid, :decided_by, :winner, :runner_up,
+          :tie, :leg1, :leg2,
+          :top_team, :top_points, :n_fixtures, :n_played, :goals, NOW()
+        )
+        ON CONFLICT (competition_id, season_id) DO UPDATE SET
+          decided_by            = EXCLUDED.decided_by,
+          winner_team_id        = EXCLUDED.winner_team_id,
+          runner_up_team_id     = EXCLUDED.runner_up_team_id,
+          final_tie_id          = EXCLUDED.final_tie_id,
+          final_leg1_fixture_id = EXCLUDED.final_leg1_fixture_id,
+          final_leg2_fixture_id = EXCLUDED.final_leg2_fixture_id,
+          top_team_id           = EXCLUDED.top_team_id,
+          top_points            = EXCLUDED.top_points,
+          n_fixtures            = EXCLUDED.n_fixtures,
+          n_played              = EXCLUDED.n_played,
+          goals                 = EXCLUDED.goals,
+          updated_at            = NOW()
+    """), {
+        "cid": totals["competition_id"], "sid": season_id,
+        "decided_by": decided_by, "winner": winner, "runner_up": runner_up,
+        "tie": final["tie_id"] if final else None,
+        "leg1": final["leg1_fixture_id"] if final else None,
+        "leg2": final["leg2_fixture_id"] if final else None,
+        "top_team": top[0]["team_id"] if top else None,
+        "top_points": top[0]["pts"] if top else None,
+        "n_fixtures": n_fixtures, "n_played": n_played, "goals": int(totals["goals"]),
+    })
+
+
+def rebuild_season_summaries(db: Session, season_ids: Iterable[int]) -> None:
+    for sid in sorted(set(season_ids)):
+        rebuild_season_summary(db, sid)
+
+
+def competition_season_summaries(db: Session, competition_id: int) -> list[dict]:
+    """Every season of a competition with its summary (newest first), one query."""
+    rows = db.execute(text("""
+        SELECT se.season_id, se.name, se.start_date,
+               css.decided_by, css.n_fixtures, css.n_played, css.goals,
+               css.winner_team_id, w.name AS winner_name,
+               css.runner_up_team_id, ru.name AS runner_up_name,
+               css.top_team_id, tt.name AS top_name, css.top_points
+        FROM season se
+        LEFT JOIN competition_season_summary css ON css.season_id = se.season_id
+        LEFT JOIN team w  ON w.team_id  = css.winner_team_id
+        LEFT JOIN team ru ON ru.team_id = css.runner_up_team_id
+        LEFT JOIN team tt ON tt.team_id = css.top_team_id
+        WHERE se.competition_id = :cid
+        ORDER BY se.name DESC
+    """), {"cid": competition_id}).mappings().all()
+    return [dict(r) for r in rows]
+
+
+def season_summary(db: Session, season_id: int) -> dict | None:
+    row = db.execute(text("""
+        SELECT css.*, w.name AS winner_name, ru.name AS runner_up_name
+        FROM competition_season_summary css
+        LEFT JOIN team w  ON w.team_id  = css.winner_team_id
+        LEFT JOIN team ru ON ru.team_id = css.runner_up_team_id
+        WHERE css.season_id = :sid
+    """), {"sid": season_id}).mappings().first()
+    return dict(row) if row else None
@@ -0,0 +1,160 @@
+"""
+League table variants of a season: overall, home, away, first half, second half.
+
+All five come out of one grouped aggregation: played fixtures are unfolded into
+one row per team and match (with venue, full-time and half-time goals) and each
+variant is a set of FILTERed aggregates over those rows. Half-time variants only
+count fixtures with a recorded half-time score; the second half is FT − HT.
+"""
+from __future__ import annotations
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from ..core.cache import LRUCache
+from .season_data import season_fixture_version
+
+_cache = LRUCache(maxsize=256)
+
+# variant -> (row filter, goals for, goals against)
+VARIANTS: dict[str, tuple[str, str, str]] = {
+    "overall":     ("TRUE",                  "gf",           "ga"),
+    "home":        ("venue = 'H'",           "gf",           "ga"),
+    "away":        ("venue = 'A'",           "gf",           "ga"),
+    "first_half":  ("ht_gf IS NOT NULL",     "ht_gf",        "ht_ga"),
+    "second_half": ("ht_gf IS NOT NULL",     "(gf - ht_gf)", "(ga - ht_ga)"),
+}
+
+VARIANT_LABELS = {
+    "overall": "Overall",
+    "home": "Home",
+    "away": "Away",
+    "first_half": "1st half",
+    "second_half": "2nd half",
+}
+
+
+def _variant_columns() -> str:
+    cols = []
+    for name, (cond, gf, ga) in VARIANTS.items():
+        cols += [
+            f"COUNT(*) FILTER (WHERE {cond}) AS {name}_pld",
+            f"COUNT(*) FILTER (WHERE {cond} AND {gf} > {ga}) AS {name}_w",
+            f"COUNT(*) FILTER (WHERE {cond} AND {gf} = {ga}) AS {name}_d",
+            f"COUNT(*) FILTER (WHERE {cond} AND {gf} < {ga}) AS {name}_l",
+            f"COALESCE(SUM({gf}) FILTER (WHERE {cond}), 0) AS {name}_gf",
+            f"COALESCE(SUM({ga}) FILTER (WHERE {cond}), 0) AS {name}_ga",
+        ]
+    return ",\n               ".join(cols)
+
+
+_SQL = text(f"""
+    WITH season_fixtures AS (
+      SELECT f.home_team_id, f.away_team_id,
+             f.ft_home_score, f.ft_away_score, f.ht_home_score, f.ht_away_score
+      FROM fixture f
+      JOIN stage_round sr ON sr.stage_round_id = f.stage_round_id
+      JOIN stage s ON s.stage_id = sr.stage_id
+      WHERE s.season_id = :season_id
+        AND f.ft_home_score IS NOT NULL
+        AND f.ft_away_score IS NOT NULL
+    ),
+    team_match AS (
+      SELECT home_team_id AS team_id, 'H' AS venue,
+             ft_home_score AS gf, ft_away_score AS ga,
+             CASE WHEN ht_away_score IS NOT NULL THEN ht_home_score END AS ht_gf,
+             CASE WHEN ht_home_score IS NOT NULL THEN ht_away_score END AS ht_ga
+      FROM season_fixtures
+      UNION ALL
+      SELECT away_team_id, 'A',
+             ft_away_score, ft_home_score,
+             CASE WHEN ht_home_score IS NOT NULL THEN ht_away_score END,
+             CASE WHEN ht_away_score IS NOT NULL THEN ht_home_score END
+      FROM season_fixtures
+    )
+    SELECT tm.team_id, t.name,
+           {_variant_columns()}
+    FROM team_match tm
+    JOIN team t ON t.team_id = tm.team_id
+    GROUP BY tm.team_id, t.name
+""")
+
+
+def compute_table_variants(
+    db: Session,
+    season_id: int,
+    points_rule: tuple[int, int, int] = (3, 1, 0),
+) -> dict[str, list[dict]]:
+    """
+    {variant: [row, ...]} with rows shaped like the league table
+    (position, team_id, name, pld, w, d, l, gf, ga, gd, pts), sorted
+    pts DESC, gd DESC, gf DESC, name ASC. Point adjustments are not applied.
+    """
+    win_pts, draw_pts, loss_pts = points_rule
+    rows = db.execute(_SQL, {"season_id": season_id}).mappings().all()
+
+    out: dict[str, list[dict]] = {}
+    for name in VARIANTS:
+        table = []
+        for r in rows:
+            pld = r[f"{name}_pld"]
+            if not pld:
+                continue
+            w, d, l = r[f"{name}_w"], r[f"{name}_d"], r[f"{name}_l"]
+            gf, ga = int(r[f"{name}_gf"]), int(r[f"{name}_ga"])
+            table.append({
+                "team_id": r["team_id"], "name": r["name"],
+                "pld": pld, "w": w, "d": d, "l": l,
+                "gf": gf, "ga": ga, "gd": gf - ga,
+                "pts": w * win_pts + d * draw_pts + l * loss_pts,
+            })
+        table.sort(key=lambda x: (-x["pts"], -x["gd"], -x["gf"], x["name"]))
+        for i, row in enumerate(table, start=1):
+            row["position"] = i
+        out[name] = table
+    return out
+
+
+def season_points_rule(db: Session, season_id: int) -> tuple[int, int, int]:
+    """(win, draw, loss) points of the season; 3-1-0 when none is stored."""
+    row = db.execute(text("""
+        SELECT win_points, draw_points, loss_points
+        FROM season_points_rule
+        WHERE season_id = :sid
+    """), {"sid": season_id}).first()
+    return (row[0], row[1], row[2]) if row else (3, 1, 0)
+
+
+def season_points_adjustments(db: Session, season_id: int) -> dict[int, int]:
+    """Points deductions / bonuses per team of the season (empty without the table)."""
+    has_table = db.execute(text("""
+        SELECT EXISTS (
+          SELECT 1 FROM information_schema.tables
+          WHERE table_name = 'league_points_adjustment'
+        )
+    """)).scalar_one()
+    if not has_table:
+        return {}
+    rows = db.execute(text("""
+        SELECT team_id, COALESCE(SUM(points_delta),0) AS delta
+        FROM league_points_adjustment
+        WHERE season_id = :sid
+        GROUP BY team_id
+    """), {"sid": season_id}).mappings().all()
+    return {r["team_id"]: r["delta"] for r in rows}
+
+
+def season_table_variants(db: Session, season_id: int, version: tuple | None = None) -> dict[str, list[dict]]:
+    """
+    compute_table_variants() under the season's points rule, cached per
+    season fixture version; pass `version` when the caller already has it.
+    """
+    if version is None:
+        version = season_fixture_version(db, season_id)
+    points_rule = season_points_rule(db, season_id)
+    key = (season_id, version, points_rule)
+    variants = _cache.get(key)
+    if variants is None:
+        variants = compute_table_variants(db, season_id, points_rule)
+        _cache.set(key, variants)
+    return variants
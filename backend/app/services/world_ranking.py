@@ -0,0 +1,243 @@
+"""
+National team world ranking (FIFA "SUM"-style points exchange).
+
+Men's senior national-team matches are replayed in (kickoff_utc, fixture_id)
+order. After each match
+
+    P = P_before + I · (W - We),   We = 1 / (10^(-dr / 600) + 1)
+
+with dr the points difference to the opponent, W = 1 / 0.5 / 0 for a win /
+draw / loss after extra time (0.75 / 0.5 for the shoot-out winner / loser) and
+I the match importance from the competition (see match_importance). Teams
+never lose points in knockout matches of final tournaments. There is no home
+advantage.
+
+State lives in numpy arrays indexed by team, not ORM objects. At the end of
+every month with matches a full snapshot is written to
+national_ranking_snapshot. After an import only the tail is replayed: later
+snapshots are dropped and the state is seeded from the last one before the
+earliest changed match.
+"""
+from __future__ import annotations
+
+import calendar
+from datetime import date, datetime, time, timedelta, timezone
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from .knockout import KNOCKOUT_FORMATS
+
+INITIAL_POINTS = 1000.0
+SHOOTOUT_WIN, SHOOTOUT_LOSS = 0.75, 0.5
+SNAPSHOT_INSERT_BATCH = 5000
+RANKING_LIMIT = 250
+
+# men's senior national-team competitions
+_COMP_FILTER = """
+    lower(COALESCE(c.cup_rank, '')) = 'national teams'
+    AND lower(COALESCE(c.gender, 'men')) IN ('m', 'men', 'male')
+    AND lower(COALESCE(c.age_group, 'senior')) IN ('senior', 'open')
+"""
+
+
+def match_importance(comp_type: str | None, comp_name: str | None, organizer: str | None,
+                     tier: int | None, stage_format: str | None) -> tuple[float, bool]:
+    """
+    (importance I, no_loss) of a match:
+      friendlies 10, Nations League 15 (finals 25), qualifiers 25,
+      confederation / other final tournaments 35 (knockout 40),
+      World Cup 50 (knockout 60).
+    no_loss marks knockout matches of final tournaments.
+    """
+    kind = (comp_type or "").lower()
+    ko = stage_format in KNOCKOUT_FORMATS
+    if kind == "friendly":
+        return 10.0, False
+    if kind == "qualifiers" or stage_format == "qualification":
+        return 25.0, False
+    if "nations league" in (comp_name or "").lower():
+        return (25.0, True) if ko else (15.0, False)
+    if organizer == "FIFA" and tier == 1:
+        return (60.0, True) if ko else (50.0, False)
+    return (40.0, True) if ko else (35.0, False)
+
+
+def _month_end(d: date) -> date:
+    return d.replace(day=calendar.monthrange(d.year, d.month)[1])
+
+
+def _utc_date(ts: datetime) -> date:
+    return ts.astimezone(timezone.utc).date()
+
+
+def _load_matches(db: Session, since: datetime | None):
+    return db.execute(text(f"""
+        SELECT f.fixture_id, f.kickoff_utc, f.home_team_id, f.away_team_id,
+               COALESCE(f.et_home_score, f.ft_home_score) AS hg,
+               COALESCE(f.et_away_score, f.ft_away_score) AS ag,
+               f.went_to_penalties, f.pen_home_score, f.pen_away_score,
+               c.type, c.name, a.code, c.tier, s.format
+        FROM fixture f
+        JOIN stage_round sr ON sr.stage_round_id = f.stage_round_id
+        JOIN stage s        ON s.stage_id = sr.stage_id
+        JOIN season se      ON se.season_id = s.season_id
+        JOIN competition c  ON c.competition_id = se.competition_id
+        LEFT JOIN association a ON a.ass_id = c.organizer_ass_id
+        JOIN team th ON th.team_id = f.home_team_id AND th.type = 'national'
+        JOIN team ta ON ta.team_id = f.away_team_id AND ta.type = 'national'
+        WHERE f.ft_home_score IS NOT NULL
+          AND f.ft_away_score IS NOT NULL
+          AND f.kickoff_utc IS NOT NULL
+          AND {_COMP_FILTER}
+          {"AND f.kickoff_utc >= :since" if since is not None else ""}
+        ORDER BY f.kickoff_utc ASC, f.fixture_id ASC
+    """), {"since": since}).all()
+
+
+def rebuild_world_ranking(db: Session, since_kickoff: datetime | None = None) -> int:
+    """
+    Replay ranked matches from since_kickoff (everything when None or when no
+    earlier snapshot exists) and rewrite the snapshots from that month on.
+    Returns the number of matches replayed. Caller commits.
+    """
+    seed_date = None
+    if since_kickoff is not None:
+        seed_date = db.execute(text("""
+            SELECT MAX(ranking_date) FROM national_ranking_snapshot WHERE ranking_date < :d
+        """), {"d": _utc_date(since_kickoff)}).scalar_one_or_none()
+
+    if seed_date is None:
+        db.execute(text("DELETE FROM national_ranking_snapshot"))
+        seed = []
+        start = None
+    else:
+        db.execute(text("DELETE FROM national_ranking_snapshot WHERE ranking_date > :d"), {"d": seed_date})
+        seed = db.execute(text("""
+            SELECT team_id, points, games, position
+            FROM national_ranking_snapshot
+            WHERE ranking_date = :d
+        """), {"d": seed_date}).all()
+        start = datetime.combine(seed_date + timedelta(days=1), time.min, tzinfo=timezone.utc)
+
+    matches = _load_matches(db, start)
+
+    team_ids = sorted({int(r[0]) for r in seed} | {m[2] for m in matches} | {m[3] for m in matches})
+    if not team_ids:
+        return 0
+    idx = {t: i for i, t in enumerate(team_ids)}
+    ids = np.array(team_ids, dtype=np.int64)
+    points = np.full(len(ids), INITIAL_POINTS)
+    games = np.zeros(len(ids), dtype=np.int64)
+    position = np.zeros(len(ids), dtype=np.int64)       # 0 = not ranked yet
+    for team_id, pts, n, pos in seed:
+        i = idx[int(team_id)]
+        points[i], games[i], position[i] = pts, n, pos
+
+    batch: list[dict] = []
+
+    def snapshot(ranking_date: date) -> None:
+        nonlocal batch
+        active = np.flatnonzero(games > 0)
+        order = active[np.lexsort((ids[active], -points[active]))]
+        prev = position.copy()
+        position[order] = np.arange(1, len(order) + 1)
+        for i in order:
+            batch.append({
+                "d": ranking_date, "tid": int(ids[i]), "pos": int(position[i]),
+                "pts": float(points[i]), "games": int(games[i]),
+                "prev": int(prev[i]) or None,
+            })
+        if len(batch) >= SNAPSHOT_INSERT_BATCH:
+            _insert_snapshots(db, batch)
+            batch = []
+
+    current = None
+    for _fid, kickoff, home_id, away_id, hg, ag, pens, ph, pa, ctype, cname, org, tier, fmt in matches:
+        month = _month_end(_utc_date(kickoff))
+        if current is not None and month != current:
+            snapshot(current)
+        current = month
+
+        h, a = idx[home_id], idx[away_id]
+        if hg != ag:
+            w_home, w_away = (1.0, 0.0) if hg > ag else (0.0, 1.0)
+        elif pens and ph is not None and pa is not None and ph != pa:
+            w_home, w_away = (SHOOTOUT_WIN, SHOOTOUT_LOSS) if ph > pa else (SHOOTOUT_LOSS, SHOOTOUT_WIN)
+        else:
+            w_home = w_away = 0.5
+
+        importance, no_loss = match_importance(ctype, cname, org, tier, fmt)
+        we_home = 1.0 / (10.0 ** (-(points[h] - points[a]) / 600.0) + 1.0)
+        d_home = importance * (w_home - we_home)
+        d_away = importance * (w_away - (1.0 - we_home))
+        if no_loss:
+            d_home, d_away = max(d_home, 0.0), max(d_away, 0.0)
+        points[h] += d_home
+        points[a] += d_away
+        games[h] += 1
+        games[a] += 1
+
+    if current is not None:
+        snapshot(current)
+    if batch:
+        _insert_snapshots(db, batch)
+    return len(matches)
+
+
+def _insert_snapshots(db: Session, rows: list[dict]) -> None:
+    db.execute(text("""
+        INSERT INTO national_ranking_snapshot (ranking_date, team_id, position, points, games, prev_position)
+        VALUES (:d, :tid, :pos, :pts, :games, :prev)
+    """), rows)
+
+
+def update_world_ranking(db: Session, since: datetime) -> int:
+    """
+    Incremental update after a fixture import: replay from the earliest
+    national-team match touched by it (updated_at >= since). Caller commits.
+    """
+    earliest = db.execute(text("""
+        SELECT MIN(f.kickoff_utc)
+        FROM fixture f
+        JOIN team th ON th.team_id = f.home_team_id AND th.type = 'national'
+        JOIN team ta ON ta.team_id = f.away_team_id AND ta.type = 'national'
+        WHERE f.updated_at >= :since
+    """), {"since": since}).scalar_one_or_none()
+    if earliest is None:
+        return 0
+    return rebuild_world_ranking(db, earliest)
+
+
+# ---- Read helpers for pages -------------------------------------------------
+
+def ranking_as_of(db: Session, as_of: date | None = None, limit: int = RANKING_LIMIT) -> dict | None:
+    """
+    The snapshot in force on `as_of` (latest when None) with its neighbouring
+    ranking dates. None when nothing is ranked by then.
+    """
+    ranking_date = db.execute(text("""
+        SELECT MAX(ranking_date) FROM national_ranking_snapshot
+        WHERE CAST(:d AS DATE) IS NULL OR ranking_date <= :d
+    """), {"d": as_of}).scalar_one_or_none()
+    if ranking_date is None:
+        return None
+
+    rows = db.execute(text("""
+        SELECT r.position, r.prev_position, r.team_id, t.name, r.points, r.games
+        FROM national_ranking_snapshot r
+        JOIN team t ON t.team_id = r.team_id
+        WHERE r.ranking_date = :d AND r.position <= :limit
+        ORDER BY r.position
+    """), {"d": ranking_date, "limit": limit}).mappings().all()
+    prev_date, next_date = db.execute(text("""
+        SELECT (SELECT MAX(ranking_date) FROM national_ranking_snapshot WHERE ranking_date < :d),
+               (SELECT MIN(ranking_date) FROM national_ranking_snapshot WHERE ranking_date > :d)
+    """), {"d": ranking_date}).one()
+    return {
+        "ranking_date": ranking_date,
+        "prev_date": prev_date,
+        "next_date": next_date,
+        "rows": [dict(r) for r in rows],
+    }
@@ -45,7 +45,7 @@
   (async function loadMatchesToday() {
     const root = document.querySelector("#card-matches-today [data-role='list']");
     if (!root) return;
-    const data = await getJSON("/api/fixtures?date=today&limit=10");
+    const data = await getJSON("/api/v1/fixtures?date=today&limit=10&fields=fixture_id,home_name,away_name,kickoff_utc");
     root.innerHTML = "";
     if (!data || !Array.isArray(data) || data.length === 0) {
       root.innerHTML = `<li>No matches found for today.</li>`;
@@ -56,7 +56,7 @@
       const id = m.id || m.fixture_id || m.match_id || m.uuid;
       const home = m.home_name || m.home || m.home_team?.name || "Home";
       const away = m.away_name || m.away || m.away_team?.name || "Away";
-      const time = m.kickoff || m.start_time || m.date || "";
+      const time = m.kickoff_utc || m.kickoff || m.start_time || m.date || "";
       const href = withSeason(`/fixtures/${id}`);
       const li = document.createElement("li");
       li.innerHTML = `<a href="${href}">${home} vs ${away}</a> ${time ? "— " + time : ""}`;
@@ -68,17 +68,17 @@
   (async function loadTopLeagues() {
     const root = document.querySelector("#card-top-leagues [data-role='chips']");
     if (!root) return;
-    const data = await getJSON("/api/leagues?active=true&limit=5");
+    const data = await getJSON("/api/v1/competitions?type=league&status=active&limit=5&fields=competition_id,name");
     root.innerHTML = "";
     if (!data || !Array.isArray(data) || data.length === 0) {
       root.innerHTML = `<span>No active leagues.</span>`;
       return;
     }
     data.forEach(lg => {
-      const id = lg.id || lg.league_id || lg.uuid;
+      const id = lg.competition_id || lg.id || lg.league_id || lg.uuid;
       const name = lg.name || lg.league_name || "League";
       const a = document.createElement("a");
-      a.href = withSeason(`/leagues/${id}`);
+      a.href = withSeason(`/competitions/${id}`);
       a.textContent = name;
       root.appendChild(a);
     });
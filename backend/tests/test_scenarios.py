@@ -0,0 +1,100 @@
+"""compute_scenarios() against brute force over every outcome of the remaining fixtures."""
+import itertools
+import random
+
+import pytest
+
+from app.services.scenarios import compute_scenarios
+
+RULES = [(3, 1, 0), (2, 1, 0)]
+
+
+def _league(rng: random.Random, n_teams: int, n_remaining: int):
+    """Random double round robin with the last `n_remaining` fixtures unplayed."""
+    pairs = [(h, a) for h in range(n_teams) for a in range(n_teams) if h != a]
+    rng.shuffle(pairs)
+    fixtures = []
+    for i, (h, a) in enumerate(pairs):
+        played = i < len(pairs) - n_remaining
+        fixtures.append({
+            "home_team_id": h, "away_team_id": a,
+            "ft_home_score": rng.randint(0, 3) if played else None,
+            "ft_away_score": rng.randint(0, 3) if played else None,
+        })
+    return fixtures
+
+
+def _brute_force(fixtures, n_teams, targets, rule, adjustments):
+    """{team: {label: status}}, points only: level points count against clinching and for survival."""
+    win, draw, loss = rule
+    pts = [adjustments.get(t, 0) for t in range(n_teams)]
+    remaining = []
+    for f in fixtures:
+        h, a = f["home_team_id"], f["away_team_id"]
+        if f["ft_home_score"] is None:
+            remaining.append((h, a))
+        elif f["ft_home_score"] > f["ft_away_score"]:
+            pts[h] += win; pts[a] += loss
+        elif f["ft_home_score"] < f["ft_away_score"]:
+            pts[h] += loss; pts[a] += win
+        else:
+            pts[h] += draw; pts[a] += draw
+
+    finals = []
+    for results in itertools.product(((win, loss), (draw, draw), (loss, win)), repeat=len(remaining)):
+        final = list(pts)
+        for (h, a), (ph, pa) in zip(remaining, results):
+            final[h] += ph; final[a] += pa
+        finals.append(final)
+
+    out = {}
+    for t in range(n_teams):
+        out[t] = {}
+        for label, k in targets.items():
+            if k >= n_teams or all(sum(p[o] >= p[t] for o in range(n_teams) if o != t) < k for p in finals):
+                out[t][label] = "clinched"
+            elif all(sum(p[o] > p[t] for o in range(n_teams) if o != t) >= k for p in finals):
+                out[t][label] = "eliminated"
+            else:
+                out[t][label] = "open"
+    return out
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_status_matches_brute_force(seed):
+    rng = random.Random(seed)
+    n_teams = rng.randint(4, 6)
+    fixtures = _league(rng, n_teams, rng.randint(1, 6))
+    rule = RULES[seed % len(RULES)]
+    adjustments = {rng.randrange(n_teams): -rng.randint(1, 3)} if seed % 3 == 0 else {}
+    targets = {"Title": 1, "Top 2": 2, "Survival": n_teams - 1}
+
+    result = compute_scenarios(fixtures, {t: f"T{t}" for t in range(n_teams)}, targets, rule, adjustments)
+
+    expected = _brute_force(fixtures, n_teams, targets, rule, adjustments)
+    assert result["exact"]
+    assert {t["team_id"]: t["status"] for t in result["teams"]} == expected
+
+
+def test_next_result_matches_brute_force():
+    rng = random.Random(7)
+    n_teams, rule, targets = 5, (3, 1, 0), {"Title": 1, "Top 2": 2}
+    fixtures = _league(rng, n_teams, 4)
+    names = {t: f"T{t}" for t in range(n_teams)}
+
+    result = compute_scenarios(fixtures, names, targets, rule)
+    assert any(team["next"] for team in result["teams"])
+
+    for team in result["teams"]:
+        if team["next"] is None:
+            continue
+        t = team["team_id"]
+        idx = next(i for i, f in enumerate(fixtures)
+                   if f["ft_home_score"] is None and t in (f["home_team_id"], f["away_team_id"]))
+        for label, outcomes in team["next"]["outcomes"].items():
+            for r, status in outcomes.items():
+                own, opp = {"W": (1, 0), "D": (0, 0), "L": (0, 1)}[r]
+                home = fixtures[idx]["home_team_id"] == t
+                played = dict(fixtures[idx], ft_home_score=own if home else opp, ft_away_score=opp if home else own)
+                after = fixtures[:idx] + [played] + fixtures[idx + 1:]
+                assert _brute_force(after, n_teams, {label: targets[label]}, rule, {})[t][label] == status
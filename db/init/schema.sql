@@ -150,7 +150,8 @@ CREATE UNIQUE INDEX IF NOT EXISTS uniq_team_per_club_name ON team (club_id, name
 CREATE UNIQUE INDEX IF NOT EXISTS uniq_team_per_country_bucket ON team (national_country_id, COALESCE(age_group,''), COALESCE(gender,'')) WHERE type = 'national';
 CREATE INDEX IF NOT EXISTS idx_team_club_id ON team(club_id);
 CREATE INDEX IF NOT EXISTS idx_team_national_country_id ON team(national_country_id);
-CREATE INDEX IF NOT EXISTS idx_team_type ON team(type);
+-- keyset order of the team listings (type, name, team_id); also serves type filters
+CREATE INDEX IF NOT EXISTS idx_team_type_name_id ON team(type, name, team_id);
 
 CREATE TABLE IF NOT EXISTS season (
   season_id       BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
@@ -163,19 +164,6 @@ CREATE TABLE IF NOT EXISTS season (
 
 CREATE INDEX IF NOT EXISTS idx_season_competition_id ON season(competition_id);
 
-CREATE TABLE competition_season_summary (
-    id SERIAL PRIMARY KEY,
-    competition_id INT NOT NULL REFERENCES competition(competition_id) ON DELETE CASCADE,
-    season_id INT NOT NULL REFERENCES season(season_id) ON DELETE CASCADE,
-    summary TEXT,
-    --future expansions,
-    --winner_team_id INT REFERENCES teams(id),
-    --runner_up_team_id INT REFERENCES teams(id),
-    --third_place_team_id INT REFERENCES teams(id),
-    --top_scorer_player_id INT REFERENCES players(id),
-    UNIQUE (competition_id, season_id)
-);
-
 
 -- ===========================================
 -- Stage: phases within a season
@@ -333,18 +321,325 @@ CREATE TABLE IF NOT EXISTS fixture (
   away_score        SMALLINT DEFAULT 0,
 
   winner_team_id    BIGINT REFERENCES team(team_id) ON DELETE SET NULL,
-  optional_second_leg BOOLEAN NOT NULL DEFAULT FALSE
+  optional_second_leg BOOLEAN NOT NULL DEFAULT FALSE,
+
+  created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
 );
 
 -- Basic indexes
 CREATE INDEX IF NOT EXISTS ix_fixture_stage_round ON fixture(stage_round_id);
 CREATE INDEX IF NOT EXISTS idx_fixture_group_id ON fixture(group_id);
-CREATE INDEX IF NOT EXISTS ix_fixture_kickoff ON fixture(kickoff_utc);
+-- keyset order of the fixture listings (kickoff_utc, fixture_id), scanned backwards
+CREATE INDEX IF NOT EXISTS ix_fixture_kickoff_id ON fixture(kickoff_utc, fixture_id);
 CREATE INDEX IF NOT EXISTS ix_fixture_teams ON fixture(home_team_id, away_team_id);
 CREATE INDEX IF NOT EXISTS idx_fixture_stadium_id ON fixture(stadium_id);
 CREATE INDEX IF NOT EXISTS idx_fixture_home_team_id ON fixture(home_team_id);
 CREATE INDEX IF NOT EXISTS idx_fixture_away_team_id ON fixture(away_team_id);
 CREATE INDEX IF NOT EXISTS idx_fixture_winner_team_id ON fixture(winner_team_id);
+CREATE INDEX IF NOT EXISTS idx_fixture_updated_at ON fixture(updated_at);
+
+-- ===========================================
+-- Knockout ties (derived from fixtures of knockout/playoffs stages after each import)
+-- One row per tie: both legs, aggregate (FT, or AET when played), penalties,
+-- winner and the tie the winner plays next.
+-- ===========================================
+CREATE TABLE IF NOT EXISTS knockout_tie (
+  tie_id              BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+  stage_id            BIGINT   NOT NULL REFERENCES stage(stage_id) ON DELETE CASCADE,
+  stage_round_id      BIGINT   NOT NULL REFERENCES stage_round(stage_round_id) ON DELETE CASCADE,  -- round of the first leg
+  tie_order           SMALLINT NOT NULL,                      -- position within the round (first-leg kickoff order)
+  team_a_id           BIGINT   NOT NULL REFERENCES team(team_id) ON DELETE CASCADE,  -- home side of the first leg
+  team_b_id           BIGINT   NOT NULL REFERENCES team(team_id) ON DELETE CASCADE,
+  leg1_fixture_id     BIGINT   NOT NULL REFERENCES fixture(fixture_id) ON DELETE CASCADE,
+  leg2_fixture_id     BIGINT   REFERENCES fixture(fixture_id) ON DELETE CASCADE,     -- last leg when there is more than one
+  legs                SMALLINT NOT NULL DEFAULT 1,
+  legs_played         SMALLINT NOT NULL DEFAULT 0,
+  agg_a               SMALLINT,
+  agg_b               SMALLINT,
+  went_to_extra_time  BOOLEAN  NOT NULL DEFAULT FALSE,
+  went_to_penalties   BOOLEAN  NOT NULL DEFAULT FALSE,
+  pen_a               SMALLINT,
+  pen_b               SMALLINT,
+  winner_team_id      BIGINT   REFERENCES team(team_id) ON DELETE SET NULL,
+  next_tie_id         BIGINT   REFERENCES knockout_tie(tie_id) ON DELETE SET NULL,
+  UNIQUE (leg1_fixture_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_knockout_tie_stage ON knockout_tie(stage_id, stage_round_id, tie_order);
+
+-- ===========================================
+-- Competition season summary (derived; rebuilt after fixture imports)
+-- One row per season: champion, runner-up, the final, the current top of
+-- the table and totals, so competition pages list winners without
+-- recomputing every season.
+-- ===========================================
+CREATE TABLE IF NOT EXISTS competition_season_summary (
+  id                     BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+  competition_id         BIGINT NOT NULL REFERENCES competition(competition_id) ON DELETE CASCADE,
+  season_id              BIGINT NOT NULL REFERENCES season(season_id) ON DELETE CASCADE,
+  summary                TEXT,
+  decided_by             TEXT,            -- 'final' | 'table'; NULL while the season is open
+  winner_team_id         BIGINT REFERENCES team(team_id) ON DELETE SET NULL,
+  runner_up_team_id      BIGINT REFERENCES team(team_id) ON DELETE SET NULL,
+  final_tie_id           BIGINT REFERENCES knockout_tie(tie_id) ON DELETE SET NULL,
+  final_leg1_fixture_id  BIGINT REFERENCES fixture(fixture_id) ON DELETE SET NULL,
+  final_leg2_fixture_id  BIGINT REFERENCES fixture(fixture_id) ON DELETE SET NULL,
+  top_team_id            BIGINT REFERENCES team(team_id) ON DELETE SET NULL,   -- leader of the season table
+  top_points             INTEGER,
+  n_fixtures             INTEGER NOT NULL DEFAULT 0,
+  n_played               INTEGER NOT NULL DEFAULT 0,
+  goals                  INTEGER NOT NULL DEFAULT 0,
+  updated_at             TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  --future expansions,
+  --third_place_team_id BIGINT REFERENCES team(team_id),
+  --top_scorer_player_id BIGINT REFERENCES player(player_id),
+  UNIQUE (competition_id, season_id)
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_competition_season_summary_season ON competition_season_summary(season_id);
+
+-- ===========================================
+-- Elo ratings (derived from fixtures; rebuilt incrementally after fixture imports)
+-- ===========================================
+CREATE TABLE IF NOT EXISTS team_elo (
+  team_id           BIGINT PRIMARY KEY REFERENCES team(team_id) ON DELETE CASCADE,
+  rating            REAL    NOT NULL,
+  games             INTEGER NOT NULL DEFAULT 0,
+  last_fixture_id   BIGINT,
+  last_kickoff_utc  TIMESTAMPTZ
+);
+
+CREATE INDEX IF NOT EXISTS idx_team_elo_rating ON team_elo(rating DESC);
+
+-- One row per team per played fixture: rating after the match.
+CREATE TABLE IF NOT EXISTS team_elo_history (
+  team_id      BIGINT      NOT NULL REFERENCES team(team_id) ON DELETE CASCADE,
+  kickoff_utc  TIMESTAMPTZ NOT NULL,
+  fixture_id   BIGINT      NOT NULL REFERENCES fixture(fixture_id) ON DELETE CASCADE,
+  rating       REAL        NOT NULL,
+  PRIMARY KEY (team_id, kickoff_utc, fixture_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_team_elo_history_kickoff ON team_elo_history(kickoff_utc);
+
+-- ===========================================
+-- Match outcome model (Dixon–Coles / Poisson; refitted after fixture imports)
+-- One fit per competition-season over the competition's time-decayed history.
+-- log λ_home = intercept + home_adv + attack[home] - defence[away]
+-- log λ_away = intercept + attack[away] - defence[home]
+-- ===========================================
+CREATE TABLE IF NOT EXISTS match_model (
+  season_id       BIGINT PRIMARY KEY REFERENCES season(season_id) ON DELETE CASCADE,
+  competition_id  BIGINT NOT NULL REFERENCES competition(competition_id) ON DELETE CASCADE,
+  fitted_at       TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  reference_utc   TIMESTAMPTZ NOT NULL,      -- weights decay from here
+  n_fixtures      INTEGER NOT NULL,
+  intercept       REAL NOT NULL,
+  home_adv        REAL NOT NULL,
+  rho             REAL NOT NULL,             -- Dixon–Coles low-score correction
+  xi              REAL NOT NULL              -- time decay per day
+);
+
+CREATE TABLE IF NOT EXISTS match_model_team (
+  season_id  BIGINT NOT NULL REFERENCES match_model(season_id) ON DELETE CASCADE,
+  team_id    BIGINT NOT NULL REFERENCES team(team_id) ON DELETE CASCADE,
+  attack     REAL NOT NULL,
+  defence    REAL NOT NULL,
+  PRIMARY KEY (season_id, team_id)
+);
+
+-- ===========================================
+-- Data versions per entity family (core/data_version.py): bumped after
+-- every committed change, read by all workers for ETags / the page cache
+-- ===========================================
+CREATE TABLE IF NOT EXISTS data_version (
+  family    TEXT PRIMARY KEY,
+  version   BIGINT NOT NULL DEFAULT 0,
+  modified  TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- ===========================================
+-- Monte Carlo season outcomes (re-simulated after fixture imports)
+-- probs[i] = P(team finishes in position i), 1-based
+-- ===========================================
+CREATE TABLE IF NOT EXISTS season_simulation (
+  season_id     BIGINT PRIMARY KEY REFERENCES season(season_id) ON DELETE CASCADE,
+  simulated_at  TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  inputs        TEXT NOT NULL,              -- season_inputs(): fixtures, points rule, adjustments
+  n_seasons     INTEGER NOT NULL,
+  n_played      INTEGER NOT NULL,
+  n_remaining   INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS season_simulation_team (
+  season_id          BIGINT NOT NULL REFERENCES season_simulation(season_id) ON DELETE CASCADE,
+  team_id            BIGINT NOT NULL REFERENCES team(team_id) ON DELETE CASCADE,
+  expected_position  REAL NOT NULL,
+  expected_pts       REAL NOT NULL,
+  probs              REAL[] NOT NULL,
+  PRIMARY KEY (season_id, team_id)
+);
+
+-- Clinched / eliminated per team and target of a league season's league
+-- stage (services/scenarios.py); JSON keeps the targets in order
+CREATE TABLE IF NOT EXISTS league_scenarios (
+  season_id    BIGINT PRIMARY KEY REFERENCES season(season_id) ON DELETE CASCADE,
+  stage_id     BIGINT NOT NULL REFERENCES stage(stage_id) ON DELETE CASCADE,
+  inputs       TEXT NOT NULL,              -- season_inputs(): fixtures, points rule, adjustments
+  computed_at  TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  result       JSON NOT NULL
+);
+
+-- ===========================================
+-- Club / country coefficients (UEFA-style; updated after fixture imports)
+-- Points per organizing confederation and season year from its international
+-- club competitions; rankings keep only the current 5-season window.
+-- ===========================================
+CREATE TABLE IF NOT EXISTS club_coefficient_season (
+  ass_id       BIGINT   NOT NULL REFERENCES association(ass_id) ON DELETE CASCADE,
+  season_year  SMALLINT NOT NULL,           -- year the season starts
+  club_id      BIGINT   NOT NULL REFERENCES club(club_id) ON DELETE CASCADE,
+  country_id   BIGINT   REFERENCES country(country_id) ON DELETE SET NULL,
+  matches      SMALLINT NOT NULL,
+  match_points REAL     NOT NULL,
+  bonus_points REAL     NOT NULL,
+  points       REAL     NOT NULL,
+  PRIMARY KEY (ass_id, season_year, club_id)
+);
+
+CREATE TABLE IF NOT EXISTS country_coefficient_season (
+  ass_id       BIGINT   NOT NULL REFERENCES association(ass_id) ON DELETE CASCADE,
+  season_year  SMALLINT NOT NULL,
+  country_id   BIGINT   NOT NULL REFERENCES country(country_id) ON DELETE CASCADE,
+  clubs        SMALLINT NOT NULL,           -- clubs entered that season
+  points       REAL     NOT NULL,           -- sum of club points / clubs
+  PRIMARY KEY (ass_id, season_year, country_id)
+);
+
+CREATE TABLE IF NOT EXISTS coefficient_ranking (
+  ass_id         BIGINT   NOT NULL REFERENCES association(ass_id) ON DELETE CASCADE,
+  kind           TEXT     NOT NULL CHECK (kind IN ('club','country')),
+  entity_id      BIGINT   NOT NULL,          -- club_id or country_id
+  position       INTEGER  NOT NULL,
+  total          REAL     NOT NULL,
+  season_points  REAL[]   NOT NULL,          -- window, oldest first
+  first_year     SMALLINT NOT NULL,
+  last_year      SMALLINT NOT NULL,
+  PRIMARY KEY (ass_id, kind, entity_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_coefficient_ranking_position ON coefficient_ranking(ass_id, kind, position);
+
+-- ===========================================
+-- National team world ranking (points exchange; updated after fixture imports)
+-- One full snapshot per ranking date (last day of each month with matches),
+-- so "ranking as of X" reads the latest ranking_date <= X.
+-- ===========================================
+CREATE TABLE IF NOT EXISTS national_ranking_snapshot (
+  ranking_date   DATE     NOT NULL,
+  team_id        BIGINT   NOT NULL REFERENCES team(team_id) ON DELETE CASCADE,
+  position       INTEGER  NOT NULL,
+  points         REAL     NOT NULL,
+  games          INTEGER  NOT NULL,          -- ranked matches played so far
+  prev_position  INTEGER,                    -- at the previous ranking date
+  PRIMARY KEY (ranking_date, team_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_national_ranking_position ON national_ranking_snapshot(ranking_date, position);
+CREATE INDEX IF NOT EXISTS idx_national_ranking_team ON national_ranking_snapshot(team_id, ranking_date);
+
+-- ===========================================
+-- Records (top entries per scope and category; rebuilt for the scopes
+-- touched by fixture imports). Single-match records point at fixture_id;
+-- runs at their first and last fixture.
+-- ===========================================
+CREATE TABLE IF NOT EXISTS record_entry (
+  scope            TEXT     NOT NULL CHECK (scope IN ('competition','season','team')),
+  scope_id         BIGINT   NOT NULL,        -- competition_id / season_id / team_id
+  category         TEXT     NOT NULL,        -- biggest_win | biggest_defeat | highest_scoring | attendance
+                                             -- | win_run | unbeaten_run | scoreless_run
+  rank             SMALLINT NOT NULL,
+  value            INTEGER  NOT NULL,        -- margin / goals / spectators / matches
+  team_id          BIGINT   REFERENCES team(team_id) ON DELETE CASCADE,
+  fixture_id       BIGINT   REFERENCES fixture(fixture_id) ON DELETE CASCADE,
+  last_fixture_id  BIGINT   REFERENCES fixture(fixture_id) ON DELETE CASCADE,
+  start_utc        TIMESTAMPTZ NOT NULL,
+  end_utc          TIMESTAMPTZ NOT NULL,
+  ongoing          BOOLEAN  NOT NULL DEFAULT FALSE,   -- run still going at the scope's last match
+  PRIMARY KEY (scope, scope_id, category, rank)
+);
+
+-- ===========================================
+-- Multi-season aggregates (all-time tables, head-to-head)
+-- One row per (competition, season, team[, opponent]) over played fixtures;
+-- season ranges are answered by summing these rows.
+-- Refreshed CONCURRENTLY after fixture imports (needs the unique indexes).
+-- ===========================================
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_team_season_totals AS
+WITH team_match AS (
+  SELECT se.competition_id, se.season_id,
+         f.home_team_id AS team_id, f.ft_home_score AS gf, f.ft_away_score AS ga
+  FROM fixture f
+  JOIN stage_round sr ON sr.stage_round_id = f.stage_round_id
+  JOIN stage s ON s.stage_id = sr.stage_id
+  JOIN season se ON se.season_id = s.season_id
+  WHERE f.ft_home_score IS NOT NULL AND f.ft_away_score IS NOT NULL
+  UNION ALL
+  SELECT se.competition_id, se.season_id,
+         f.away_team_id, f.ft_away_score, f.ft_home_score
+  FROM fixture f
+  JOIN stage_round sr ON sr.stage_round_id = f.stage_round_id
+  JOIN stage s ON s.stage_id = sr.stage_id
+  JOIN season se ON se.season_id = s.season_id
+  WHERE f.ft_home_score IS NOT NULL AND f.ft_away_score IS NOT NULL
+)
+SELECT competition_id, season_id, team_id,
+       COUNT(*)::INT                        AS pld,
+       COUNT(*) FILTER (WHERE gf > ga)::INT AS w,
+       COUNT(*) FILTER (WHERE gf = ga)::INT AS d,
+       COUNT(*) FILTER (WHERE gf < ga)::INT AS l,
+       SUM(gf)::INT                         AS gf,
+       SUM(ga)::INT                         AS ga
+FROM team_match
+GROUP BY competition_id, season_id, team_id;
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_mv_team_season_totals
+  ON mv_team_season_totals(competition_id, season_id, team_id);
+CREATE INDEX IF NOT EXISTS idx_mv_team_season_totals_team ON mv_team_season_totals(team_id);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_head_to_head_season AS
+WITH team_match AS (
+  SELECT se.competition_id, se.season_id,
+         f.home_team_id AS team_id, f.away_team_id AS opponent_id,
+         f.ft_home_score AS gf, f.ft_away_score AS ga
+  FROM fixture f
+  JOIN stage_round sr ON sr.stage_round_id = f.stage_round_id
+  JOIN stage s ON s.stage_id = sr.stage_id
+  JOIN season se ON se.season_id = s.season_id
+  WHERE f.ft_home_score IS NOT NULL AND f.ft_away_score IS NOT NULL
+  UNION ALL
+  SELECT se.competition_id, se.season_id,
+         f.away_team_id, f.home_team_id, f.ft_away_score, f.ft_home_score
+  FROM fixture f
+  JOIN stage_round sr ON sr.stage_round_id = f.stage_round_id
+  JOIN stage s ON s.stage_id = sr.stage_id
+  JOIN season se ON se.season_id = s.season_id
+  WHERE f.ft_home_score IS NOT NULL AND f.ft_away_score IS NOT NULL
+)
+SELECT competition_id, season_id, team_id, opponent_id,
+       COUNT(*)::INT                        AS pld,
+       COUNT(*) FILTER (WHERE gf > ga)::INT AS w,
+       COUNT(*) FILTER (WHERE gf = ga)::INT AS d,
+       COUNT(*) FILTER (WHERE gf < ga)::INT AS l,
+       SUM(gf)::INT                         AS gf,
+       SUM(ga)::INT                         AS ga
+FROM team_match
+GROUP BY competition_id, season_id, team_id, opponent_id;
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_mv_head_to_head_season
+  ON mv_head_to_head_season(competition_id, season_id, team_id, opponent_id);
+CREATE INDEX IF NOT EXISTS idx_mv_head_to_head_team ON mv_head_to_head_season(team_id, opponent_id);
 
 CREATE TABLE IF NOT EXISTS person (
   person_id          BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
@@ -364,6 +659,8 @@ CREATE TABLE IF NOT EXISTS person (
 
 CREATE UNIQUE INDEX IF NOT EXISTS uq_person_name_dob ON person (lower(full_name), birth_date) WHERE full_name IS NOT NULL AND birth_date IS NOT NULL;
 CREATE INDEX IF NOT EXISTS idx_person_country ON person(country_id);
+-- keyset order of the player listings (COALESCE(full_name, ''), person_id)
+CREATE INDEX IF NOT EXISTS idx_person_name_key_id ON person((COALESCE(full_name, '')), person_id);
 
 CREATE TABLE IF NOT EXISTS player (
   player_id   BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,